@@ -3,30 +3,50 @@ API routes for CV Parser.
 Includes CV parsing, database operations, and roadmap generation.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional
+import time
+from typing import List, Optional
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
+from app.core.config import settings
 from app.schemas.cv_schema import ModelExtrationResponse, ErrorResponse
-from app.schemas.matching_schema import MatchJobsRequest, MatchJobsResponse
+from app.schemas.job_schema import JobStatusResponse, JobSubmitResponse
+from app.schemas.matching_schema import (
+    JobCatalogUpsertRequest,
+    JobCatalogUpsertResponse,
+    JobInput,
+    MatchJobsBatchRequest,
+    MatchJobsBatchResponse,
+    MatchJobsRequest,
+    MatchJobsResponse,
+)
 from app.schemas.roadmap_schema import RoadmapResponse
-from app.services.file_parser import extract_text
-from app.services.cv_analyzer import analyse_cv
+from app.services.batch_pipeline import build_batch_items, run_batch
+from app.services.cv_pipeline import CVSaveError, check_cv_options, process_cv
 from app.services.database import (
-    save_model_extration,
     get_model_extration_by_user,
     delete_model_extration,
 )
+from app.services.job_catalog import job_catalog
 from app.services.job_matcher import compute_matches
-from app.services.roadmap_service import generate_roadmap
+from app.services.job_queue import job_queue
+from app.services.roadmap_service import generate_roadmap, stream_roadmap
 from app.utils.helpers import validate_uploaded_file
+from app.utils.uploads import read_upload
+from app.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_roadmap_flight = SingleFlight("generate-roadmap")
+
 
 # ─────────────────────────────────────────────────────────────
 # CV Parsing Endpoints
@@ -40,6 +60,7 @@ router = APIRouter()
         200: {"description": "CV parsed successfully"},
         400: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        413: {"model": ErrorResponse},
     },
 )
 async def parse_cv(
@@ -48,6 +69,11 @@ async def parse_cv(
         None,
         description="ApplicationUserId to save the CV data. If provided, data will be saved to ModelExtrations table.",
     ),
+    mode: str = Query(
+        "full",
+        pattern="^(full|contact)$",
+        description="`full` extracts every field; `contact` returns only name/email/phone/location without calling the AI (cannot be combined with user_id).",
+    ),
 ):
     """
     Parse a CV file and extract structured data using AI.
@@ -55,9 +81,13 @@ async def parse_cv(
     **Flow:**
     1. Upload CV (PDF/DOCX)
     2. Extract text from file
-    3. Analyze with AI (Groq)
-    4. Return structured data
-    5. If user_id provided: Save to database
+    3. Fill contact fields with rule-based extraction
+    4. Analyze the remaining fields with AI (Groq), skipped when `mode=contact`
+    5. Return structured data
+    6. If user_id provided: Save to database
+    
+    Identical uploads (same file and user_id) that arrive while one is
+    still processing wait for that result instead of re-running it.
     
     **Note:** user_id must exist in AspNetUsers table.
     """
@@ -65,40 +95,19 @@ async def parse_cv(
         # Validate file
         validate_uploaded_file(file)
         
-        # Read file
-        file_bytes = await file.read()
-        logger.info(f"Processing file: {file.filename} ({len(file_bytes)} bytes)")
-        
-        # Extract text
-        cv_text = await extract_text(file_bytes, file.filename)
-        if not cv_text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="No text could be extracted from the file. "
-                       "Ensure it's not an image-based PDF or corrupted.",
-            )
-        
-        logger.info(f"Extracted {len(cv_text)} characters from {file.filename}")
+        # Read file (size cap enforced while streaming; large files spool to disk)
+        upload = await read_upload(file)
+        logger.info(f"Processing file: {upload.filename} ({upload.size} bytes)")
         
-        # Analyze CV
-        cv_data = await analyse_cv(cv_text)
-        
-        # Save to database if user_id provided
-        if user_id:
-            try:
-                model_id = save_model_extration(cv_data, user_id)
-                logger.info(f"CV data saved to database with ID: {model_id}")
-            except Exception as db_error:
-                logger.error(f"Database save failed: {db_error}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"CV parsed successfully but database save failed: {str(db_error)}",
-                )
+        # Extract, analyze and save (identical concurrent uploads share one run)
+        cv_data = await process_cv(upload, user_id, contact_only=(mode == "contact"))
         
         return cv_data
         
     except HTTPException:
         raise
+    except CVSaveError as save_error:
+        raise HTTPException(status_code=500, detail=str(save_error))
     except ValueError as ve:
         logger.error(f"Validation error: {ve}")
         raise HTTPException(status_code=400, detail=str(ve))
@@ -107,6 +116,182 @@ async def parse_cv(
         raise HTTPException(status_code=500, detail=f"Internal error: {str(exc)}")
 
 
+@router.post(
+    "/parse-cv/batch",
+    summary="Parse many CVs (or a zip of CVs) and stream per-file results",
+    responses={
+        200: {"description": "NDJSON stream: one `result` event per file, then `done`"},
+        400: {"model": ErrorResponse},
+        413: {"model": ErrorResponse},
+    },
+)
+async def parse_cv_batch(
+    files: List[UploadFile] = File(..., description="CV files (PDF/DOCX) and/or .zip archives of them"),
+    user_ids: Optional[List[str]] = Form(
+        None,
+        description="One ApplicationUserId per CV (after zips are expanded), in order. "
+                    "Empty string = parse without saving. A zip may instead carry manifest.json "
+                    '({"cv.pdf": "<user id>"}).',
+    ),
+):
+    """
+    Parse a batch of CVs with overlapping stages.
+    
+    Text extraction, AI analysis and the database save run as separate
+    stages with their own concurrency limits (BATCH_*_CONCURRENCY), so the
+    batch is not processed strictly one file at a time.
+    
+    **Stream (application/x-ndjson):**
+    - `result`: `{index, filename, user_id, status: "ok", data, seconds}` or
+      `{index, filename, user_id, status: "error", stage, error, seconds}`,
+      in completion order
+    - `done`: `{total, succeeded, failed, seconds}`
+    
+    A failing file does not stop the rest of the batch.
+    """
+    try:
+        items = await build_batch_items(files, user_ids)
+    except ValueError as ve:
+        logger.error(f"Batch validation error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    
+    logger.info(f"Processing batch of {len(items)} CVs")
+    
+    async def events():
+        started = time.monotonic()
+        succeeded = failed = 0
+        async for result in run_batch(items):
+            if result["status"] == "ok":
+                succeeded += 1
+            else:
+                failed += 1
+            yield _encode_stream_event({"event": "result", "data": result}, "ndjson")
+        yield _encode_stream_event(
+            {
+                "event": "done",
+                "data": {
+                    "total": len(items),
+                    "succeeded": succeeded,
+                    "failed": failed,
+                    "seconds": round(time.monotonic() - started, 3),
+                },
+            },
+            "ndjson",
+        )
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Spooled files are removed even if the client leaves before the stream starts
+        background=BackgroundTask(lambda: [item.release() for item in items]),
+    )
+
+
+# ─────────────────────────────────────────────────────────────
+# CV Parsing Jobs (submit now, fetch the result later)
+# ─────────────────────────────────────────────────────────────
+
+@router.post(
+    "/parse-cv/jobs",
+    response_model=JobSubmitResponse,
+    status_code=202,
+    summary="Queue a CV for parsing and return a job id immediately",
+    responses={
+        202: {"description": "Job accepted"},
+        400: {"model": ErrorResponse},
+        413: {"model": ErrorResponse},
+    },
+)
+async def submit_parse_cv_job(
+    file: UploadFile = File(..., description="CV file (PDF or DOCX)"),
+    user_id: Optional[str] = Query(
+        None,
+        description="ApplicationUserId to save the CV data once parsed.",
+    ),
+    mode: str = Query(
+        "full",
+        pattern="^(full|contact)$",
+        description="Same as `/parse-cv`.",
+    ),
+):
+    """
+    Job mode of `/parse-cv`: the upload is stored in a durable local queue
+    and processed by the service's worker pool, so the request returns as
+    soon as the file is accepted.
+    
+    Follow the job with `GET /parse-cv/jobs/{job_id}` (poll) or
+    `GET /parse-cv/jobs/{job_id}/stream` (server-sent events).
+    """
+    try:
+        validate_uploaded_file(file)
+        check_cv_options(user_id, mode == "contact")
+        upload = await read_upload(file)
+    except ValueError as ve:
+        logger.error(f"Validation error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    
+    try:
+        job = await job_queue.submit(upload.filename, upload.read_bytes(), user_id, mode)
+    finally:
+        upload.close()
+    job_id = job["job_id"]
+    return JobSubmitResponse(
+        job_id=job_id,
+        status=job["status"],
+        status_url=f"/parse-cv/jobs/{job_id}",
+        stream_url=f"/parse-cv/jobs/{job_id}/stream",
+    )
+
+
+@router.get(
+    "/parse-cv/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Get the status (and result) of a CV parsing job",
+    responses={
+        200: {"description": "Job status"},
+        404: {"model": ErrorResponse},
+    },
+)
+async def get_parse_cv_job(job_id: str):
+    """
+    Returns `queued`, `running`, `succeeded` (with `result`) or `failed`
+    (with `error` and the `error_status` `/parse-cv` would have returned).
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job found with id: {job_id}")
+    return job
+
+
+@router.get(
+    "/parse-cv/jobs/{job_id}/stream",
+    summary="Subscribe to a CV parsing job's status changes (SSE)",
+    responses={
+        200: {"description": "text/event-stream of `status` events"},
+        404: {"model": ErrorResponse},
+    },
+)
+async def stream_parse_cv_job(job_id: str):
+    """
+    Sends a `status` event with the full job (as in the polling endpoint)
+    on every status change; the stream ends once the job has succeeded or failed.
+    """
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"No job found with id: {job_id}")
+    
+    async def events():
+        async for job in job_queue.watch(job_id):
+            payload = JobStatusResponse(**job).model_dump(mode="json")
+            yield _encode_stream_event({"event": "status", "data": payload}, "sse")
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ─────────────────────────────────────────────────────────────
 # Database CRUD Endpoints
 # ─────────────────────────────────────────────────────────────
@@ -173,6 +358,7 @@ async def delete_model_extration_endpoint(user_id: str):
                 status_code=404,
                 detail=f"No ModelExtration found for user: {user_id}",
             )
+        await asyncio.to_thread(job_catalog.forget_profile, user_id)
         
         return {"message": f"ModelExtration deleted for user {user_id}"}
         
@@ -205,15 +391,134 @@ async def match_jobs(request: MatchJobsRequest):
     - Matched skills for each job
     - Missing skills for each job
     - Match percentage (0-100%)
+    
+    Without `jobSkills`, the user is matched against the job catalog
+    (`PUT /job-catalog`); only jobs sharing at least one skill are returned.
+
+    `top_k` limits the page size and `min_percentage` drops weak matches;
+    send the returned `next_cursor` as `cursor` to get the next page.
+
+    With `fuzzy`, misspelled or variant skills ("PostgresSQL") also match;
+    each such match is listed with its similarity in `fuzzy_matches`.
+
+    `"scoring": "weighted"` sorts by `relevance` instead: rare skills weigh
+    more than common ones (IDF over catalog jobs and saved CV profiles) and
+    matched `nice_to_have_skills` add to the score.
     """
+    fuzzy_threshold = None
+    if request.fuzzy:
+        fuzzy_threshold = request.fuzzy_threshold if request.fuzzy_threshold is not None else settings.skill_fuzzy_threshold
+    weighted = request.scoring == "weighted"
+    options = (request.top_k, request.min_percentage, request.cursor, fuzzy_threshold)
     try:
-        response = compute_matches(request.userSkills, request.jobSkills)
-        return response
+        if request.jobSkills is None:
+            # Only catalog jobs sharing a skill with the user are scored
+            return await asyncio.to_thread(job_catalog.match, request.userSkills, *options, weighted)
+
+        def match_inline():
+            # Inline jobs are weighted with the catalog's IDF (jobs + saved profiles)
+            weights = job_catalog.skill_weights() if weighted else None
+            return compute_matches(request.userSkills, request.jobSkills, *options, weights)
+
+        return await asyncio.to_thread(match_inline)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as exc:
         logger.exception("Error in job matching")
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+@router.post(
+    "/match-jobs/batch",
+    response_model=MatchJobsBatchResponse,
+    summary="Match many users against the job catalog",
+    responses={
+        200: {"description": "Top jobs per user, in request order"},
+        400: {"model": ErrorResponse},
+    },
+)
+async def match_jobs_batch(request: MatchJobsBatchRequest):
+    """
+    Match a batch of users against the job catalog in one pass.
+
+    Returns the `top_k` best jobs for each user, scored and sorted exactly
+    like `/match-jobs`; jobs sharing no skill with a user are left out.
+    """
+    if len(request.users) > settings.match_batch_max_users:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many users ({len(request.users)}). Maximum: {settings.match_batch_max_users}",
+        )
+    fuzzy_threshold = None
+    if request.fuzzy:
+        fuzzy_threshold = request.fuzzy_threshold if request.fuzzy_threshold is not None else settings.skill_fuzzy_threshold
+    try:
+        results = await asyncio.to_thread(
+            job_catalog.match_many,
+            [(user.user_id, user.userSkills) for user in request.users],
+            request.top_k,
+            fuzzy_threshold,
+        )
+        return MatchJobsBatchResponse(results=results)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as exc:
+        logger.exception("Error in batch job matching")
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+# ─────────────────────────────────────────────────────────────
+# Job Catalog (jobs stored once, matched by /match-jobs)
+# ─────────────────────────────────────────────────────────────
+
+@router.put(
+    "/job-catalog",
+    response_model=JobCatalogUpsertResponse,
+    summary="Insert or replace jobs in the catalog",
+)
+async def upsert_catalog_jobs(request: JobCatalogUpsertRequest):
+    """
+    Add jobs to the catalog, replacing any with the same `job_id`.
+    
+    `/match-jobs` without `jobSkills` matches against the catalog, so job
+    postings only need to be sent when they change.
+    """
+    total = await asyncio.to_thread(job_catalog.upsert, request.jobs)
+    logger.info(f"Job catalog: upserted {len(request.jobs)} jobs ({total} total)")
+    return JobCatalogUpsertResponse(upserted=len(request.jobs), total_jobs=total)
+
+
+@router.get("/job-catalog", summary="Job catalog statistics")
+async def get_catalog_stats() -> dict:
+    """Job and distinct-skill counts, how many jobs matches had to score, and skill dictionary size."""
+    return job_catalog.stats()
+
+
+@router.get(
+    "/job-catalog/{job_id}",
+    response_model=JobInput,
+    summary="Get a catalog job",
+    responses={404: {"model": ErrorResponse}},
+)
+async def get_catalog_job(job_id: str):
+    job = await asyncio.to_thread(job_catalog.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found in catalog: {job_id}")
+    return job
+
+
+@router.delete(
+    "/job-catalog/{job_id}",
+    summary="Remove a job from the catalog",
+    responses={404: {"model": ErrorResponse}},
+)
+async def delete_catalog_job(job_id: str):
+    deleted = await asyncio.to_thread(job_catalog.delete, job_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Job not found in catalog: {job_id}")
+    return {"message": f"Job {job_id} removed from catalog"}
+
+
 # ─────────────────────────────────────────────────────────────
 # 🆕 Roadmap Generation Endpoint
 # ─────────────────────────────────────────────────────────────
@@ -254,37 +559,18 @@ async def generate_roadmap_endpoint(user_id: str):
     - `mermaid_code`: Mermaid diagram code for visualization
     """
     try:
-        # Get user data from database
-        logger.info(f"Fetching data for user: {user_id}")
-        user_data = get_model_extration_by_user(user_id)
-        
-        if user_data is None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No data found for user: {user_id}. "
-                       "Please upload a CV first using /parse-cv endpoint.",
-            )
-        
-        # Format data for roadmap generation
-        formatted_data = {
-            "personal_info": {
-                "full_name": user_data.get("full_name", ""),
-                "email": user_data.get("email", ""),
-                "phone": user_data.get("phone", ""),
-                "location": user_data.get("location", ""),
-            },
-            "summary": user_data.get("summary", ""),
-            "skills": user_data.get("skills", []),
-            "education": user_data.get("education", []),
-            "experience": user_data.get("experience", []),
-            "certifications": user_data.get("certifications", []),
-            "languages": user_data.get("languages", []),
-        }
+        formatted_data = _load_roadmap_profile(user_id)
         
         logger.info(f"Generating roadmap for user with {len(formatted_data['skills'])} skills")
         
-        # Generate roadmap
-        roadmap = await generate_roadmap(formatted_data, user_id)
+        # Generate roadmap (concurrent calls for the same profile version share one run)
+        profile_version = hashlib.sha256(
+            json.dumps(formatted_data, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        roadmap = await _roadmap_flight.do(
+            (user_id, profile_version),
+            lambda: generate_roadmap(formatted_data, user_id),
+        )
         
         logger.info(f"Roadmap generated: {roadmap.roadmap_duration}, {len(roadmap.roadmap)} phases")
         
@@ -298,3 +584,90 @@ async def generate_roadmap_endpoint(user_id: str):
             status_code=500,
             detail=f"Failed to generate roadmap: {str(exc)}",
         )
+
+
+@router.post(
+    "/generate-roadmap/{user_id}/stream",
+    summary="Stream a personalized learning roadmap as it is generated",
+    responses={
+        200: {"description": "NDJSON or SSE stream of roadmap events"},
+        404: {"model": ErrorResponse},
+    },
+)
+async def generate_roadmap_stream_endpoint(
+    user_id: str,
+    format: str = Query(
+        "ndjson",
+        pattern="^(ndjson|sse)$",
+        description="Stream framing: `ndjson` (one JSON object per line) or `sse` (text/event-stream).",
+    ),
+):
+    """
+    Streaming variant of `/generate-roadmap/{user_id}`.
+    
+    Each item is pushed as soon as the model finishes writing it:
+    
+    - `meta`: userId and roadmap_duration
+    - `project_improvement`: one ProjectImprovement
+    - `phase`: one RoadmapPhase
+    - `mermaid_code`: the diagram (always last)
+    - `done`: counts of streamed items
+    
+    An `error` event is sent if generation fails mid-stream.
+    """
+    formatted_data = _load_roadmap_profile(user_id)
+    
+    async def events():
+        try:
+            async for event in stream_roadmap(formatted_data, user_id):
+                yield _encode_stream_event(event, format)
+        except Exception as exc:
+            logger.exception(f"Error streaming roadmap for {user_id}")
+            yield _encode_stream_event(
+                {"event": "error", "data": {"detail": f"Failed to generate roadmap: {str(exc)}"}},
+                format,
+            )
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _load_roadmap_profile(user_id: str) -> dict:
+    """Fetch the user's ModelExtration and shape it for the roadmap prompt."""
+    # Get user data from database
+    logger.info(f"Fetching data for user: {user_id}")
+    user_data = get_model_extration_by_user(user_id)
+    
+    if user_data is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No data found for user: {user_id}. "
+                   "Please upload a CV first using /parse-cv endpoint.",
+        )
+    
+    # Format data for roadmap generation
+    return {
+        "personal_info": {
+            "full_name": user_data.get("full_name", ""),
+            "email": user_data.get("email", ""),
+            "phone": user_data.get("phone", ""),
+            "location": user_data.get("location", ""),
+        },
+        "summary": user_data.get("summary", ""),
+        "skills": user_data.get("skills", []),
+        "education": user_data.get("education", []),
+        "experience": user_data.get("experience", []),
+        "certifications": user_data.get("certifications", []),
+        "languages": user_data.get("languages", []),
+    }
+
+
+def _encode_stream_event(event: dict, format: str) -> str:
+    """Frame one event as an NDJSON line or an SSE message."""
+    if format == "sse":
+        return f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+    return json.dumps(event, ensure_ascii=False) + "\n"
@@ -2,6 +2,8 @@
 Application configuration matching Career_Path .NET project database.
 """
 
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -9,13 +11,100 @@ class Settings(BaseSettings):
     """Application-wide settings loaded from environment / .env."""
 
     # ── AI backend (Groq) ────────────────────────────────────
+    llm_backend: str = "groq"              # "groq" or "fake" (offline/load testing)
     groq_api_key: str = ""
     groq_model: str = "llama-3.3-70b-versatile"
     llm_max_tokens: int = 2048
+    llm_max_concurrency: int = 16          # in-flight LLM calls per process
+    llm_timeout_seconds: float = 60.0      # per-call read timeout
+    llm_connect_timeout_seconds: float = 10.0
+    llm_max_connections: int = 32          # HTTP keep-alive pool size
+    llm_max_keepalive_connections: int = 16
+    llm_max_retries: int = 5               # retries for 429/5xx/connection errors
+    llm_backoff_base_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 30.0
+    llm_requests_per_minute: int = 30      # client-side quota (0 = unlimited)
+    llm_tokens_per_minute: int = 12000     # resynced from x-ratelimit-* headers
+
+    # ── Fake LLM backend (LLM_BACKEND=fake) ──────────────────
+    fake_llm_latency_ms: float = 800.0     # median time to first token (lognormal)
+    fake_llm_latency_sigma: float = 0.5
+    fake_llm_tokens_per_second: float = 250.0  # output rate, 0 = instant
+    fake_llm_rate_limit_probability: float = 0.0  # share of requests answered with 429
+    fake_llm_retry_after_seconds: float = 1.0
+    fake_llm_seed: Optional[int] = None
+
+    # ── LLM response cache ───────────────────────────────────
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_seconds: int = 24 * 60 * 60   # 1 day
+    llm_cache_path: str = ""                    # SQLite file shared by workers; empty = memory only
+
+    # ── CV text compaction (before the extraction prompt) ────
+    cv_compaction_enabled: bool = True
+    cv_max_prompt_tokens: int = 6000       # budget for the CV text itself
+    contact_confidence_threshold: float = 0.8  # rule-based contact fields at/above this skip the LLM
+
+    # ── Long CVs: per-section extraction ─────────────────────
+    cv_section_split_enabled: bool = True
+    cv_section_split_min_tokens: int = 1500        # CV text above this is extracted section by section
+    cv_section_max_prompt_tokens: int = 2500       # CV text per section prompt (longer sections are cut)
+    cv_section_split_max_tokens: int = 20000       # total CV text kept when splitting
+
+    # ── Roadmap generation ───────────────────────────────────
+    roadmap_fanout_enabled: bool = False   # opt-in: improvements + phase groups as concurrent calls
+    roadmap_phases_per_call: int = 2       # 6 phases / 2 = 3 phase calls (+1); each call repeats the profile, so TPM use rises
+
+    # ── Document parsing (process pool) ──────────────────────
+    parse_workers: int = 2                 # worker processes (0 = a thread in the server process)
+    parse_timeout_seconds: float = 30.0    # per file; the worker is killed past this (0 = no limit)
+    parse_max_tasks_per_child: int = 50    # recycle workers to cap memory growth
+
+    # ── PDF extraction ───────────────────────────────────────
+    pdf_text_mode: str = "fast"            # "fast" = pdfminer without layout analysis, "layout" = pdfplumber
+    pdf_pages_per_task: int = 2            # pages per parser-pool call
+    pdf_parallel_tasks: int = 2            # page chunks of one PDF parsed at once
+    pdf_max_chars: int = 0                 # stop reading pages past this much text (0 = no limit)
+    pdf_max_tokens: int = 12000            # same, in estimated tokens (compaction trims to CV_MAX_PROMPT_TOKENS later)
+
+    # ── Extracted text cache (keyed on file SHA-256) ─────────
+    text_cache_enabled: bool = True
+    text_cache_max_entries: int = 2048
+    text_cache_max_bytes: int = 64 * 1024 * 1024   # memory tier
+    text_cache_ttl_seconds: int = 7 * 24 * 60 * 60  # 7 days
+    text_cache_path: str = ""                      # SQLite file shared by workers; empty = memory only
+
+    # ── Batch CV ingestion (/parse-cv/batch) ─────────────────
+    batch_max_files: int = 500
+    batch_parse_concurrency: int = 4       # files being text-extracted at once
+    batch_llm_concurrency: int = 8         # CVs being analysed at once
+    batch_db_concurrency: int = 4          # saves at once (keep below the DB pool size)
+
+    # ── CV job queue (/parse-cv/jobs) ────────────────────────
+    job_queue_path: str = "cv_jobs.db"     # SQLite file, shared by workers on the host
+    job_workers: int = 4                   # jobs run at once per process (0 = accept only)
+    job_poll_interval_seconds: float = 1.0
+    job_lease_seconds: int = 900           # a running job is retried if not finished by then
+    job_max_attempts: int = 3
+    job_retention_seconds: int = 7 * 24 * 60 * 60  # finished jobs kept (0 = forever)
+
+    # ── Job catalog (/job-catalog, /match-jobs) ─────────────
+    job_catalog_path: str = "job_catalog.db"   # SQLite file, shared by workers on the host; empty = memory only
+    job_catalog_seed_profiles: bool = True     # at startup, count every CV saved in the database in the IDF weights
+    skill_aliases_path: str = ""               # extra {"Canonical": ["alias", ...]} JSON merged into the skill dictionary
+    skill_fuzzy_threshold: float = 0.6         # trigram similarity for "fuzzy": true matches (0-1)
+    skill_fuzzy_min_length: int = 4            # shorter skills ("Go", "SQL") only match exactly
+    match_nice_to_have_weight: float = 0.2     # share of the weighted relevance given to nice-to-have skills
+    match_batch_max_users: int = 10000         # users per POST /match-jobs/batch request
+    match_batch_chunk_users: int = 1024        # users per sparse product (bounds peak memory)
 
     # ── File upload constraints ──────────────────────────────
     allowed_extensions: set[str] = {".pdf", ".docx"}
-    max_file_size_bytes: int = 10 * 1024 * 1024  # 10 MB
+    max_file_size_bytes: int = 10 * 1024 * 1024  # 10 MB, enforced while reading
+    upload_chunk_bytes: int = 64 * 1024
+    upload_spool_threshold_bytes: int = 1024 * 1024  # larger uploads go to a temp file
+    batch_max_archive_bytes: int = 200 * 1024 * 1024  # .zip uploads to /parse-cv/batch (and the whole batch request)
+    upload_form_overhead_bytes: int = 64 * 1024  # multipart headers and form fields on top of the file(s)
 
     # ── Server ────────────────────────────────────────────────
     host: str = "0.0.0.0"
@@ -3,6 +3,7 @@ FastAPI application for CV parsing.
 Integrates with Career_Path .NET database.
 """
 
+import asyncio
 import logging
 import sys
 
@@ -10,7 +11,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router as cv_router
-from app.services.database import test_connection
+from app.core.config import settings
+from app.services.database import get_all_profile_skills, test_connection
+from app.services.file_parser import get_text_cache_stats
+from app.services.job_catalog import job_catalog
+from app.services.job_queue import job_queue
+from app.services.llm_service import close_llm_client, get_llm_stats
+from app.services.parser_pool import parser_pool
+from app.services.text_normalizer import get_compaction_stats
+from app.utils.uploads import UploadSizeLimitMiddleware
 
 # ─────────────────────────────────────────────────────────────
 # Logging setup
@@ -37,6 +46,16 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Cap upload request bodies while they stream in (inside CORS, so a 413 keeps its headers)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/parse-cv": settings.max_file_size_bytes + settings.upload_form_overhead_bytes,
+        "/parse-cv/jobs": settings.max_file_size_bytes + settings.upload_form_overhead_bytes,
+        "/parse-cv/batch": settings.batch_max_archive_bytes + settings.upload_form_overhead_bytes,
+    },
+)
+
 # Enable CORS for frontend integration
 app.add_middleware(
     CORSMiddleware,
@@ -56,15 +75,24 @@ app.include_router(cv_router)
 
 @app.on_event("startup")
 async def startup_event():
-    """Test database connection on startup."""
+    """Test database connection, load the job catalog and start the parser pool and CV job workers."""
     logger = logging.getLogger(__name__)
     logger.info("Career Path CV Parser API starting up...")
     
-    if test_connection():
+    db_connected = test_connection()
+    if db_connected:
         logger.info("✓ Database connection verified")
         logger.info("✓ Ready to process CVs")
     else:
         logger.warning("✗ Database connection failed - check credentials")
+    
+    # Saved CVs seed the IDF weights of weighted matching
+    profiles = None
+    if db_connected and settings.job_catalog_seed_profiles:
+        profiles = await asyncio.to_thread(get_all_profile_skills)
+    await asyncio.to_thread(job_catalog.start, profiles)
+    await parser_pool.start()
+    await job_queue.start()
 
 
 @app.on_event("shutdown")
@@ -72,6 +100,10 @@ async def shutdown_event():
     """Cleanup on shutdown."""
     logger = logging.getLogger(__name__)
     logger.info("Shutting down...")
+    await job_queue.stop()
+    await close_llm_client()
+    parser_pool.shutdown()
+    job_catalog.close()
 
 
 # ─────────────────────────────────────────────────────────────
@@ -98,3 +130,20 @@ async def db_health() -> dict[str, str]:
             "status": "error",
             "database": "disconnected"
         }
+
+
+@app.get("/llm-stats", summary="LLM cache, prompt and parsing statistics")
+async def llm_stats() -> dict:
+    """LLM response cache counters, prompt token savings, parser pool and text cache counters."""
+    return {
+        **get_llm_stats(),
+        "compaction": get_compaction_stats(),
+        "parsing": parser_pool.stats(),
+        "text_cache": get_text_cache_stats(),
+    }
+
+
+@app.get("/job-stats", summary="CV job queue statistics")
+async def job_stats() -> dict:
+    """Jobs submitted/finished by this process and job counts by status."""
+    return await job_queue.stats()
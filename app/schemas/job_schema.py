@@ -0,0 +1,35 @@
+"""
+Pydantic schemas for the /parse-cv/jobs endpoints.
+"""
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.cv_schema import ModelExtrationResponse
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobSubmitResponse(BaseModel):
+    """Returned immediately by POST /parse-cv/jobs."""
+    job_id: str
+    status: JobStatus
+    status_url: str = Field(..., description="Poll this for status and result.")
+    stream_url: str = Field(..., description="Server-sent events for status changes.")
+
+
+class JobStatusResponse(BaseModel):
+    """Current state of a CV parsing job."""
+    job_id: str
+    status: JobStatus
+    filename: str
+    user_id: Optional[str] = None
+    mode: str = "full"
+    attempts: int = Field(0, description="Times a worker has picked the job up.")
+    created_at: float = Field(..., description="Unix timestamp.")
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[ModelExtrationResponse] = Field(None, description="Set when status is succeeded.")
+    error: Optional[str] = Field(None, description="Set when status is failed.")
+    error_status: Optional[int] = Field(None, description="HTTP status /parse-cv would have returned.")
@@ -2,6 +2,8 @@
 Pydantic schemas for the /match-jobs endpoint.
 """
 
+from typing import Literal, Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -11,12 +13,36 @@ class JobInput(BaseModel):
     title: str = Field(..., description="Job title.")
     company: str = Field(..., description="Company name.")
     skills: list[str] = Field(..., description="Skills required for this position.")
+    nice_to_have_skills: list[str] = Field(
+        default_factory=list, description="Optional skills; only counted by weighted scoring."
+    )
 
 
 class MatchJobsRequest(BaseModel):
     """Top-level request body sent to POST /match-jobs."""
     userSkills: list[str] = Field(..., description="Skills the user currently possesses.")
-    jobSkills: list[JobInput] = Field(..., description="List of jobs.")
+    jobSkills: Optional[list[JobInput]] = Field(
+        None,
+        description="List of jobs. Omit to match against the job catalog (PUT /job-catalog).",
+    )
+    top_k: Optional[int] = Field(None, ge=1, description="Return at most this many jobs (page size).")
+    min_percentage: float = Field(0.0, ge=0, le=100, description="Leave out jobs matched below this.")
+    cursor: Optional[str] = Field(None, description="next_cursor from the previous page.")
+    fuzzy: bool = Field(False, description="Also match misspelled/variant skills (e.g. 'PostgresSQL').")
+    fuzzy_threshold: Optional[float] = Field(
+        None, gt=0, le=1, description="Minimum similarity for a fuzzy match (default from settings)."
+    )
+    scoring: Literal["percentage", "weighted"] = Field(
+        "percentage",
+        description="'weighted' ranks by relevance: rare skills and nice-to-have matches count more.",
+    )
+
+
+class FuzzySkillMatch(BaseModel):
+    """A job skill matched through a similar, not identical, user skill."""
+    skill: str = Field(..., description="The job's skill.")
+    user_skill: str = Field(..., description="The user's skill it was matched with.")
+    score: float = Field(..., description="Similarity (0-1).")
 
 
 class MatchResult(BaseModel):
@@ -27,8 +53,48 @@ class MatchResult(BaseModel):
     match_percentage: float = Field(..., description="Percentage of job skills matched.")
     matched_skills: list[str] = Field(..., description="Skills present in both.")
     missing_skills: list[str] = Field(..., description="Skills required but absent.")
+    matched_nice_to_have: list[str] = Field(default_factory=list, description="Nice-to-have skills present.")
+    relevance: Optional[float] = Field(
+        None, description="IDF-weighted score (0-100) the results are sorted by; weighted scoring only."
+    )
+    fuzzy_matches: list[FuzzySkillMatch] = Field(
+        default_factory=list, description="Matched skills that came from a fuzzy match (fuzzy mode only)."
+    )
 
 
 class MatchJobsResponse(BaseModel):
-    """Top-level response — jobs sorted descending by match_percentage."""
+    """Top-level response — jobs sorted descending by match_percentage (relevance when weighted)."""
     results: list[MatchResult]
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor for the next page; null on the last one.")
+
+
+class BatchMatchUser(BaseModel):
+    user_id: str
+    userSkills: list[str] = Field(..., description="Skills the user currently possesses.")
+
+
+class MatchJobsBatchRequest(BaseModel):
+    """Body of POST /match-jobs/batch — many users against the job catalog."""
+    users: list[BatchMatchUser] = Field(..., min_length=1)
+    top_k: int = Field(10, ge=1, le=1000, description="Best jobs returned per user.")
+    fuzzy: bool = Field(False, description="Also match misspelled/variant skills.")
+    fuzzy_threshold: Optional[float] = Field(None, gt=0, le=1)
+
+
+class UserMatchResults(BaseModel):
+    user_id: str
+    results: list[MatchResult] = Field(..., description="Top jobs, sorted like /match-jobs.")
+
+
+class MatchJobsBatchResponse(BaseModel):
+    results: list[UserMatchResults]
+
+
+class JobCatalogUpsertRequest(BaseModel):
+    """Body of PUT /job-catalog."""
+    jobs: list[JobInput] = Field(..., description="Jobs to insert or replace (by job_id).")
+
+
+class JobCatalogUpsertResponse(BaseModel):
+    upserted: int
+    total_jobs: int
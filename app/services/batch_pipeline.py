@@ -0,0 +1,302 @@
+"""
+Batch CV ingestion: text extraction → AI analysis → DB save as overlapping stages.
+
+Each stage has its own worker pool (settings.batch_*_concurrency) connected
+by bounded queues, so one CV can be saved while the next is being analysed
+and a third is being parsed. Results are yielded in completion order, one
+per file; a failure only affects its own file.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.schemas.cv_schema import ModelExtrationResponse
+from app.services.cv_analyzer import analyse_cv
+from app.services.database import save_model_extration
+from app.services.file_parser import extract_upload_text
+from app.services.job_catalog import job_catalog
+from app.services.skill_dictionary import canonical_skills
+from app.utils.helpers import get_file_extension
+from app.utils.uploads import SpooledUpload, read_upload, spool_stream
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+_MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class BatchItem:
+    """One CV in a batch."""
+    index: int
+    filename: str
+    upload: Optional[SpooledUpload] = None
+    user_id: Optional[str] = None
+    error: Optional[str] = None    # rejected before parsing (type/size)
+
+    def release(self) -> None:
+        if self.upload is not None:
+            self.upload.close()
+            self.upload = None
+
+
+async def build_batch_items(
+    files: list[UploadFile],
+    user_ids: Optional[list[str]] = None,
+) -> list[BatchItem]:
+    """
+    Read uploaded files into batch items, expanding .zip archives.
+
+    A zip may contain manifest.json ({"<entry name>": "<user id>"}) to assign
+    user ids to its CVs. Explicit user_ids are matched to the expanded files
+    in order and take precedence; an empty string means "don't save".
+
+    Files are streamed with the same size cap as /parse-cv (archives up to
+    settings.batch_max_archive_bytes) and large ones are spooled to disk.
+    Files with an unsupported type or over the size limit become items with
+    an error instead of failing the whole batch.
+
+    Raises:
+        ValueError: Unreadable or oversized zip, too many files, or user_ids count mismatch
+    """
+    items: list[BatchItem] = []
+    try:
+        for file in files:
+            filename = file.filename or ""
+            if get_file_extension(filename) == ".zip":
+                archive = await read_upload(file, max_bytes=settings.batch_max_archive_bytes)
+                try:
+                    items.extend(await asyncio.to_thread(_expand_zip, archive, len(items)))
+                finally:
+                    archive.close()
+            else:
+                items.append(await _read_item(len(items), file))
+            if len(items) > settings.batch_max_files:
+                raise ValueError(f"Batch exceeds the limit of {settings.batch_max_files} files.")
+    except BaseException:
+        for item in items:
+            item.release()
+        raise
+
+    if not items:
+        raise ValueError("Batch contains no files.")
+
+    if user_ids:
+        if len(user_ids) != len(items):
+            for item in items:
+                item.release()
+            raise ValueError(
+                f"Got {len(user_ids)} user_ids for {len(items)} files; "
+                "send one per file (empty string to skip saving)."
+            )
+        for item, user_id in zip(items, user_ids):
+            item.user_id = user_id or None
+    return items
+
+
+async def _read_item(index: int, file: UploadFile) -> BatchItem:
+    item = BatchItem(index=index, filename=file.filename or "")
+    ext = get_file_extension(item.filename)
+    if ext not in settings.allowed_extensions:
+        item.error = f"Unsupported: {ext}"
+        return item
+    try:
+        item.upload = await read_upload(file)
+    except ValueError as exc:
+        item.error = str(exc)
+    return item
+
+
+def _expand_zip(archive_upload: SpooledUpload, start: int) -> list[BatchItem]:
+    filename = archive_upload.filename
+    source = archive_upload.source
+    try:
+        archive = zipfile.ZipFile(source if archive_upload.spooled else io.BytesIO(source))
+    except zipfile.BadZipFile as exc:
+        raise ValueError(f"{filename} is not a valid zip archive.") from exc
+
+    items: list[BatchItem] = []
+    try:
+        with archive:
+            manifest = {}
+            if _MANIFEST_NAME in archive.namelist():
+                try:
+                    manifest = json.loads(archive.read(_MANIFEST_NAME))
+                except ValueError as exc:
+                    raise ValueError(f"{filename}: {_MANIFEST_NAME} is not valid JSON.") from exc
+                if not isinstance(manifest, dict):
+                    raise ValueError(f"{filename}: {_MANIFEST_NAME} must map file names to user ids.")
+
+            for info in archive.infolist():
+                path = PurePosixPath(info.filename)
+                if info.is_dir() or info.filename == _MANIFEST_NAME:
+                    continue
+                if path.parts[0] == "__MACOSX" or path.name.startswith("."):
+                    continue
+                item = BatchItem(
+                    index=start + len(items),
+                    filename=info.filename,
+                    user_id=manifest.get(info.filename) or manifest.get(path.name),
+                )
+                ext = get_file_extension(info.filename)
+                if ext not in settings.allowed_extensions:
+                    item.error = f"Unsupported: {ext}"
+                elif info.file_size > settings.max_file_size_bytes:
+                    # Check the declared size before inflating anything
+                    item.error = "File too large"
+                else:
+                    # The cap is enforced again while inflating, in case the header lies
+                    try:
+                        with archive.open(info) as entry:
+                            item.upload = spool_stream(info.filename, entry)
+                    except ValueError as exc:
+                        item.error = str(exc)
+                items.append(item)
+                if start + len(items) > settings.batch_max_files:
+                    raise ValueError(f"Batch exceeds the limit of {settings.batch_max_files} files.")
+    except BaseException:
+        for item in items:
+            item.release()
+        raise
+    return items
+
+
+@dataclass
+class _Work:
+    item: BatchItem
+    started: float
+    cv_text: str = ""
+    cv_data: Optional[ModelExtrationResponse] = None
+
+
+async def run_batch(items: list[BatchItem]) -> AsyncIterator[dict]:
+    """
+    Process items through the staged pipeline.
+
+    Yields one result dict per item as soon as it finishes:
+        {"index", "filename", "user_id", "status": "ok", "data", "seconds"}
+        {"index", "filename", "user_id", "status": "error", "stage", "error", "seconds"}
+
+    Closing the generator early cancels all outstanding work.
+    """
+    parse_workers = max(1, settings.batch_parse_concurrency)
+    llm_workers = max(1, settings.batch_llm_concurrency)
+    db_workers = max(1, settings.batch_db_concurrency)
+
+    # Bounded hand-off queues keep a slow stage from piling up parsed text
+    to_parse: asyncio.Queue = asyncio.Queue()
+    to_analyse: asyncio.Queue = asyncio.Queue(maxsize=llm_workers * 2)
+    to_save: asyncio.Queue = asyncio.Queue(maxsize=db_workers * 2)
+    results: asyncio.Queue = asyncio.Queue()
+
+    def finish(work: _Work, stage: Optional[str] = None, error: Optional[Exception] = None) -> None:
+        item = work.item
+        result = {
+            "index": item.index,
+            "filename": item.filename,
+            "user_id": item.user_id,
+            "status": "ok" if error is None else "error",
+        }
+        if error is None:
+            result["data"] = work.cv_data.model_dump()
+        else:
+            result["stage"] = stage
+            result["error"] = str(error)
+        result["seconds"] = round(time.monotonic() - work.started, 3)
+        results.put_nowait(result)
+
+    async def parse_worker() -> None:
+        while (work := await to_parse.get()) is not _DONE:
+            try:
+                if work.item.error:
+                    raise ValueError(work.item.error)
+                work.cv_text = await extract_upload_text(work.item.upload)
+                if not work.cv_text.strip():
+                    raise ValueError(
+                        "No text could be extracted from the file. "
+                        "Ensure it's not an image-based PDF or corrupted."
+                    )
+            except Exception as exc:
+                logger.warning("Batch item %d (%s) failed to parse: %s", work.item.index, work.item.filename, exc)
+                finish(work, "parse", exc)
+                continue
+            finally:
+                # The file is no longer needed once the text is out
+                work.item.release()
+            await to_analyse.put(work)
+
+    async def analyse_worker() -> None:
+        while (work := await to_analyse.get()) is not _DONE:
+            try:
+                work.cv_data = await analyse_cv(work.cv_text)
+            except Exception as exc:
+                logger.warning("Batch item %d (%s) failed analysis: %s", work.item.index, work.item.filename, exc)
+                finish(work, "analyse", exc)
+                continue
+            if work.item.user_id:
+                await to_save.put(work)
+            else:
+                finish(work)
+
+    async def save_worker() -> None:
+        while (work := await to_save.get()) is not _DONE:
+            try:
+                work.cv_data.skills = canonical_skills(work.cv_data.skills)
+                model_id = await asyncio.to_thread(save_model_extration, work.cv_data, work.item.user_id)
+                logger.info("Batch item %d saved to database with ID: %s", work.item.index, model_id)
+            except Exception as exc:
+                logger.error("Batch item %d database save failed: %s", work.item.index, exc)
+                finish(work, "save", exc)
+                continue
+            try:
+                await asyncio.to_thread(job_catalog.record_profile, work.item.user_id, work.cv_data.skills)
+            except Exception as exc:
+                # The CV is saved; only the matching weights miss it
+                logger.warning("Batch item %d skills not recorded for matching: %s", work.item.index, exc)
+            finally:
+                finish(work)
+
+    async def stage(worker, count: int, outbox: Optional[asyncio.Queue] = None, downstream: int = 0) -> None:
+        # Once every worker of this stage has drained, tell the next stage to stop
+        await asyncio.gather(*(worker() for _ in range(count)))
+        for _ in range(downstream):
+            await outbox.put(_DONE)
+
+    started = time.monotonic()
+    for item in items:
+        to_parse.put_nowait(_Work(item=item, started=started))
+    for _ in range(parse_workers):
+        to_parse.put_nowait(_DONE)
+
+    tasks = [
+        asyncio.create_task(stage(parse_worker, parse_workers, to_analyse, llm_workers)),
+        asyncio.create_task(stage(analyse_worker, llm_workers, to_save, db_workers)),
+        asyncio.create_task(stage(save_worker, db_workers)),
+    ]
+    logger.info(
+        "Batch of %d CVs started (parse=%d, llm=%d, db=%d workers)",
+        len(items), parse_workers, llm_workers, db_workers,
+    )
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for item in items:
+            item.release()
+
+    logger.info("Batch of %d CVs finished in %.1fs", len(items), time.monotonic() - started)
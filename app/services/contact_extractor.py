@@ -0,0 +1,168 @@
+"""
+Rule-based extraction of contact fields (name, email, phone, location).
+
+Runs in microseconds with precompiled patterns. Each field gets a confidence
+score; fields at or above settings.contact_confidence_threshold are taken as
+resolved and left out of the LLM prompt.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from app.services.text_normalizer import PAGE_BREAK, split_sections
+
+CONTACT_FIELDS = ("full_name", "email", "phone", "location")
+
+# ─────────────────────────────────────────────────────────────
+# Patterns (compiled once)
+# ─────────────────────────────────────────────────────────────
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+_PHONE_RE = re.compile(r"(?<![\w+])\+?\(?\d[\d\s().-]{6,18}\d(?!\w)")
+_PHONE_LABEL_RE = re.compile(r"\b(?:phone|mobile|mob|tel|telephone|cell|whatsapp)\b", re.IGNORECASE)
+_YEAR_RANGE_RE = re.compile(r"^(?:19|20)\d{2}\s*[-–]\s*(?:19|20)\d{2}$")
+_NAME_LABEL_RE = re.compile(r"^\s*(?:full\s+)?name\s*[:\-]\s*(.+)$", re.IGNORECASE)
+_LOCATION_LABEL_RE = re.compile(r"^\s*(?:location|address|city|based in)\s*[:\-]\s*(.+)$", re.IGNORECASE)
+_NAME_WORD_RE = re.compile(r"^[^\W\d_][^\W\d_.'’-]*(?:[.'’-][^\W\d_]+)*\.?$")
+_CITY_COUNTRY_RE = re.compile(r"^[^\W\d_][^\W\d_ .'-]*(?:[ .'-][^\W\d_]+)*,\s*[^\W\d_][^\W\d_ .'-]*(?:[ .'-][^\W\d_]+)*$")
+_SEPARATOR_RE = re.compile(r"\s*[|•·●▪◆]\s*|\s{3,}")
+
+_NOT_NAME_WORDS = {
+    "curriculum", "vitae", "resume", "résumé", "cv", "profile", "contact",
+    "developer", "engineer", "manager", "software", "senior", "junior",
+    "intern", "student", "analyst", "designer", "consultant",
+}
+
+# Unlabelled "City, Country" lines are only trusted when the country is known;
+# otherwise "Backend Developer, Microsoft" would pass as a location.
+_COUNTRIES = {
+    "egypt", "saudi arabia", "ksa", "united arab emirates", "uae", "qatar", "kuwait",
+    "bahrain", "oman", "jordan", "lebanon", "syria", "iraq", "palestine", "yemen",
+    "libya", "tunisia", "algeria", "morocco", "sudan", "turkey", "iran", "pakistan",
+    "india", "bangladesh", "malaysia", "indonesia", "singapore", "china", "japan",
+    "south korea", "philippines", "vietnam", "thailand", "australia", "new zealand",
+    "united kingdom", "uk", "england", "scotland", "ireland", "germany", "france",
+    "netherlands", "belgium", "switzerland", "austria", "italy", "spain", "portugal",
+    "sweden", "norway", "denmark", "finland", "poland", "czech republic", "romania",
+    "greece", "ukraine", "russia", "united states", "usa", "us", "canada", "mexico",
+    "brazil", "argentina", "chile", "colombia", "nigeria", "kenya", "south africa",
+    "ethiopia", "ghana",
+}
+
+# Lines of the header block searched for name/location.
+_HEADER_LINES = 8
+
+
+@dataclass
+class ContactExtraction:
+    """Rule-based contact fields with per-field confidence (0–1)."""
+    full_name: str = ""
+    email: str = ""
+    phone: str = ""
+    location: str = ""
+    confidence: dict[str, float] = field(default_factory=dict)
+
+    def resolved(self, threshold: float) -> dict[str, str]:
+        """Fields whose confidence is at least threshold."""
+        return {
+            name: getattr(self, name)
+            for name in CONTACT_FIELDS
+            if getattr(self, name) and self.confidence.get(name, 0.0) >= threshold
+        }
+
+    def values(self) -> dict[str, str]:
+        """Best guess for every field, regardless of confidence."""
+        return {name: getattr(self, name) for name in CONTACT_FIELDS}
+
+
+def extract_contact_fields(cv_text: str) -> ContactExtraction:
+    """Pull name, email, phone and location out of raw CV text."""
+    result = ContactExtraction()
+    text = cv_text.replace(PAGE_BREAK, "\n")
+
+    _find_email(text, result)
+    _find_phone(text, result)
+
+    sections = split_sections(text)
+    header = sections[0].lines if sections and sections[0].name == "header" else []
+    header = [line.strip() for line in header if line.strip()][:_HEADER_LINES]
+    _find_name(text, header, result)
+    _find_location(text, header, result)
+
+    return result
+
+
+# ─────────────────────────────────────────────────────────────
+# Field finders
+# ─────────────────────────────────────────────────────────────
+
+def _find_email(text: str, result: ContactExtraction) -> None:
+    emails = list(dict.fromkeys(m.group(0).rstrip(".") for m in _EMAIL_RE.finditer(text)))
+    if emails:
+        result.email = emails[0]
+        result.confidence["email"] = 0.99 if len(emails) == 1 else 0.9
+
+
+def _find_phone(text: str, result: ContactExtraction) -> None:
+    for line in text.split("\n"):
+        for match in _PHONE_RE.finditer(line):
+            candidate = match.group(0).strip()
+            digits = sum(c.isdigit() for c in candidate)
+            if not 8 <= digits <= 15 or _YEAR_RANGE_RE.match(candidate):
+                continue
+            result.phone = candidate
+            labelled = bool(_PHONE_LABEL_RE.search(line))
+            result.confidence["phone"] = 0.95 if candidate.startswith("+") or labelled else 0.85
+            return
+
+
+def _find_name(text: str, header: list[str], result: ContactExtraction) -> None:
+    for line in text.split("\n")[:40]:
+        labelled = _NAME_LABEL_RE.match(line)
+        if labelled and _looks_like_name(labelled.group(1).strip()):
+            result.full_name = labelled.group(1).strip()
+            result.confidence["full_name"] = 0.95
+            return
+
+    for index, line in enumerate(header):
+        candidate = _SEPARATOR_RE.split(line)[0].strip()
+        if _looks_like_name(candidate):
+            result.full_name = candidate.title() if candidate.isupper() else candidate
+            result.confidence["full_name"] = 0.9 if index == 0 else 0.75
+            return
+
+
+def _find_location(text: str, header: list[str], result: ContactExtraction) -> None:
+    for line in text.split("\n")[:40]:
+        labelled = _LOCATION_LABEL_RE.match(line)
+        if labelled:
+            result.location = labelled.group(1).strip()
+            result.confidence["location"] = 0.9
+            return
+
+    guess = ""
+    for line in header:
+        for part in _SEPARATOR_RE.split(line):
+            part = part.strip()
+            if not _CITY_COUNTRY_RE.match(part) or _EMAIL_RE.search(part):
+                continue
+            if any(w.lower().strip(".") in _NOT_NAME_WORDS for w in part.replace(",", " ").split()):
+                continue
+            if part.rsplit(",", 1)[1].strip().lower().rstrip(".") in _COUNTRIES:
+                result.location = part
+                result.confidence["location"] = 0.8
+                return
+            guess = guess or part
+    if guess:
+        # Left for the LLM to confirm (below the default threshold)
+        result.location = guess
+        result.confidence["location"] = 0.5
+
+
+def _looks_like_name(candidate: str) -> bool:
+    words = candidate.split()
+    if not 2 <= len(words) <= 4 or len(candidate) > 50:
+        return False
+    if any(w.lower().strip(".") in _NOT_NAME_WORDS for w in words):
+        return False
+    return all(_NAME_WORD_RE.match(w) for w in words)
@@ -2,14 +2,52 @@
 CV-analysis service using Groq AI.
 """
 
+import asyncio
+import json
 import logging
-from pydantic import ValidationError
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic import BaseModel, ValidationError
+from app.core.config import settings
 from app.schemas.cv_schema import ModelExtrationResponse
+from app.services.contact_extractor import extract_contact_fields
 from app.services.llm_service import call_llm
-from app.utils.helpers import extract_json_from_llm_response
+from app.services.text_normalizer import PAGE_BREAK, compact_cv_text, estimate_tokens, split_sections, truncate_sections
+from app.utils.json_stream import repair_json
 
 logger = logging.getLogger(__name__)
 
+# JSON schema line(s) for each ModelExtrationResponse field, in prompt order.
+_FIELD_SCHEMAS = {
+    "full_name": '  "full_name": "<string>"',
+    "email": '  "email": "<string>"',
+    "phone": '  "phone": "<string>"',
+    "location": '  "location": "<string>"',
+    "summary": '  "summary": "<string>"',
+    "skills": '  "skills": ["<skill>", ...]',
+    "education": """  "education": [
+    {
+      "degree": "<Bachelor, Master, PhD, etc>",
+      "field": "<major/field of study>",
+      "institution": "<university name>",
+      "year": "<graduation year or attendance years>"
+    }
+  ]""",
+    "experience": """  "experience": [
+    {
+      "job_title": "<title>",
+      "company": "<company name>",
+      "start_date": "<e.g. Jan 2020>",
+      "end_date": "<e.g. Mar 2023 or Present>",
+      "description": "<brief summary of responsibilities>"
+    }
+  ]""",
+    "certifications": '  "certifications": ["<certification name>", ...]',
+    "languages": '  "languages": ["<language + level>", ...]',
+}
+
 _EXTRACTION_PROMPT_TEMPLATE = """
 You are given the following CV / resume text:
 
@@ -20,46 +58,72 @@ You are given the following CV / resume text:
 Extract the information and return it as a single JSON object matching this schema:
 
 {{
-  "full_name": "<string>",
-  "email": "<string>",
-  "phone": "<string>",
-  "location": "<string>",
-  "summary": "<string>",
-  "skills": ["<skill>", ...],
-  "education": [
-    {{
-      "degree": "<Bachelor, Master, PhD, etc>",
-      "field": "<major/field of study>",
-      "institution": "<university name>",
-      "year": "<graduation year or attendance years>"
-    }}
-  ],
-  "experience": [
-    {{
-      "job_title": "<title>",
-      "company": "<company name>",
-      "start_date": "<e.g. Jan 2020>",
-      "end_date": "<e.g. Mar 2023 or Present>",
-      "description": "<brief summary of responsibilities>"
-    }}
-  ],
-  "certifications": ["<certification name>", ...],
-  "languages": ["<language + level>", ...]
+{schema}
 }}
 
 Rules:
 - Return ONLY valid JSON. No markdown fences, no extra text.
+- Return ONLY the fields listed in the schema.
 - If a section is missing, return empty string or empty list.
 - Use camelCase for field names (e.g., "full_name", "job_title").
 """
 
 
-async def analyse_cv(cv_text: str) -> ModelExtrationResponse:
+_SECTION_PROMPT_TEMPLATE = """
+You are given one part of a longer CV / resume:
+
+---
+{cv_text}
+---
+
+Extract only the following fields from this part and return them as a single JSON object:
+
+{{
+{schema}
+}}
+
+Rules:
+- Return ONLY valid JSON. No markdown fences, no extra text.
+- Return ONLY the fields listed in the schema.
+- Use only information present in this part; if a field is not covered, return empty string or empty list.
+- Use camelCase for field names (e.g., "full_name", "job_title").
+"""
+
+# CV sections (text_normalizer.split_sections names) that get their own prompt,
+# and the field each one fills. Everything else goes to the general prompt.
+_SECTION_FIELDS = {
+    "experience": "experience",
+    "education": "education",
+    "skills": "skills",
+    "certifications": "certifications",
+    "courses": "certifications",
+    "languages": "languages",
+}
+
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
+@dataclass
+class _ExtractionTask:
+    """One focused extraction prompt: some CV text and the fields to pull from it."""
+    fields: list[str]
+    text: str
+
+
+async def analyse_cv(cv_text: str, contact_only: bool = False) -> ModelExtrationResponse:
     """
     Analyze CV text and return structured ModelExtration data.
     
+    Contact fields found by the rule-based pre-extractor with enough
+    confidence are filled directly and not requested from the LLM.
+    
+    Long CVs (over settings.cv_section_split_min_tokens) are segmented on
+    their section headings and each section group is extracted by its own
+    prompt, concurrently; the partial results are merged in document order.
+    
     Args:
         cv_text: Plain text extracted from uploaded CV
+        contact_only: Return only name/email/phone/location and skip the LLM
         
     Returns:
         ModelExtrationResponse matching Career_Path.Entities.ModelExtration
@@ -67,20 +131,180 @@ async def analyse_cv(cv_text: str) -> ModelExtrationResponse:
     if not cv_text.strip():
         raise ValueError("CV text is empty — nothing to analyse.")
 
-    prompt = _EXTRACTION_PROMPT_TEMPLATE.format(cv_text=cv_text)
+    # Run on the raw text: compaction may strip contact lines from page headers/footers
+    contact = extract_contact_fields(cv_text)
+    logger.info("Contact pre-extraction confidence: %s", contact.confidence)
+
+    if contact_only:
+        return ModelExtrationResponse.model_validate(contact.values())
+
+    resolved = contact.resolved(settings.contact_confidence_threshold)
+    pending_fields = [name for name in _FIELD_SCHEMAS if name not in resolved]
+
+    if settings.cv_compaction_enabled:
+        # Segmented extraction has its own per-prompt limit, so it can take more text
+        budget = (
+            settings.cv_section_split_max_tokens
+            if settings.cv_section_split_enabled
+            else settings.cv_max_prompt_tokens
+        )
+        compaction = compact_cv_text(cv_text, max_tokens=budget)
+        logger.info(
+            "CV text compacted: %d → %d tokens (saved %d, %.0f%%%s)",
+            compaction.original_tokens,
+            compaction.compacted_tokens,
+            compaction.saved_tokens,
+            compaction.saved_ratio * 100,
+            ", truncated" if compaction.truncated else "",
+        )
+        cv_text = compaction.text
+    else:
+        cv_text = cv_text.replace(PAGE_BREAK, "\n\n")
+
+    tasks = None
+    if settings.cv_section_split_enabled and estimate_tokens(cv_text) > settings.cv_section_split_min_tokens:
+        tasks = _plan_section_tasks(cv_text, pending_fields)
+
+    if tasks:
+        logger.info("Long CV: extracting %d sections concurrently", len(tasks))
+        parts = await asyncio.gather(*(
+            _extract_fields(task.text, task.fields, _SECTION_PROMPT_TEMPLATE) for task in tasks
+        ))
+        cv_response = _merge_extractions(tasks, parts)
+    else:
+        # Not segmentable: back to the single-prompt budget
+        cv_text = truncate_sections(cv_text, settings.cv_max_prompt_tokens)
+        cv_response = await _extract_fields(cv_text, pending_fields, _EXTRACTION_PROMPT_TEMPLATE)
+
+    if resolved:
+        cv_response = cv_response.model_copy(update=resolved)
+
+    logger.info("CV analysis complete - extracted data for: %s", cv_response.full_name)
+    return cv_response
+
+
+async def _extract_fields(cv_text: str, fields: list[str], template: str) -> ModelExtrationResponse:
+    """Run one extraction prompt for the given fields and validate the reply."""
+    prompt = template.format(
+        cv_text=cv_text,
+        schema=",\n".join(_FIELD_SCHEMAS[name] for name in fields),
+    )
     raw_response: str = await call_llm(prompt)
 
     try:
-        parsed: dict = extract_json_from_llm_response(raw_response)
+        json_text = repair_json(raw_response)
     except Exception as exc:
         logger.error("Failed to parse LLM JSON response:\n%s", raw_response)
         raise RuntimeError("LLM returned invalid JSON.") from exc
 
     try:
-        cv_response = ModelExtrationResponse.model_validate(parsed)
+        return ModelExtrationResponse.model_validate_json(json_text)
     except ValidationError as exc:
         logger.error("Pydantic validation error: %s", exc)
         raise ValueError(f"Data does not match schema: {exc}") from exc
 
-    logger.info("CV analysis complete - extracted data for: %s", cv_response.full_name)
-    return cv_response
+
+# ─────────────────────────────────────────────────────────────
+# Section segmentation
+# ─────────────────────────────────────────────────────────────
+
+def _plan_section_tasks(cv_text: str, fields: list[str]) -> Optional[list[_ExtractionTask]]:
+    """
+    Group CV sections into focused extraction tasks.
+
+    The general task (header, summary and unrecognised sections) asks for
+    every pending field without a section of its own; when the CV has no
+    such text, it gets the CV's leading lines instead, so those fields are
+    always requested. Sections longer than
+    settings.cv_section_max_prompt_tokens are cut into several tasks at
+    line boundaries, preferring lines that start a dated entry. Returns
+    None when fewer than two dedicated sections were found.
+    """
+    grouped: dict[str, list[str]] = {}
+    general: list[str] = []
+    for section in split_sections(cv_text):
+        field_name = _SECTION_FIELDS.get(section.name)
+        if field_name in fields:
+            grouped.setdefault(field_name, []).append(section.text)
+        else:
+            general.append(section.text)
+
+    if len(grouped) < 2:
+        return None
+
+    tasks = []
+    general_fields = [name for name in fields if name not in grouped]
+    if general_fields and general:
+        tasks.extend(
+            _ExtractionTask(general_fields, chunk)
+            for chunk in _chunk_text("\n".join(general), settings.cv_section_max_prompt_tokens)
+        )
+    elif general_fields:
+        # No header/summary text of its own: the top of the CV is where name and contact lines are
+        leading = _chunk_text(cv_text, settings.cv_section_max_prompt_tokens)[0]
+        tasks.append(_ExtractionTask(general_fields, leading))
+    for field_name in fields:
+        if field_name in grouped:
+            tasks.extend(
+                _ExtractionTask([field_name], chunk)
+                for chunk in _chunk_text("\n".join(grouped[field_name]), settings.cv_section_max_prompt_tokens)
+            )
+    return tasks
+
+
+def _chunk_text(text: str, max_tokens: int) -> list[str]:
+    """Split text into pieces of at most max_tokens (estimated) at line boundaries."""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    chunks: list[str] = []
+    current: list[str] = []
+    used = 0
+    for line in text.split("\n"):
+        cost = estimate_tokens(line) + 1
+        if current and used + cost > max_tokens:
+            # Start the next chunk at the last dated line (an entry header) in the back half
+            cut = len(current)
+            for i in range(len(current) - 1, len(current) // 2, -1):
+                if _YEAR_RE.search(current[i]):
+                    cut = i
+                    break
+            chunks.append("\n".join(current[:cut]))
+            current = current[cut:]
+            used = sum(estimate_tokens(l) + 1 for l in current)
+        current.append(line)
+        used += cost
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _merge_extractions(
+    tasks: list[_ExtractionTask],
+    parts: list[ModelExtrationResponse],
+) -> ModelExtrationResponse:
+    """
+    Combine partial extractions, taking from each part only the fields its
+    task asked for. Strings keep the first non-empty value; lists are
+    concatenated in task (document) order without case-insensitive duplicates.
+    """
+    merged: dict = {}
+    for task, part in zip(tasks, parts):
+        for name in task.fields:
+            value = getattr(part, name)
+            if isinstance(value, list):
+                items = merged.setdefault(name, [])
+                seen = {_dedupe_key(item) for item in items}
+                for item in value:
+                    key = _dedupe_key(item)
+                    if key not in seen:
+                        seen.add(key)
+                        items.append(item)
+            elif value and not merged.get(name):
+                merged[name] = value
+    return ModelExtrationResponse.model_validate(merged)
+
+
+def _dedupe_key(item) -> str:
+    if isinstance(item, BaseModel):
+        return json.dumps(item.model_dump(), sort_keys=True).lower()
+    return " ".join(str(item).lower().split())
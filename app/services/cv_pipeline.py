@@ -0,0 +1,109 @@
+"""
+CV processing pipeline: text extraction → AI analysis → optional DB save.
+
+Identical uploads arriving concurrently (double-clicks, client retries) are
+coalesced on (file hash, user id) so the work runs once.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.schemas.cv_schema import ModelExtrationResponse
+from app.services.cv_analyzer import analyse_cv
+from app.services.database import save_model_extration
+from app.services.file_parser import extract_upload_text
+from app.services.job_catalog import job_catalog
+from app.services.skill_dictionary import canonical_skills
+from app.utils.singleflight import SingleFlight
+from app.utils.uploads import SpooledUpload
+
+logger = logging.getLogger(__name__)
+
+_parse_flight = SingleFlight("parse-cv")
+
+
+class CVSaveError(RuntimeError):
+    """CV was analysed but could not be written to the database."""
+
+
+async def process_cv(
+    upload: SpooledUpload,
+    user_id: Optional[str] = None,
+    contact_only: bool = False,
+) -> ModelExtrationResponse:
+    """
+    Extract, analyse and (if user_id is given) save a CV.
+
+    With contact_only, only name/email/phone/location are extracted (no LLM
+    call) and nothing is saved, since that would wipe the stored profile.
+
+    Takes ownership of upload: it is closed (spool file deleted) once it is
+    no longer needed, even if the caller goes away first.
+
+    Raises:
+        ValueError: File has no extractable text or is otherwise invalid
+        CVSaveError: Analysis succeeded but the database save failed
+    """
+    led = False
+
+    async def run() -> ModelExtrationResponse:
+        try:
+            return await _run(upload, user_id, contact_only)
+        finally:
+            upload.close()
+
+    def lead():
+        nonlocal led
+        led = True
+        return run()
+
+    try:
+        check_cv_options(user_id, contact_only)
+        return await _parse_flight.do((upload.sha256, user_id, contact_only), lead)
+    finally:
+        # The leader's run closes its own upload; a follower's is unused
+        if not led:
+            upload.close()
+
+
+def check_cv_options(user_id: Optional[str], contact_only: bool) -> None:
+    """Raise ValueError for option combinations process_cv rejects."""
+    if contact_only and user_id:
+        raise ValueError("Contact-only extraction cannot be saved; omit user_id or use full mode.")
+
+
+async def _run(
+    upload: SpooledUpload,
+    user_id: Optional[str],
+    contact_only: bool,
+) -> ModelExtrationResponse:
+    # Extract text (skipped when this file's text is cached)
+    cv_text = await extract_upload_text(upload)
+    if not cv_text.strip():
+        raise ValueError(
+            "No text could be extracted from the file. "
+            "Ensure it's not an image-based PDF or corrupted."
+        )
+
+    logger.info(f"Extracted {len(cv_text)} characters from {upload.filename}")
+
+    # Analyze CV
+    cv_data = await analyse_cv(cv_text, contact_only=contact_only)
+
+    # Save to database if user_id provided (under canonical skill names;
+    # previews keep the CV's own spelling)
+    if user_id:
+        cv_data.skills = canonical_skills(cv_data.skills)
+        try:
+            model_id = save_model_extration(cv_data, user_id)
+            logger.info(f"CV data saved to database with ID: {model_id}")
+        except Exception as db_error:
+            logger.error(f"Database save failed: {db_error}")
+            raise CVSaveError(
+                f"CV parsed successfully but database save failed: {str(db_error)}"
+            ) from db_error
+        # Saved profiles count towards the skill weights of weighted matching
+        await asyncio.to_thread(job_catalog.record_profile, user_id, cv_data.skills)
+
+    return cv_data
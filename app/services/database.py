@@ -320,6 +320,36 @@ def get_model_extration_by_user(application_user_id: str) -> Optional[dict]:
         session.close()
 
 
+def get_all_profile_skills() -> Optional[dict[str, list[str]]]:
+    """
+    Skills of every saved ModelExtration, by ApplicationUserId.
+    
+    Returns:
+        Dictionary of user id → skills, or None if the database is unreachable
+        or the query fails (startup then keeps the recorded profiles)
+    """
+    try:
+        session = get_db_session()
+    except Exception:
+        logger.exception("Failed to open a session to load profile skills")
+        return None
+    
+    try:
+        query = text("""
+            SELECT ApplicationUserId, Skills
+            FROM ModelExtrations
+        """)
+        
+        rows = session.execute(query).fetchall()
+        return {user_id: json.loads(skills) if skills else [] for user_id, skills in rows}
+        
+    except Exception as exc:
+        logger.exception("Failed to load profile skills")
+        return None
+    finally:
+        session.close()
+
+
 def delete_model_extration(application_user_id: str) -> bool:
     """
     Delete ModelExtration for a user.
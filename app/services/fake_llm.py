@@ -0,0 +1,202 @@
+"""
+In-process fake LLM backend for offline and load testing.
+
+Selected with LLM_BACKEND=fake. It answers with schema-valid JSON for the
+fields the prompt's schema asks for (ModelExtrationResponse fields for CV
+extraction, RoadmapResponse fields for roadmaps), so the whole
+/parse-cv and /generate-roadmap pipeline runs without network access.
+
+Configurable through settings (FAKE_LLM_*):
+    latency_ms / latency_sigma   – lognormal time to first token
+    tokens_per_second            – output rate (0 = instant)
+    rate_limit_probability       – share of requests rejected with a 429
+    retry_after_seconds          – retry-after sent with injected 429s
+    seed                         – makes latency and 429 injection reproducible
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+from typing import AsyncIterator, Mapping, Optional
+
+from app.core.config import settings
+from app.services.llm_backends import LLMBackendError, LLMCompletion
+
+_SCHEMA_KEY_RE = re.compile(r'^\s*"(\w+)"\s*:', re.MULTILINE)
+_USER_ID_RE = re.compile(r'"userId"\s*:\s*"([^"]*)"')
+_PHASE_RANGE_RE = re.compile(r"phases Month(\d+) through Month(\d+)")
+_CV_TEXT_RE = re.compile(r"---\n(.*?)\n---", re.DOTALL)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+
+_KNOWN_SKILLS = [
+    "C#", ".NET", "ASP.NET Core", "Entity Framework", "EF Core", "LINQ", "SQL Server",
+    "SQL", "Python", "JavaScript", "TypeScript", "React", "Angular", "Docker",
+    "Kubernetes", "Azure", "AWS", "Git", "REST", "Redis", "RabbitMQ", "xUnit",
+]
+
+_IMPROVEMENT_AREAS = [
+    "Architecture", "Database", "Security", "Testing", "Validation",
+    "Logging", "Error Handling", "API Design", "Dependency Injection", "Code Quality",
+]
+
+_CHARS_PER_TOKEN = 4
+_STREAM_CHUNK_CHARS = 16
+
+
+class _FakeStream:
+    def __init__(self, backend: "FakeLLMBackend", text: str, first_token_delay: float):
+        self._backend = backend
+        self._text = text
+        self._first_token_delay = first_token_delay
+        self.headers: Mapping[str, str] = {}
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        await asyncio.sleep(self._first_token_delay)
+        chunk_delay = self._backend.output_seconds(_STREAM_CHUNK_CHARS)
+        for start in range(0, len(self._text), _STREAM_CHUNK_CHARS):
+            if chunk_delay:
+                await asyncio.sleep(chunk_delay)
+            yield self._text[start:start + _STREAM_CHUNK_CHARS]
+
+    async def close(self) -> None:
+        return None
+
+
+class FakeLLMBackend:
+    """Deterministic-content, configurable-latency stand-in for Groq."""
+
+    model = "fake"
+
+    def __init__(self, seed: Optional[int] = None):
+        self._random = random.Random(seed if seed is not None else settings.fake_llm_seed)
+        self.requests = 0
+
+    def check_configured(self) -> None:
+        return None
+
+    async def complete(self, messages: list[dict], max_tokens: int, timeout: float) -> LLMCompletion:
+        prompt = messages[-1]["content"]
+        self._maybe_rate_limit()
+        text = self._respond(prompt, max_tokens)
+        await asyncio.sleep(self._first_token_delay() + self.output_seconds(len(text)))
+        return LLMCompletion(
+            text=text,
+            total_tokens=_tokens(prompt) + _tokens(text),
+            headers={},
+        )
+
+    async def stream(self, messages: list[dict], max_tokens: int, timeout: float) -> _FakeStream:
+        prompt = messages[-1]["content"]
+        self._maybe_rate_limit()
+        return _FakeStream(self, self._respond(prompt, max_tokens), self._first_token_delay())
+
+    async def close(self) -> None:
+        return None
+
+    def output_seconds(self, chars: int) -> float:
+        rate = settings.fake_llm_tokens_per_second
+        return (chars / _CHARS_PER_TOKEN) / rate if rate > 0 else 0.0
+
+    # ── Behaviour knobs ──────────────────────────────────────
+
+    def _first_token_delay(self) -> float:
+        median = settings.fake_llm_latency_ms / 1000.0
+        if median <= 0:
+            return 0.0
+        return self._random.lognormvariate(math.log(median), settings.fake_llm_latency_sigma)
+
+    def _maybe_rate_limit(self) -> None:
+        self.requests += 1
+        if self._random.random() < settings.fake_llm_rate_limit_probability:
+            raise LLMBackendError(
+                "Fake backend: rate limit reached (injected 429)",
+                retryable=True,
+                rate_limited=True,
+                headers={"retry-after": str(settings.fake_llm_retry_after_seconds)},
+            )
+
+    # ── Response generation ──────────────────────────────────
+
+    def _respond(self, prompt: str, max_tokens: int) -> str:
+        keys = list(dict.fromkeys(_SCHEMA_KEY_RE.findall(prompt)))
+        if "roadmap" in keys or "project_improvements" in keys or "mermaid_code" in keys:
+            body = _roadmap_fields(prompt, keys)
+        else:
+            body = _cv_fields(prompt, keys)
+        text = json.dumps(body, indent=2, ensure_ascii=False)
+        # Honour max_tokens like a real model: cut the output off
+        return text[: max_tokens * _CHARS_PER_TOKEN]
+
+
+def _tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+def _cv_fields(prompt: str, keys: list[str]) -> dict:
+    match = _CV_TEXT_RE.search(prompt)
+    cv_text = match.group(1) if match else prompt
+    lines = [line.strip() for line in cv_text.split("\n") if line.strip()]
+    lowered = cv_text.lower()
+    email = _EMAIL_RE.search(cv_text)
+    phone = _PHONE_RE.search(cv_text)
+
+    values = {
+        "full_name": lines[0] if lines else "",
+        "email": email.group(0) if email else "",
+        "phone": phone.group(0).strip() if phone else "",
+        "location": "",
+        "summary": " ".join(lines[1:3])[:300],
+        "skills": [s for s in _KNOWN_SKILLS if s.lower() in lowered] or ["Communication"],
+        "education": [
+            {"degree": "Bachelor", "field": "Computer Science", "institution": "University", "year": "2020"}
+        ],
+        "experience": [
+            {
+                "job_title": "Software Developer",
+                "company": "Company",
+                "start_date": "Jan 2021",
+                "end_date": "Present",
+                "description": "Built and maintained web applications.",
+            }
+        ],
+        "certifications": [],
+        "languages": ["English - Fluent"],
+    }
+    return {key: values[key] for key in keys if key in values}
+
+
+def _roadmap_fields(prompt: str, keys: list[str]) -> dict:
+    user_id = _USER_ID_RE.search(prompt)
+    # Fan-out prompts ask for a subset of the phases
+    phase_range = _PHASE_RANGE_RE.search(prompt)
+    first, last = (int(phase_range.group(1)), int(phase_range.group(2))) if phase_range else (1, 6)
+    phases = [
+        {
+            "phase": f"Month{n}",
+            "focus": [f"Focus skill {n}A", f"Focus skill {n}B"],
+            "topics": [f"Topic {n}.{t}" for t in range(1, 9)],
+            "projects": [f"Project {n}.{p}: build a .NET service" for p in range(1, 4)],
+        }
+        for n in range(first, last + 1)
+    ]
+    mermaid = "graph TD\nStart[Current: Junior] --> Month1[Month 1]\n" + "".join(
+        f"Month{n} --> Month{n + 1}[Month {n + 1}]\n" for n in range(1, 6)
+    ) + "Month6 --> End[Target: MidLevel]"
+    values = {
+        "userId": user_id.group(1) if user_id else "",
+        "roadmap_duration": "6 months",
+        "project_improvements": [
+            {
+                "area": area,
+                "current_issue": f"The {area.lower()} approach is ad hoc.",
+                "recommended_improvement": f"Adopt a standard {area.lower()} practice in ASP.NET Core.",
+            }
+            for area in _IMPROVEMENT_AREAS
+        ],
+        "roadmap": phases,
+        "mermaid_code": mermaid,
+    }
+    return {key: values[key] for key in keys if key in values}
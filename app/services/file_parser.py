@@ -2,47 +2,439 @@
 File parsing service - PDF and DOCX.
 """
 
+import asyncio
 import io
 import logging
+import mmap
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import BinaryIO, Iterator, Optional, Union
+
 import pdfplumber
-from docx import Document
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import PDFStream, resolve1
+from pdfminer.psparser import LIT
+
+from app.core.config import settings
+from app.services.parser_pool import parser_pool
+from app.services.text_normalizer import PAGE_BREAK, estimate_tokens
+from app.utils.cache import TieredCache
 from app.utils.helpers import get_file_extension
+from app.utils.uploads import SpooledUpload
 
 logger = logging.getLogger(__name__)
 
+LITERAL_IMAGE = LIT("Image")
+
+# Part of the text cache key; bump when extraction output changes
+_EXTRACTOR_VERSION = 2
+
+_text_cache = TieredCache(
+    "text",
+    max_entries=settings.text_cache_max_entries,
+    ttl_seconds=settings.text_cache_ttl_seconds,
+    disk_path=settings.text_cache_path,
+    max_bytes=settings.text_cache_max_bytes,
+)
+_text_cache_stats = {"bytes_saved": 0}
 
-async def extract_text(file_bytes: bytes, filename: str) -> str:
-    """Extract text from PDF or DOCX file."""
+
+async def extract_text(source: Union[bytes, str], filename: str) -> str:
+    """
+    Extract text from PDF or DOCX file.
+
+    source is the file content, or the path of a spooled upload (opened
+    with mmap by the parser, so only a path crosses to the worker process).
+    Parsing runs in the parser process pool (see parser_pool); PDFs are
+    split into page chunks that run in parallel (see _extract_pdf).
+
+    Raises:
+        ValueError: Unsupported extension
+        ParseTimeoutError: Parsing exceeded settings.parse_timeout_seconds
+    """
     ext = get_file_extension(filename)
 
     if ext == ".pdf":
-        return _parse_pdf(file_bytes)
+        return await _extract_pdf(source)
     elif ext == ".docx":
-        return _parse_docx(file_bytes)
+        return await parser_pool.run(_parse_docx, source)
     else:
         raise ValueError(f"Unsupported file extension: {ext}")
 
 
-def _parse_pdf(data: bytes) -> str:
-    """Extract text from PDF."""
-    text_pages = []
-    with pdfplumber.open(io.BytesIO(data)) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_pages.append(page_text)
-    
-    full_text = "\n\n".join(text_pages).strip()
+async def extract_upload_text(upload: SpooledUpload) -> str:
+    """
+    extract_text with a cache of extracted text keyed on the upload's SHA-256.
+
+    A hit skips parsing entirely. The key includes the settings that change
+    PDF output, so changing them doesn't serve stale text.
+    """
+    if not settings.text_cache_enabled:
+        return await extract_text(upload.source, upload.filename)
+
+    ext = get_file_extension(upload.filename)
+    cache_key = f"{_EXTRACTOR_VERSION}:{upload.sha256}:{ext}:{settings.pdf_text_mode}:{settings.pdf_max_chars}:{settings.pdf_max_tokens}"
+    cached = _text_cache.get(cache_key)
+    if cached is not None:
+        _text_cache_stats["bytes_saved"] += upload.size
+        logger.info("Text cache hit for %s (%d bytes not parsed)", upload.filename, upload.size)
+        return cached
+
+    text = await extract_text(upload.source, upload.filename)
+    if text.strip():
+        _text_cache.set(cache_key, text)
+    return text
+
+
+def get_text_cache_stats() -> dict:
+    """Text cache counters plus the file bytes that did not need parsing."""
+    return {**_text_cache.stats(), **_text_cache_stats, "enabled": settings.text_cache_enabled}
+
+
+class _MappedFile(io.RawIOBase):
+    """Read-only, seekable file object over an mmap (zipfile needs seekable())."""
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._mapped.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._mapped.seek(offset, whence)
+        return self._mapped.tell()
+
+    def tell(self) -> int:
+        return self._mapped.tell()
+
+
+@contextmanager
+def _open_source(source: Union[bytes, str]) -> Iterator[BinaryIO]:
+    """File object over in-memory bytes or a memory-mapped spool file."""
+    if isinstance(source, (bytes, bytearray)):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield io.BufferedReader(_MappedFile(mapped))
+
+
+# ─────────────────────────────────────────────────────────────
+# PDF
+# ─────────────────────────────────────────────────────────────
+
+@dataclass
+class _PdfChunk:
+    """Text of a run of pages, as returned by a parser worker."""
+    page_count: int
+    pages: list[str]
+    image_only: bool = False    # first page had images but no text
+    budget_reached: bool = False
+
+
+async def _extract_pdf(source: Union[bytes, str]) -> str:
+    """
+    Extract PDF text in page chunks, several chunks at a time.
+
+    The first chunk tells us the page count and whether the document is
+    image-only (page one has images and no text), in which case nothing
+    else is parsed. Remaining pages are fanned out over the parser pool in
+    waves; extraction stops once settings.pdf_max_chars / pdf_max_tokens
+    worth of text has been collected. All chunks share one parse deadline.
+    """
+    deadline = parser_pool.deadline()
+    per_task = max(1, settings.pdf_pages_per_task)
+    width = max(1, min(settings.pdf_parallel_tasks, parser_pool.workers or 1))
+    max_chars, max_tokens = settings.pdf_max_chars, settings.pdf_max_tokens
+
+    first = await parser_pool.run(
+        partial(_parse_pdf_pages, start=0, stop=per_task, max_chars=max_chars, max_tokens=max_tokens),
+        source,
+        deadline,
+    )
+    pages = first.pages
+    if first.image_only:
+        logger.warning("PDF looks image-only (no text layer on page 1); skipping the remaining %d pages.", first.page_count - 1)
+        return ""
+
+    next_page = per_task
+    done = first.budget_reached
+    while not done and next_page < first.page_count:
+        remaining_chars = max_chars - _text_length(pages) if max_chars else 0
+        remaining_tokens = max_tokens - estimate_tokens(PAGE_BREAK.join(pages)) if max_tokens else 0
+        ranges = [
+            (start, min(start + per_task, first.page_count))
+            for start in range(next_page, min(next_page + width * per_task, first.page_count), per_task)
+        ]
+        chunks = await asyncio.gather(*(
+            parser_pool.run(
+                partial(_parse_pdf_pages, start=start, stop=stop, max_chars=remaining_chars, max_tokens=remaining_tokens),
+                source,
+                deadline,
+            )
+            for start, stop in ranges
+        ))
+        for chunk in chunks:
+            pages.extend(chunk.pages)
+            if chunk.budget_reached or _over_budget(pages, max_chars, max_tokens):
+                done = True
+                break
+        next_page = ranges[-1][1]
+
+    if done and next_page < first.page_count:
+        logger.info("PDF text budget reached after %d of %d pages", len(pages), first.page_count)
+
+    # Keep page boundaries so repeated headers/footers can be detected later
+    full_text = PAGE_BREAK.join(text for text in pages if text).strip()
     if not full_text:
         logger.warning("PDF extraction returned empty text.")
     return full_text
 
 
-def _parse_docx(data: bytes) -> str:
-    """Extract text from DOCX."""
-    doc = Document(io.BytesIO(data))
-    paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-    full_text = "\n".join(paragraphs).strip()
+def _parse_pdf_pages(
+    source: Union[bytes, str],
+    start: int,
+    stop: int,
+    max_chars: int = 0,
+    max_tokens: int = 0,
+) -> _PdfChunk:
+    """Extract pages [start, stop) in a parser worker, stopping early once over budget."""
+    pages: list[str] = []
+    with _open_source(source) as stream:
+        if settings.pdf_text_mode == "layout":
+            with pdfplumber.open(stream, pages=list(range(start + 1, stop + 1))) as pdf:
+                page_count = _page_count(pdf.doc)
+                for page in pdf.pages:
+                    pages.append(page.extract_text() or "")
+                    if len(pages) == 1 and start == 0 and _image_only(pages[0], page.page_obj):
+                        return _PdfChunk(page_count, pages, image_only=True)
+                    if _over_budget(pages, max_chars, max_tokens):
+                        return _PdfChunk(page_count, pages, budget_reached=True)
+                return _PdfChunk(page_count, pages)
+
+        doc = PDFDocument(PDFParser(stream))
+        page_count = _page_count(doc)
+        resources = PDFResourceManager(caching=True)
+        device = _PlainTextDevice(resources)
+        interpreter = PDFPageInterpreter(resources, device)
+        for number, page in enumerate(PDFPage.create_pages(doc)):
+            if number < start:
+                continue
+            if number >= stop:
+                break
+            interpreter.process_page(page)
+            pages.append(device.take_text())
+            if number == 0 and _image_only(pages[0], page):
+                return _PdfChunk(page_count, pages, image_only=True)
+            if _over_budget(pages, max_chars, max_tokens):
+                return _PdfChunk(page_count, pages, budget_reached=True)
+    return _PdfChunk(page_count, pages)
+
+
+class _PlainTextDevice(PDFTextDevice):
+    """
+    Text in content-stream order, without pdfminer's layout analysis.
+
+    A line break is emitted when the baseline moves by more than half the
+    font size and a space when a horizontal gap is left between glyphs,
+    which is enough structure for the CV text pipeline at a fraction of
+    the cost of LAParams/pdfplumber grouping.
+    """
+
+    def __init__(self, resources: PDFResourceManager):
+        super().__init__(resources)
+        self._parts: list[str] = []
+        self._last: Optional[tuple[float, float, float]] = None    # (x end, baseline, size)
+
+    def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate) -> float:
+        try:
+            text = font.to_unichr(cid)
+        except PDFUnicodeNotDefined:
+            text = ""
+        advance = font.char_width(cid) * fontsize * scaling
+        a, b, c, d, x, y = matrix
+        size = fontsize * (abs(d) or abs(b) or 1.0)
+        if self._last is not None:
+            last_x, last_y, last_size = self._last
+            if abs(y - last_y) > last_size * 0.5:
+                self._parts.append("\n")
+            elif x - last_x > last_size * 0.2 and text != " " and self._parts[-1:] != [" "]:
+                self._parts.append(" ")
+        self._parts.append(text)
+        self._last = (x + advance * a, y, size)
+        return advance
+
+    def take_text(self) -> str:
+        text = "".join(self._parts).strip()
+        self._parts, self._last = [], None
+        return text
+
+
+def _page_count(doc: PDFDocument) -> int:
+    try:
+        return int(resolve1(resolve1(doc.catalog["Pages"])["Count"]))
+    except (KeyError, TypeError, ValueError):
+        return sum(1 for _ in PDFPage.create_pages(doc))
+
+
+def _image_only(text: str, page: PDFPage) -> bool:
+    """No text on the page but at least one image XObject (a scanned page)."""
+    if text.strip():
+        return False
+    xobjects = resolve1((page.resources or {}).get("XObject")) or {}
+    for xobject in xobjects.values():
+        xobject = resolve1(xobject)
+        if isinstance(xobject, PDFStream) and xobject.get("Subtype") is LITERAL_IMAGE:
+            return True
+    return False
+
+
+def _over_budget(pages: list[str], max_chars: int, max_tokens: int) -> bool:
+    if max_chars and _text_length(pages) >= max_chars:
+        return True
+    return bool(max_tokens) and estimate_tokens(PAGE_BREAK.join(pages)) >= max_tokens
+
+
+def _text_length(pages: list[str]) -> int:
+    return sum(len(text) for text in pages)
+
+
+# ─────────────────────────────────────────────────────────────
+# DOCX
+# ─────────────────────────────────────────────────────────────
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_BODY_PART = "word/document.xml"
+_DOCX_HEADER_RE = re.compile(r"word/header\d*\.xml")
+_DOCX_FOOTER_RE = re.compile(r"word/footer\d*\.xml")
+
+# Run-level elements that stand for a character
+_DOCX_CHARS = {_W + "tab": "\t", _W + "br": "\n", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+
+
+def _parse_docx(source: Union[bytes, str]) -> str:
+    """
+    Extract text from DOCX by streaming its XML parts.
+
+    Headers, the body and footers are read with iterparse in that order,
+    without building a document model. Paragraph text (including text boxes)
+    and table rows ("cell | cell") are emitted in reading order, and each
+    finished block is dropped, so memory stays flat for large documents.
+    """
+    with _open_source(source) as stream:
+        try:
+            archive = zipfile.ZipFile(stream)
+        except zipfile.BadZipFile as exc:
+            raise ValueError("File is not a valid DOCX (zip) document.") from exc
+        with archive:
+            names = archive.namelist()
+            if _DOCX_BODY_PART not in names:
+                raise ValueError("File is not a valid DOCX document (word/document.xml is missing).")
+            parts = (
+                sorted(n for n in names if _DOCX_HEADER_RE.fullmatch(n))
+                + [_DOCX_BODY_PART]
+                + sorted(n for n in names if _DOCX_FOOTER_RE.fullmatch(n))
+            )
+            lines: list[str] = []
+            for part in parts:
+                with archive.open(part) as xml:
+                    lines.extend(_docx_part_lines(xml))
+
+    full_text = "\n".join(lines).strip()
     if not full_text:
         logger.warning("DOCX extraction returned empty text.")
     return full_text
+
+
+def _docx_part_lines(xml: BinaryIO) -> Iterator[str]:
+    """Yield the non-empty paragraph / table-row lines of one WordprocessingML part."""
+    lines: list[str] = []
+    paragraphs: list[list[str]] = []     # open paragraphs (text boxes nest inside runs)
+    tables: list[dict] = []              # open tables: {"cells": [...], "cell": [...]}
+    elements: list[ET.Element] = []
+    fallback_depth = 0                   # inside mc:Fallback (duplicate of mc:Choice)
+    blocks = 0                           # open w:p / w:tbl
+
+    def emit(text: str) -> None:
+        text = text.strip()
+        if not text:
+            return
+        if tables:
+            tables[-1]["cell"].append(text)
+        else:
+            lines.append(text)
+
+    for event, elem in ET.iterparse(xml, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            elements.append(elem)
+            if tag == _MC_FALLBACK:
+                fallback_depth += 1
+            if fallback_depth:
+                continue
+            if tag == _W + "p":
+                paragraphs.append([])
+                blocks += 1
+            elif tag == _W + "tbl":
+                tables.append({"cells": [], "cell": []})
+                blocks += 1
+            elif tag == _W + "tr" and tables:
+                tables[-1]["cells"] = []
+            elif tag == _W + "tc" and tables:
+                tables[-1]["cell"] = []
+            continue
+
+        elements.pop()
+        if tag == _MC_FALLBACK:
+            fallback_depth -= 1
+            continue
+        if fallback_depth:
+            continue
+
+        if tag == _W + "t":
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag in _DOCX_CHARS:
+            if paragraphs:
+                paragraphs[-1].append(_DOCX_CHARS[tag])
+        elif tag == _W + "p" and paragraphs:
+            emit("".join(paragraphs.pop()))
+            blocks -= 1
+        elif tag == _W + "tc" and tables:
+            table = tables[-1]
+            table["cells"].append(" ".join(table["cell"]))
+            table["cell"] = []
+        elif tag == _W + "tr" and tables:
+            row = " | ".join(cell for cell in tables[-1]["cells"] if cell)
+            # A nested table's rows go into the enclosing cell
+            current = tables.pop()
+            emit(row)
+            tables.append(current)
+        elif tag == _W + "tbl" and tables:
+            tables.pop()
+            blocks -= 1
+        else:
+            continue
+
+        if blocks == 0 and elements:
+            # Top-level block done: drop it (and finished siblings) from the tree
+            elements[-1].clear()
+        yield from lines
+        lines.clear()
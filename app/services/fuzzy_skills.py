@@ -0,0 +1,106 @@
+"""
+Fuzzy skill resolution for /match-jobs (typos and variants such as
+"PostgresSQL" or "ASP.Net core 8").
+
+A trigram index is built once over the folded lookup keys of the skills
+being matched against (the catalog, or inline jobs, cached by vocabulary). Each user
+skill with no exact match is resolved to its most similar vocabulary skill
+(Jaccard similarity of padded trigrams, as in pg_trgm); matching itself
+stays a set intersection of skill ids.
+"""
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AbstractSet, Optional
+
+from app.core.config import settings
+from app.services.skill_dictionary import SkillId, fold_skill, lookup_keys, skill_id
+
+
+@dataclass(frozen=True)
+class FuzzyHit:
+    """A vocabulary skill reached through a user skill that isn't an exact match."""
+    user_skill: str
+    score: float
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Trigram postings over the lookup keys of a fixed set of skill ids.
+
+    Args:
+        ids: Skill ids to resolve user skills to
+    """
+
+    def __init__(self, ids: AbstractSet[SkillId]):
+        self.ids = frozenset(ids)
+        self._keys: list[tuple[frozenset[str], SkillId]] = []     # (trigrams, skill id)
+        self._postings: dict[str, list[int]] = {}
+        for key, skill in lookup_keys(self.ids).items():
+            grams = frozenset(_trigrams(key))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(len(self._keys))
+            self._keys.append((grams, skill))
+
+    def best(self, key: str, threshold: float) -> Optional[tuple[SkillId, float]]:
+        """Most similar skill id and its similarity, if at least threshold."""
+        grams = _trigrams(key)
+        size = len(grams)
+        # similarity >= threshold needs at least this many shared trigrams, so a
+        # match must appear under one of the size - min_common + 1 rarest ones
+        min_common = math.ceil(threshold * size)
+        rare = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))[:size - min_common + 1]
+        candidates = set()
+        for gram in rare:
+            candidates.update(self._postings.get(gram, ()))
+
+        best: Optional[tuple[SkillId, float]] = None
+        for position in candidates:
+            key_grams, skill = self._keys[position]
+            if not threshold * size <= len(key_grams) <= size / threshold:
+                continue
+            common = len(grams & key_grams)
+            score = common / (size + len(key_grams) - common)
+            if score >= threshold and (best is None or score > best[1]):
+                best = (skill, score)
+        return best
+
+
+@lru_cache(maxsize=64)
+def cached_index(ids: frozenset[SkillId]) -> TrigramIndex:
+    """Shared TrigramIndex for a vocabulary (inline jobSkills often repeat)."""
+    return TrigramIndex(ids)
+
+
+def resolve_fuzzy(
+    user_skills: list[str],
+    user_set: AbstractSet[SkillId],
+    index: TrigramIndex,
+    threshold: float,
+) -> dict[SkillId, FuzzyHit]:
+    """
+    Vocabulary skills the user has through a near miss, by skill id.
+
+    User skills already in the vocabulary, or shorter than
+    settings.skill_fuzzy_min_length once folded, are left alone.
+    """
+    hits: dict[SkillId, FuzzyHit] = {}
+    for skill in user_skills:
+        if skill_id(skill) in index.ids:
+            continue
+        key = fold_skill(skill)
+        if len(key) < settings.skill_fuzzy_min_length:
+            continue
+        found = index.best(key, threshold)
+        if found is None:
+            continue
+        target, score = found
+        if target not in user_set and (target not in hits or score > hits[target].score):
+            hits[target] = FuzzyHit(user_skill=skill, score=round(score, 3))
+    return hits
@@ -0,0 +1,481 @@
+"""
+Job catalog for /match-jobs.
+
+Jobs are upserted once (by job_id) instead of being sent with every match
+request. They are stored in a local SQLite file and held in memory with an
+inverted index from skill id (see skill_dictionary) to job ids, so a match only scores the
+jobs that share at least one skill with the user.
+
+The skills of saved CV profiles are recorded here too: together with the
+jobs they are the documents behind the IDF weights of weighted scoring,
+which are updated per job/profile change instead of recomputed.
+
+Batches of users (POST /match-jobs/batch) go through a SkillMatrix built
+from the same jobs, rebuilt lazily after the catalog changes.
+
+Every uvicorn worker on the host loads the same file; SQLite's data_version
+tells a worker when another one has written. Jobs and profiles carry
+separate version counters (catalog_meta): a job change makes the other
+workers reload their index, while a profile change only replays the
+profile rows with a newer version into their weights.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+from app.core.config import settings
+from app.schemas.matching_schema import JobInput, MatchJobsResponse, UserMatchResults
+from app.services.fuzzy_skills import FuzzyHit, TrigramIndex, resolve_fuzzy
+from app.services.job_matcher import score_job, select_matches
+from app.services.skill_dictionary import SkillId, get_skill_dictionary_stats, skill_ids
+from app.services.skill_matrix import SkillMatrix
+from app.services.skill_weights import SkillWeights
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _IndexedJob:
+    job: JobInput
+    skills: frozenset[SkillId]    # canonical skill ids
+    nice: frozenset[SkillId]      # nice-to-have skill ids
+
+
+class JobCatalog:
+    """
+    In-memory inverted index over a SQLite table of jobs.
+
+    Args:
+        path: SQLite file ("" = in memory only, lost on restart)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._jobs: dict[str, _IndexedJob] = {}
+        self._index: dict[SkillId, set[str]] = {}
+        self._profiles: dict[str, frozenset[SkillId]] = {}
+        self._weights = SkillWeights()
+        self._data_version: Optional[int] = None
+        self._jobs_version: Optional[int] = None    # catalog_meta "jobs" the index was built from
+        self._profiles_version = -1                 # newest catalog_profiles.version applied
+        # Batch matching: (matrix, jobs in matrix row order), None until needed
+        self._matrix: Optional[tuple[SkillMatrix, list[_IndexedJob]]] = None
+        # Fuzzy mode: trigram index over the catalog's skills, None until needed
+        self._fuzzy_index: Optional[TrigramIndex] = None
+        self._generation = 0    # bumped whenever the two caches above are invalidated
+        self._stats = {"matches": 0, "candidates_scored": 0, "reloads": 0, "batch_users": 0, "matrix_builds": 0,
+                       "profile_syncs": 0}
+
+    def start(self, profiles: Optional[Mapping[str, list[str]]] = None) -> None:
+        """
+        Open the store and build the index.
+
+        Args:
+            profiles: Skills of every saved CV profile by user id (from the
+                      database); when given they replace the recorded ones,
+                      so the IDF weights also count CVs saved before this
+                      store existed or while it was unreachable. Only the
+                      differences are written, so workers starting after
+                      the first one find nothing to change.
+        """
+        with self._lock:
+            self._connect()
+            if profiles is not None:
+                self._seed_profiles(profiles)
+            self._data_version = self._current_version()
+            self._reload()
+        logger.info(
+            "Job catalog loaded: %d jobs, %d skills, %d profiles", len(self._jobs), len(self._index), len(self._profiles)
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def upsert(self, jobs: list[JobInput]) -> int:
+        """Insert or replace jobs by job_id. Returns the catalog size."""
+        now = time.time()
+        with self._lock:
+            self._sync()
+            with self._connect():
+                version = self._bump("jobs")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO catalog_jobs "
+                    "(job_id, title, company, skills, nice_to_have, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            job.job_id,
+                            job.title,
+                            job.company,
+                            json.dumps(job.skills, ensure_ascii=False),
+                            json.dumps(job.nice_to_have_skills, ensure_ascii=False),
+                            now,
+                        )
+                        for job in jobs
+                    ],
+                )
+            for job in jobs:
+                self._index_job(job)
+            self._advance_jobs_version(version)
+            return len(self._jobs)
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            self._sync()
+            with self._connect():
+                version = self._bump("jobs")
+                deleted = self._conn.execute("DELETE FROM catalog_jobs WHERE job_id = ?", (job_id,)).rowcount
+            self._unindex_job(job_id)
+            self._advance_jobs_version(version)
+            return bool(deleted)
+
+    def get(self, job_id: str) -> Optional[JobInput]:
+        with self._lock:
+            self._sync()
+            entry = self._jobs.get(job_id)
+            return entry.job if entry else None
+
+    def record_profile(self, user_id: str, skills: list[str]) -> None:
+        """
+        Count a saved CV profile's skills in the IDF weights (replacing its
+        previous ones). Best effort: a failure only leaves weights stale.
+
+        Only the weights change; other workers replay the row instead of
+        reloading the catalog.
+        """
+        try:
+            with self._lock:
+                self._sync()
+                if self._profiles.get(user_id) == skill_ids(skills):
+                    return
+                with self._connect():
+                    version = self._bump("profiles")
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO catalog_profiles (user_id, skills, updated_at, version, deleted) "
+                        "VALUES (?, ?, ?, ?, 0)",
+                        (user_id, json.dumps(skills, ensure_ascii=False), time.time(), version),
+                    )
+                self._load_profiles()
+        except sqlite3.Error as exc:
+            logger.warning("Could not record skills of profile %s: %s", user_id, exc)
+
+    def forget_profile(self, user_id: str) -> None:
+        try:
+            with self._lock:
+                self._sync()
+                if user_id not in self._profiles:
+                    return
+                with self._connect():
+                    # Kept as a tombstone so other workers see the removal
+                    self._conn.execute(
+                        "UPDATE catalog_profiles SET skills = '[]', updated_at = ?, version = ?, deleted = 1 "
+                        "WHERE user_id = ?",
+                        (time.time(), self._bump("profiles"), user_id),
+                    )
+                self._load_profiles()
+        except sqlite3.Error as exc:
+            logger.warning("Could not forget skills of profile %s: %s", user_id, exc)
+
+    def skill_weights(self) -> SkillWeights:
+        """Read-only snapshot of the IDF weights (for weighted scoring of inline jobSkills)."""
+        with self._lock:
+            self._sync()
+            return self._weights.snapshot()
+
+    def match(
+        self,
+        user_skills: list[str],
+        top_k: Optional[int] = None,
+        min_percentage: float = 0.0,
+        cursor: Optional[str] = None,
+        fuzzy_threshold: Optional[float] = None,
+        weighted: bool = False,
+    ) -> MatchJobsResponse:
+        """
+        Score the jobs sharing a skill with the user, paged like compute_matches.
+
+        Nice-to-have skills only make a job a candidate in weighted mode.
+        """
+        user_set = skill_ids(user_skills)
+        with self._lock:
+            self._sync()
+            fuzzy = None
+            if fuzzy_threshold is not None:
+                user_set, fuzzy = self._expand_fuzzy(user_skills, user_set, fuzzy_threshold)
+            candidate_ids: set[str] = set()
+            for skill in user_set:
+                candidate_ids |= self._index.get(skill, set())
+            candidates = [self._jobs[job_id] for job_id in candidate_ids]
+            if not weighted:
+                candidates = [entry for entry in candidates if not entry.skills.isdisjoint(user_set)]
+            weights = self._weights.snapshot() if weighted else None
+        self._stats["matches"] += 1
+        self._stats["candidates_scored"] += len(candidates)
+        return select_matches(
+            ((entry.job, entry.skills, entry.nice, entry.job.job_id) for entry in candidates),
+            user_set, str, top_k, min_percentage, cursor, fuzzy, weights,
+        )
+
+    def match_many(
+        self,
+        users: list[tuple[str, list[str]]],
+        top_k: int,
+        fuzzy_threshold: Optional[float] = None,
+    ) -> list[UserMatchResults]:
+        """
+        Best top_k catalog jobs for each (user_id, skills) pair.
+
+        Matched-skill counts for all users come from sparse products against
+        the job matrix; matched/missing lists are only built for the top jobs.
+        The lock is only held to snapshot the catalog: the matrix and fuzzy
+        index are built outside it and cached if the catalog didn't change.
+        """
+        user_sets = [skill_ids(skills) for _, skills in users]
+        fuzzy: list[Optional[dict[SkillId, FuzzyHit]]] = [None] * len(users)
+        with self._lock:
+            self._sync()
+            generation = self._generation
+            cached_matrix, fuzzy_index = self._matrix, self._fuzzy_index
+            # Matrix order by job_id, so title ties break like match()
+            entries = cached_matrix[1] if cached_matrix else sorted(self._jobs.values(), key=lambda e: e.job.job_id)
+            vocabulary = frozenset(self._index) if fuzzy_threshold is not None and fuzzy_index is None else None
+
+        if vocabulary is not None:
+            fuzzy_index = TrigramIndex(vocabulary)
+        if fuzzy_threshold is not None:
+            for i, (_, skills) in enumerate(users):
+                fuzzy[i] = resolve_fuzzy(skills, user_sets[i], fuzzy_index, fuzzy_threshold)
+                user_sets[i] = user_sets[i] | fuzzy[i].keys()
+        matrix = cached_matrix[0] if cached_matrix else SkillMatrix(
+            [e.skills for e in entries], [e.job.title for e in entries]
+        )
+
+        with self._lock:
+            if self._generation == generation:
+                if self._matrix is None:
+                    self._matrix = (matrix, entries)
+                    self._stats["matrix_builds"] += 1
+                if self._fuzzy_index is None and fuzzy_index is not None:
+                    self._fuzzy_index = fuzzy_index
+            self._stats["batch_users"] += len(users)
+
+        top = matrix.top_matches(user_sets, top_k, chunk_size=settings.match_batch_chunk_users)
+        return [
+            UserMatchResults(
+                user_id=user_id,
+                results=[
+                    score_job(entries[m.job_index].job, entries[m.job_index].skills, user_set, hits)
+                    for m in matches
+                ],
+            )
+            for (user_id, _), user_set, hits, matches in zip(users, user_sets, fuzzy, top)
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                **self._stats,
+                "jobs": len(self._jobs),
+                "skills": len(self._index),
+                "profiles": len(self._profiles),
+                "weights": self._weights.stats(),
+            }
+        return {**stats, "skill_dictionary": get_skill_dictionary_stats()}
+
+    # ── Index ────────────────────────────────────────────────
+
+    def _expand_fuzzy(
+        self, user_skills: list[str], user_set: frozenset[SkillId], threshold: float
+    ) -> tuple[frozenset[SkillId], dict[SkillId, FuzzyHit]]:
+        """User skill ids plus the catalog skills reached by fuzzy matches (lock held)."""
+        if self._fuzzy_index is None:
+            self._fuzzy_index = TrigramIndex(self._index.keys())
+        hits = resolve_fuzzy(user_skills, user_set, self._fuzzy_index, threshold)
+        return user_set | hits.keys(), hits
+
+    def _invalidate(self) -> None:
+        self._matrix = None
+        self._fuzzy_index = None
+        self._generation += 1
+
+    def _index_job(self, job: JobInput) -> None:
+        self._unindex_job(job.job_id)
+        self._invalidate()
+        entry = _IndexedJob(job=job, skills=skill_ids(job.skills), nice=skill_ids(job.nice_to_have_skills))
+        self._jobs[job.job_id] = entry
+        self._weights.add(entry.skills | entry.nice)
+        for skill in entry.skills | entry.nice:
+            self._index.setdefault(skill, set()).add(job.job_id)
+
+    def _unindex_job(self, job_id: str) -> None:
+        previous = self._jobs.pop(job_id, None)
+        if previous is None:
+            return
+        self._invalidate()
+        self._weights.remove(previous.skills | previous.nice)
+        for skill in previous.skills | previous.nice:
+            job_ids = self._index.get(skill)
+            if job_ids is not None:
+                job_ids.discard(job_id)
+                if not job_ids:
+                    del self._index[skill]
+
+    def _add_profile(self, user_id: str, skills: list[str]) -> None:
+        self._remove_profile(user_id)
+        self._profiles[user_id] = skill_ids(skills)
+        self._weights.add(self._profiles[user_id])
+
+    def _remove_profile(self, user_id: str) -> None:
+        previous = self._profiles.pop(user_id, None)
+        if previous is not None:
+            self._weights.remove(previous)
+
+    # ── Store ────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path or ":memory:", timeout=10.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS catalog_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    company TEXT NOT NULL,
+                    skills TEXT NOT NULL,
+                    nice_to_have TEXT NOT NULL DEFAULT '[]',
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(catalog_jobs)")}
+            if "nice_to_have" not in columns:
+                # Catalogs created before nice-to-have skills existed
+                self._conn.execute("ALTER TABLE catalog_jobs ADD COLUMN nice_to_have TEXT NOT NULL DEFAULT '[]'")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS catalog_profiles (
+                    user_id TEXT PRIMARY KEY,
+                    skills TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 0,
+                    deleted INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(catalog_profiles)")}
+            if "version" not in columns:
+                # Profile tables created before incremental profile sync
+                self._conn.execute("ALTER TABLE catalog_profiles ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+                self._conn.execute("ALTER TABLE catalog_profiles ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS catalog_profiles_version ON catalog_profiles (version)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _current_version(self) -> int:
+        # Changes whenever another connection (another worker) commits to the file
+        return self._connect().execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync(self) -> None:
+        """Catch up with other processes: rebuild after job changes, replay profile changes."""
+        version = self._current_version()
+        if self._data_version == version:
+            return
+        self._data_version = version
+        if self._versions()[0] != self._jobs_version:
+            self._reload()
+            self._stats["reloads"] += 1
+        else:
+            self._load_profiles()
+            self._stats["profile_syncs"] += 1
+
+    def _versions(self) -> tuple[int, int]:
+        """Current (jobs, profiles) version counters."""
+        values = dict(self._connect().execute("SELECT key, value FROM catalog_meta"))
+        return values.get("jobs", 0), values.get("profiles", 0)
+
+    def _bump(self, key: str) -> int:
+        """Increment a version counter inside the caller's write transaction."""
+        self._conn.execute(
+            "INSERT INTO catalog_meta (key, value) VALUES (?, 1) ON CONFLICT (key) DO UPDATE SET value = value + 1",
+            (key,),
+        )
+        return self._conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def _advance_jobs_version(self, version: int) -> None:
+        # Another worker changed jobs since our last sync if we skipped a number: reload next time
+        self._jobs_version = version if self._jobs_version == version - 1 else None
+
+    def _seed_profiles(self, profiles: Mapping[str, list[str]]) -> None:
+        conn = self._conn
+        stored = dict(conn.execute("SELECT user_id, skills FROM catalog_profiles WHERE deleted = 0"))
+        changed = []
+        for user_id, skills in profiles.items():
+            dumped = json.dumps(skills, ensure_ascii=False)
+            if stored.get(user_id) != dumped:
+                changed.append((user_id, dumped))
+        removed = stored.keys() - profiles.keys()
+        if not changed and not removed:
+            return
+        now = time.time()
+        with conn:
+            version = self._bump("profiles")
+            conn.executemany(
+                "INSERT OR REPLACE INTO catalog_profiles (user_id, skills, updated_at, version, deleted) "
+                "VALUES (?, ?, ?, ?, 0)",
+                [(user_id, skills, now, version) for user_id, skills in changed],
+            )
+            conn.executemany(
+                "UPDATE catalog_profiles SET skills = '[]', updated_at = ?, version = ?, deleted = 1 WHERE user_id = ?",
+                [(now, version, user_id) for user_id in removed],
+            )
+        logger.info("Seeded catalog profiles: %d changed, %d removed", len(changed), len(removed))
+
+    def _load_profiles(self) -> None:
+        """Apply profile rows newer than the last one applied."""
+        rows = self._connect().execute(
+            "SELECT user_id, skills, deleted, version FROM catalog_profiles WHERE version > ? ORDER BY version",
+            (self._profiles_version,),
+        )
+        for user_id, skills, deleted, version in rows:
+            if deleted:
+                self._remove_profile(user_id)
+            else:
+                self._add_profile(user_id, json.loads(skills))
+            self._profiles_version = version
+
+    def _reload(self) -> None:
+        self._jobs.clear()
+        self._index.clear()
+        self._profiles.clear()
+        self._weights.clear()
+        self._invalidate()
+        self._profiles_version = -1
+        conn = self._connect()
+        self._jobs_version = self._versions()[0]
+        rows = conn.execute("SELECT job_id, title, company, skills, nice_to_have FROM catalog_jobs").fetchall()
+        for job_id, title, company, skills, nice_to_have in rows:
+            self._index_job(JobInput(
+                job_id=job_id,
+                title=title,
+                company=company,
+                skills=json.loads(skills),
+                nice_to_have_skills=json.loads(nice_to_have),
+            ))
+        self._load_profiles()
+
+
+job_catalog = JobCatalog(settings.job_catalog_path)
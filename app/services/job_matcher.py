@@ -1,49 +1,204 @@
 """
 Job-matching service.
+
+Skills are compared as interned ids from the canonical skill dictionary
+(app/services/skill_dictionary.py), so aliases like "C#"/"csharp" match.
+
+Jobs are ranked by match_percentage (share of required skills matched) or,
+in weighted mode, by relevance: IDF-weighted coverage of the required and
+nice-to-have skills (see skill_weights.py).
 """
 
+import base64
+import binascii
+import heapq
+import json
 import logging
-from app.schemas.matching_schema import JobInput, MatchJobsResponse, MatchResult
+from typing import AbstractSet, Iterable, Mapping, Optional, Union
+
+from app.core.config import settings
+from app.schemas.matching_schema import FuzzySkillMatch, JobInput, MatchJobsResponse, MatchResult
+from app.services.fuzzy_skills import FuzzyHit, cached_index, resolve_fuzzy
+from app.services.skill_dictionary import SkillId, skill_id, skill_ids
+from app.services.skill_weights import SkillWeights
 
 logger = logging.getLogger(__name__)
 
+# Last sort key after (-score, title): position in jobSkills, or job_id for the catalog
+TieBreak = Union[int, str]
+
+
+def match_percentage(job_set: AbstractSet[SkillId], user_set: AbstractSet[SkillId]) -> float:
+    if not job_set:
+        return 0.0
+    return round((len(user_set & job_set) / len(job_set)) * 100, 1)
+
+
+def _coverage(skills: AbstractSet[SkillId], user_set: AbstractSet[SkillId], weights: SkillWeights) -> float:
+    total = weights.total(skills)
+    return weights.total(skills & user_set) / total if total else 0.0
+
+
+def weighted_relevance(
+    job_set: AbstractSet[SkillId],
+    nice_set: AbstractSet[SkillId],
+    user_set: AbstractSet[SkillId],
+    weights: SkillWeights,
+) -> float:
+    """0-100: IDF-weighted share of required skills, nice-to-have ones blended in."""
+    if job_set and nice_set:
+        share = settings.match_nice_to_have_weight
+        score = (1 - share) * _coverage(job_set, user_set, weights) + share * _coverage(nice_set, user_set, weights)
+    else:
+        score = _coverage(job_set or nice_set, user_set, weights)
+    return round(score * 100, 1)
+
+
+def score_job(
+    job: JobInput,
+    job_set: AbstractSet[SkillId],
+    user_set: AbstractSet[SkillId],
+    fuzzy: Optional[Mapping[SkillId, FuzzyHit]] = None,
+    nice_set: AbstractSet[SkillId] = frozenset(),
+    relevance: Optional[float] = None,
+) -> MatchResult:
+    """
+    Match one job (its skill ids precomputed) against the user's skill ids.
+
+    In fuzzy mode user_set already includes the fuzzy hits' ids; fuzzy says
+    which user skill each of them came from.
+    """
+    fuzzy_matches = []
+    matched_nice = [s for s in job.nice_to_have_skills if skill_id(s) in user_set] if nice_set else []
+    if not job_set:
+        match_pct = 0.0
+        matched = []
+        missing = []
+    else:
+        matched_set = user_set & job_set
+        missing_set = job_set - user_set
+
+        match_pct = round((len(matched_set) / len(job_set)) * 100, 1)
+
+        matched = [s for s in job.skills if skill_id(s) in matched_set]
+        missing = [s for s in job.skills if skill_id(s) in missing_set]
+    if fuzzy:
+        fuzzy_matches = [
+            FuzzySkillMatch(skill=s, user_skill=hit.user_skill, score=hit.score)
+            for s in matched + matched_nice
+            if (hit := fuzzy.get(skill_id(s))) is not None
+        ]
+
+    return MatchResult(
+        job_id=job.job_id,
+        title=job.title,
+        company=job.company,
+        match_percentage=match_pct,
+        matched_skills=matched,
+        missing_skills=missing,
+        matched_nice_to_have=matched_nice,
+        relevance=relevance,
+        fuzzy_matches=fuzzy_matches,
+    )
+
+
+# ─────────────────────────────────────────────────────────────
+# Top-k / pagination
+# ─────────────────────────────────────────────────────────────
+
+def encode_cursor(score: float, title: str, tie_break: TieBreak) -> str:
+    """Opaque cursor pointing just after the given result."""
+    raw = json.dumps([score, title, tie_break], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, tie_break_type: type) -> tuple:
+    """Sort key of the result a cursor points after. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, title, tie_break = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(score, (int, float)) or not isinstance(title, str) or type(tie_break) is not tie_break_type:
+        raise ValueError("Invalid cursor")
+    return (-score, title, tie_break)
 
-def _normalise(skills: list[str]) -> set[str]:
-    """Lower-case + strip whitespace."""
-    return {s.strip().lower() for s in skills if s.strip()}
 
+def select_matches(
+    candidates: Iterable[tuple[JobInput, AbstractSet[SkillId], AbstractSet[SkillId], TieBreak]],
+    user_set: AbstractSet[SkillId],
+    tie_break_type: type,
+    top_k: Optional[int] = None,
+    min_percentage: float = 0.0,
+    cursor: Optional[str] = None,
+    fuzzy: Optional[Mapping[SkillId, FuzzyHit]] = None,
+    weights: Optional[SkillWeights] = None,
+) -> MatchJobsResponse:
+    """
+    Best jobs in /match-jobs order, one page at a time.
 
-def compute_matches(user_skills: list[str], jobs: list[JobInput]) -> MatchJobsResponse:
-    """Run the full match pipeline and return a sorted response."""
-    user_set = _normalise(user_skills)
-    results: list[MatchResult] = []
+    Candidates are (job, required ids, nice-to-have ids, tie-break). Only the
+    ranking score is computed for every candidate (relevance when weights
+    are given, else match_percentage); a bounded heap keeps the page, and
+    MatchResult objects are built for the returned jobs only.
+    """
+    after = decode_cursor(cursor, tie_break_type) if cursor is not None else None
 
-    for job in jobs:
-        job_set = _normalise(job.skills)
+    def ranked():
+        for job, job_set, nice_set, tie_break in candidates:
+            pct = match_percentage(job_set, user_set)
+            if pct < min_percentage:
+                continue
+            relevance = weighted_relevance(job_set, nice_set, user_set, weights) if weights else None
+            key = (-(pct if relevance is None else relevance), job.title, tie_break)
+            if after is not None and key <= after:
+                continue
+            yield key, job, job_set, nice_set, relevance
 
-        if not job_set:
-            match_pct = 0.0
-            matched = []
-            missing = []
-        else:
-            matched_set = user_set & job_set
-            missing_set = job_set - user_set
+    if top_k is None:
+        page = sorted(ranked(), key=lambda item: item[0])
+        has_more = False
+    else:
+        # One extra tells whether another page exists
+        page = heapq.nsmallest(top_k + 1, ranked(), key=lambda item: item[0])
+        has_more = len(page) > top_k
+        page = page[:top_k]
 
-            match_pct = round((len(matched_set) / len(job_set)) * 100, 1)
+    next_cursor = None
+    if has_more:
+        (neg_score, title, tie_break), *_ = page[-1]
+        next_cursor = encode_cursor(-neg_score, title, tie_break)
+    return MatchJobsResponse(
+        results=[
+            score_job(job, job_set, user_set, fuzzy, nice_set, relevance)
+            for _, job, job_set, nice_set, relevance in page
+        ],
+        next_cursor=next_cursor,
+    )
 
-            matched = [s for s in job.skills if s.strip().lower() in matched_set]
-            missing = [s for s in job.skills if s.strip().lower() in missing_set]
 
-        results.append(
-            MatchResult(
-                job_id=job.job_id,
-                title=job.title,
-                company=job.company,
-                match_percentage=match_pct,
-                matched_skills=matched,
-                missing_skills=missing,
-            )
-        )
+def compute_matches(
+    user_skills: list[str],
+    jobs: list[JobInput],
+    top_k: Optional[int] = None,
+    min_percentage: float = 0.0,
+    cursor: Optional[str] = None,
+    fuzzy_threshold: Optional[float] = None,
+    weights: Optional[SkillWeights] = None,
+) -> MatchJobsResponse:
+    """
+    Run the full match pipeline and return a sorted response.
 
-    results.sort(key=lambda r: (-r.match_percentage, r.title))
-    return MatchJobsResponse(results=results)
+    Fuzzy when a threshold is given; ranked by relevance when weights are.
+    """
+    user_set = skill_ids(user_skills)
+    job_sets = [(skill_ids(job.skills), skill_ids(job.nice_to_have_skills)) for job in jobs]
+    fuzzy = None
+    if fuzzy_threshold is not None:
+        vocabulary = frozenset().union(*(required | nice for required, nice in job_sets))
+        fuzzy = resolve_fuzzy(user_skills, user_set, cached_index(vocabulary), fuzzy_threshold)
+        user_set = user_set | fuzzy.keys()
+    candidates = (
+        (job, required, nice, position) for position, (job, (required, nice)) in enumerate(zip(jobs, job_sets))
+    )
+    return select_matches(candidates, user_set, int, top_k, min_percentage, cursor, fuzzy, weights)
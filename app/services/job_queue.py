@@ -0,0 +1,329 @@
+"""
+Durable CV parsing job queue.
+
+Jobs (including the uploaded file) are stored in a local SQLite file, so a
+restart does not lose accepted work, and a pool of asyncio workers runs them
+through the same pipeline as /parse-cv. Every uvicorn worker on the host can
+share the file: a job is claimed atomically and holds a lease, and a job
+whose lease expired (its worker died) is picked up again, up to
+settings.job_max_attempts times.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.services.cv_pipeline import CVSaveError, process_cv
+from app.utils.uploads import SpooledUpload
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# Prune finished jobs once every N submissions.
+_PRUNE_INTERVAL = 100
+
+_COLUMNS = (
+    "id, status, filename, user_id, mode, attempts, created_at, "
+    "started_at, finished_at, result, error, error_status"
+)
+
+
+class JobStore:
+    """
+    SQLite persistence for jobs. Methods are blocking; JobQueue calls them
+    from worker threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cv_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                user_id TEXT,
+                mode TEXT NOT NULL,
+                payload BLOB,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                lease_until REAL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT,
+                error_status INTEGER
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_cv_jobs_status ON cv_jobs (status, created_at)")
+        self._submissions = 0
+
+    def submit(self, filename: str, data: bytes, user_id: Optional[str], mode: str) -> dict:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cv_jobs (id, status, filename, user_id, mode, payload, created_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, filename, user_id, mode, data, time.time()),
+            )
+            self._submissions += 1
+            if self._submissions % _PRUNE_INTERVAL == 0:
+                self._prune()
+        return self.get(job_id)
+
+    def claim(self, lease_seconds: float) -> Optional[dict]:
+        """Take the oldest runnable job (queued, or running with an expired lease)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM cv_jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE cv_jobs SET status = 'running', attempts = attempts + 1, "
+                    "started_at = ?, lease_until = ? WHERE id = ?",
+                    (now, now + lease_seconds, row[0]),
+                )
+                job = self._conn.execute(
+                    f"SELECT {_COLUMNS}, payload FROM cv_jobs WHERE id = ?", (row[0],)
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        payload = job[-1]
+        return {**_row_to_job(job[:-1]), "payload": payload}
+
+    def finish(
+        self,
+        job_id: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+        error_status: Optional[int] = None,
+    ) -> None:
+        """Record the outcome and drop the stored file."""
+        status = "succeeded" if error is None else "failed"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE cv_jobs SET status = ?, finished_at = ?, lease_until = NULL, payload = NULL, "
+                "result = ?, error = ?, error_status = ? WHERE id = ?",
+                (
+                    status,
+                    time.time(),
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    error_status,
+                    job_id,
+                ),
+            )
+
+    def release(self, job_id: str) -> None:
+        """Put a running job back in the queue without counting the attempt."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE cv_jobs SET status = 'queued', attempts = attempts - 1, started_at = NULL, "
+                "lease_until = NULL WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM cv_jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM cv_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _prune(self) -> None:
+        if settings.job_retention_seconds:
+            self._conn.execute(
+                "DELETE FROM cv_jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+                (time.time() - settings.job_retention_seconds,),
+            )
+
+
+def _row_to_job(row: tuple) -> dict:
+    (job_id, status, filename, user_id, mode, attempts, created_at,
+     started_at, finished_at, result, error, error_status) = row
+    return {
+        "job_id": job_id,
+        "status": status,
+        "filename": filename,
+        "user_id": user_id,
+        "mode": mode,
+        "attempts": attempts,
+        "created_at": created_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "result": json.loads(result) if result else None,
+        "error": error,
+        "error_status": error_status,
+    }
+
+
+class JobQueue:
+    """
+    Worker pool over a JobStore.
+
+    Args:
+        path: SQLite file holding the jobs
+        workers: Concurrent jobs in this process (0 = accept jobs only)
+    """
+
+    def __init__(self, path: str, workers: int):
+        self.path = path
+        self.workers = workers
+        self._store: Optional[JobStore] = None
+        self._tasks: list[asyncio.Task] = []
+        # Not bound to a loop until first used, so safe to create here
+        self._wakeup = asyncio.Event()
+        self._changed = asyncio.Condition()
+        self._stats = {"submitted": 0, "succeeded": 0, "failed": 0}
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            self._store = JobStore(self.path)
+        return self._store
+
+    async def start(self) -> None:
+        """Open the store and start the workers."""
+        await asyncio.to_thread(lambda: self.store)
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.info("CV job queue started at %s with %d workers", self.path, self.workers)
+
+    async def stop(self) -> None:
+        """
+        Stop the workers. Jobs they were running go back to the queue; if
+        the process dies instead, they are picked up once their lease expires.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def submit(self, filename: str, data: bytes, user_id: Optional[str], mode: str) -> dict:
+        """Persist a job and wake a worker. Returns the job (status 'queued')."""
+        job = await asyncio.to_thread(self.store.submit, filename, data, user_id, mode)
+        self._stats["submitted"] += 1
+        self._wakeup.set()
+        logger.info("Queued CV job %s (%s)", job["job_id"], filename)
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[dict]:
+        """Yield the job every time its status changes, ending after a terminal status."""
+        last_status = None
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield job
+            if last_status in TERMINAL_STATUSES:
+                return
+            # Woken by this process's workers; the timeout covers other processes
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), settings.job_poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def stats(self) -> dict:
+        return {
+            **self._stats,
+            "workers": self.workers,
+            "jobs": await asyncio.to_thread(self.store.counts),
+        }
+
+    # ── Workers ──────────────────────────────────────────────
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim, settings.job_lease_seconds)
+            except sqlite3.Error as exc:
+                logger.warning("CV job worker %d: claim failed (%s)", number, exc)
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.job_poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._notify()
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                await asyncio.to_thread(self.store.release, job["job_id"])
+                logger.info("CV job %s returned to the queue on shutdown", job["job_id"])
+                raise
+            await self._notify()
+
+    async def _run(self, job: dict) -> None:
+        job_id = job["job_id"]
+        if job["attempts"] > settings.job_max_attempts:
+            logger.error("CV job %s abandoned after %d attempts", job_id, job["attempts"] - 1)
+            await self._finish(job_id, error="Job was interrupted too many times.", error_status=500)
+            return
+
+        logger.info("Running CV job %s (%s, attempt %d)", job_id, job["filename"], job["attempts"])
+        try:
+            cv_data = await process_cv(
+                SpooledUpload.from_bytes(job["filename"], job["payload"]),
+                job["user_id"],
+                contact_only=(job["mode"] == "contact"),
+            )
+        except CVSaveError as exc:
+            await self._finish(job_id, error=str(exc), error_status=500)
+        except ValueError as exc:
+            await self._finish(job_id, error=str(exc), error_status=400)
+        except Exception as exc:
+            logger.exception("CV job %s failed", job_id)
+            await self._finish(job_id, error=f"Internal error: {exc}", error_status=500)
+        else:
+            await self._finish(job_id, result=cv_data.model_dump())
+
+    async def _finish(self, job_id: str, **outcome) -> None:
+        await asyncio.to_thread(self.store.finish, job_id, **outcome)
+        self._stats["failed" if outcome.get("error") else "succeeded"] += 1
+        logger.info("CV job %s %s", job_id, "failed" if outcome.get("error") else "succeeded")
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+
+job_queue = JobQueue(settings.job_queue_path, settings.job_workers)
@@ -0,0 +1,187 @@
+"""
+LLM backends behind llm_service.
+
+llm_service owns caching, rate limiting, retries and the in-flight limit;
+a backend only sends one request. Backends raise LLMBackendError so the
+retry logic does not depend on any SDK's exception types.
+
+Available backends (settings.llm_backend):
+    groq  – Groq chat completions over a pooled async HTTP client
+    fake  – in-process stand-in for offline/load testing (see fake_llm.py)
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Mapping, Optional, Protocol
+
+import httpx
+from groq import (
+    APIConnectionError,
+    APIStatusError,
+    AsyncGroq,
+    DefaultAsyncHttpxClient,
+    InternalServerError,
+    RateLimitError,
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackendError(RuntimeError):
+    """
+    A backend request failed.
+
+    Attributes:
+        retryable: The same request may succeed if sent again
+        rate_limited: The provider rejected the request for quota (HTTP 429)
+        headers: Response headers, if any (for rate-limit resync)
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        retryable: bool = False,
+        rate_limited: bool = False,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        super().__init__(message)
+        self.retryable = retryable
+        self.rate_limited = rate_limited
+        self.headers: Mapping[str, str] = headers or {}
+
+
+@dataclass
+class LLMCompletion:
+    """A finished (non-streamed) completion."""
+    text: str
+    total_tokens: Optional[int] = None
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+
+class LLMStream(Protocol):
+    """Streamed completion: async iterator of text deltas."""
+    headers: Mapping[str, str]
+
+    def __aiter__(self) -> AsyncIterator[str]: ...
+
+    async def close(self) -> None: ...
+
+
+class LLMBackend(Protocol):
+    """Interface every backend implements."""
+    model: str
+
+    def check_configured(self) -> None:
+        """Raise RuntimeError if the backend cannot be used (e.g. no API key)."""
+
+    async def complete(self, messages: list[dict], max_tokens: int, timeout: float) -> LLMCompletion: ...
+
+    async def stream(self, messages: list[dict], max_tokens: int, timeout: float) -> LLMStream: ...
+
+    async def close(self) -> None: ...
+
+
+# ─────────────────────────────────────────────────────────────
+# Groq
+# ─────────────────────────────────────────────────────────────
+
+class _GroqStream:
+    def __init__(self, stream, headers: Mapping[str, str]):
+        self._stream = stream
+        self.headers = headers
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for chunk in self._stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except Exception as exc:
+            raise _translate_groq_error(exc) from exc
+
+    async def close(self) -> None:
+        await self._stream.close()
+
+
+class GroqBackend:
+    """Groq chat completions over a shared keep-alive connection pool."""
+
+    def __init__(self):
+        self.model = settings.groq_model
+        # Retries are handled by llm_service so they go through the rate limiter.
+        self._client = AsyncGroq(
+            api_key=settings.groq_api_key,
+            max_retries=0,
+            timeout=httpx.Timeout(
+                settings.llm_timeout_seconds,
+                connect=settings.llm_connect_timeout_seconds,
+            ),
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_keepalive_connections,
+                ),
+            ),
+        )
+
+    def check_configured(self) -> None:
+        if not settings.groq_api_key:
+            raise RuntimeError("GROQ_API_KEY is not set in .env file.")
+
+    async def complete(self, messages: list[dict], max_tokens: int, timeout: float) -> LLMCompletion:
+        raw = await self._create(messages, max_tokens, timeout, stream=False)
+        response = await raw.parse()
+        usage = getattr(response, "usage", None)
+        return LLMCompletion(
+            text=response.choices[0].message.content or "",
+            total_tokens=usage.total_tokens if usage else None,
+            headers=raw.headers,
+        )
+
+    async def stream(self, messages: list[dict], max_tokens: int, timeout: float) -> LLMStream:
+        raw = await self._create(messages, max_tokens, timeout, stream=True)
+        return _GroqStream(await raw.parse(), raw.headers)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    async def _create(self, messages: list[dict], max_tokens: int, timeout: float, stream: bool):
+        try:
+            return await self._client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.0,
+                stream=stream,
+                timeout=timeout,
+            )
+        except Exception as exc:
+            raise _translate_groq_error(exc) from exc
+
+
+def _translate_groq_error(exc: Exception) -> Exception:
+    if isinstance(exc, LLMBackendError):
+        return exc
+    if isinstance(exc, RateLimitError):
+        return LLMBackendError(str(exc), retryable=True, rate_limited=True, headers=exc.response.headers)
+    if isinstance(exc, InternalServerError):
+        return LLMBackendError(str(exc), retryable=True, headers=exc.response.headers)
+    if isinstance(exc, APIConnectionError):
+        return LLMBackendError(str(exc), retryable=True)
+    if isinstance(exc, APIStatusError):
+        return LLMBackendError(str(exc), headers=exc.response.headers)
+    return LLMBackendError(str(exc))
+
+
+def create_backend(name: str) -> LLMBackend:
+    """Instantiate the backend selected by settings.llm_backend."""
+    if name == "groq":
+        return GroqBackend()
+    if name == "fake":
+        from app.services.fake_llm import FakeLLMBackend
+        return FakeLLMBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
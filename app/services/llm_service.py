@@ -1,46 +1,203 @@
 """
-LLM service using Groq.
+LLM service (Groq by default, see llm_backends for the pluggable backends).
+
+All callers share one backend client (keep-alive HTTP connection pool), a
+global in-flight limit and an RPM/TPM rate limiter, so concurrent requests
+never block the event loop and bursts queue instead of failing. 429/5xx and
+connection errors are retried with jittered backoff. Responses are cached by
+content because every call runs at temperature 0.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from groq import Groq
+from typing import AsyncIterator, Optional
+
 from app.core.config import settings
+from app.services.llm_backends import LLMBackendError, create_backend
+from app.services.rate_limiter import LLMRateLimiter, backoff_delay
+from app.services.text_normalizer import estimate_tokens
+from app.utils.cache import TieredCache
 
 logger = logging.getLogger(__name__)
 
-_client = Groq(api_key=settings.groq_api_key)
+_SYSTEM_PROMPT = (
+    "You are an expert .NET career advisor and technical mentor. "
+    "Return ONLY valid JSON with no markdown formatting."
+)
+
+_backend = create_backend(settings.llm_backend)
+
+# Global cap on concurrent LLM requests for this process.
+_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+
+_limiter = LLMRateLimiter(
+    requests_per_minute=settings.llm_requests_per_minute,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+)
+
+_cache = TieredCache(
+    "llm",
+    max_entries=settings.llm_cache_max_entries,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+    disk_path=settings.llm_cache_path,
+)
+
 
+def make_cache_key(model: str, system_prompt: str, prompt: str, max_tokens: int) -> str:
+    """Content address of an LLM request."""
+    payload = json.dumps([model, system_prompt, prompt, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-async def call_llm(prompt: str, max_tokens: int = None) -> str:
-    """Send prompt to Groq and return response."""
-    if not settings.groq_api_key:
-        raise RuntimeError("GROQ_API_KEY is not set in .env file.")
+
+async def call_llm(
+    prompt: str,
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Send prompt to Groq and return response.
+
+    Args:
+        prompt: User prompt text
+        max_tokens: Completion limit (defaults to settings.llm_max_tokens)
+        timeout: Per-call timeout in seconds (defaults to settings.llm_timeout_seconds)
+    """
+    _backend.check_configured()
 
     # Use provided max_tokens or default from settings
     token_limit = max_tokens if max_tokens is not None else settings.llm_max_tokens
 
-    logger.info("Calling Groq AI model: %s (max_tokens: %d)", settings.groq_model, token_limit)
+    cache_key = make_cache_key(_backend.model, _SYSTEM_PROMPT, prompt, token_limit)
+    if settings.llm_cache_enabled:
+        cached = _cache.get(cache_key)
+        if cached is not None:
+            logger.info("LLM cache hit (%d characters).", len(cached))
+            return cached
+
+    completion, estimated = await _send(prompt, token_limit, timeout, stream=False)
+    _semaphore.release()
+    _limiter.settle(estimated, completion.total_tokens)
+
+    content = completion.text
+    if not content:
+        raise RuntimeError("LLM returned empty response.")
+
+    logger.info("Received %d characters from %s.", len(content), _backend.model)
+    if settings.llm_cache_enabled:
+        _cache.set(cache_key, content)
+    return content
+
+
+async def stream_llm(
+    prompt: str,
+    max_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream the completion for prompt as text deltas.
+
+    Shares the cache, connection pool, rate limiter and in-flight limit
+    with call_llm;
+    a cache hit is yielded as a single chunk.
+    """
+    _backend.check_configured()
+
+    token_limit = max_tokens if max_tokens is not None else settings.llm_max_tokens
+
+    cache_key = make_cache_key(_backend.model, _SYSTEM_PROMPT, prompt, token_limit)
+    if settings.llm_cache_enabled:
+        cached = _cache.get(cache_key)
+        if cached is not None:
+            logger.info("LLM cache hit (%d characters).", len(cached))
+            yield cached
+            return
 
+    parts: list[str] = []
+    stream, estimated = await _send(prompt, token_limit, timeout, stream=True)
     try:
-        response = _client.chat.completions.create(
-            model=settings.groq_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert .NET career advisor and technical mentor. Return ONLY valid JSON with no markdown formatting.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=token_limit,
-            temperature=0.0,
-        )
+        async for delta in stream:
+            parts.append(delta)
+            yield delta
     except Exception as exc:
-        logger.exception("Groq API call failed.")
+        logger.exception("LLM streaming call failed.")
         raise RuntimeError(f"LLM call failed: {exc}") from exc
+    finally:
+        _semaphore.release()
+        await stream.close()
+        # Streams report no usage: charge the prompt plus what was actually streamed
+        _limiter.settle(estimated, estimated - token_limit + estimate_tokens("".join(parts)))
 
-    content = response.choices[0].message.content
+    content = "".join(parts)
     if not content:
-        raise RuntimeError("Groq returned empty response.")
+        raise RuntimeError("LLM returned empty response.")
+
+    logger.info("Streamed %d characters from %s.", len(content), _backend.model)
+    if settings.llm_cache_enabled:
+        _cache.set(cache_key, content)
+
+
+async def _send(prompt: str, token_limit: int, timeout: Optional[float], stream: bool):
+    """
+    Send one request to the backend, queuing on the rate limiter and
+    retrying rate-limit, server and connection errors with jittered backoff.
+
+    Returns (completion or stream, estimated_tokens) with _semaphore held;
+    the caller must release it once the response (or stream) is consumed.
+    """
+    messages = [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    timeout = timeout if timeout is not None else settings.llm_timeout_seconds
+    estimated = estimate_tokens(_SYSTEM_PROMPT) + estimate_tokens(prompt) + token_limit
+    attempt = 0
+    while True:
+        await _limiter.acquire(estimated)
+        await _semaphore.acquire()
+        logger.info("Calling AI model: %s (max_tokens: %d)", _backend.model, token_limit)
+        try:
+            if stream:
+                result = await _backend.stream(messages, token_limit, timeout)
+            else:
+                result = await _backend.complete(messages, token_limit, timeout)
+            _limiter.observe_headers(result.headers)
+            return result, estimated
+        except LLMBackendError as exc:
+            _semaphore.release()
+            _limiter.settle(estimated, 0)
+            delay = _retry_delay(exc, attempt)
+            if delay is None or attempt >= settings.llm_max_retries:
+                logger.exception("LLM call failed.")
+                raise RuntimeError(f"LLM call failed: {exc}") from exc
+            attempt += 1
+            logger.warning(
+                "LLM call failed (%s); retry %d/%d in %.1fs",
+                "rate limited" if exc.rate_limited else exc, attempt, settings.llm_max_retries, delay,
+            )
+            await asyncio.sleep(delay)
+        except BaseException:
+            _semaphore.release()
+            raise
+
+
+def _retry_delay(exc: LLMBackendError, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying exc, or None if it is not retryable."""
+    if not exc.retryable:
+        return None
+    backoff = backoff_delay(attempt, settings.llm_backoff_base_seconds, settings.llm_backoff_max_seconds)
+    if exc.rate_limited:
+        retry_after = _limiter.on_rate_limited(exc.headers)
+        return max(retry_after or 0.0, backoff)
+    return backoff
+
+
+def get_llm_stats() -> dict:
+    """Cache and rate-limiter counters for the /llm-stats endpoint."""
+    return {"backend": _backend.model, "cache": _cache.stats(), "rate_limiter": _limiter.stats()}
+
 
-    logger.info("Received %d characters from Groq.", len(content))
-    return content
\ No newline at end of file
+async def close_llm_client() -> None:
+    """Close the backend's shared HTTP connection pool."""
+    await _backend.close()
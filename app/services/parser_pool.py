@@ -0,0 +1,196 @@
+"""
+Process pool for CPU-bound document parsing.
+
+pdfminer page interpretation and the DOCX XML walk hold the GIL for tens
+to hundreds of milliseconds per CV, so they run in worker processes instead
+of on the event loop. Workers are recycled after settings.parse_max_tasks_per_child
+tasks to cap memory growth, and a file that exceeds settings.parse_timeout_seconds
+has its worker killed (the pool is rebuilt; other tasks that were running
+in it are retried once). A PDF is parsed as several page-chunk tasks that
+share one deadline, so the limit holds for the whole file. With no worker
+processes the timeout still applies to the caller, but the parsing thread
+cannot be killed and runs to completion in the background. Workers are
+started and warmed up (parser modules imported) ahead of time, so the
+timeout does not include process startup.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ParseTimeoutError(ValueError):
+    """A file took longer than settings.parse_timeout_seconds to parse."""
+
+
+class ParserPool:
+    """
+    ProcessPoolExecutor with per-call timeouts and worker recycling.
+
+    Args:
+        workers: Worker processes (0 = run in a thread of this process)
+        timeout_seconds: Per-file limit (0 = no limit); files split into several
+            tasks pass a shared deadline() to run()
+        max_tasks_per_child: Tasks a worker runs before it is replaced
+        preload_modules: Imported by each worker when the pool starts
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        timeout_seconds: float,
+        max_tasks_per_child: int,
+        preload_modules: tuple[str, ...] = (),
+    ):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.max_tasks_per_child = max_tasks_per_child
+        self.preload_modules = preload_modules
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._generation = 0
+        self._warming: Optional[asyncio.Task] = None
+        self._stats = {"parsed": 0, "timeouts": 0, "restarts": 0, "retries": 0, "parse_seconds": 0.0}
+
+    async def start(self) -> None:
+        """Spawn and warm up every worker."""
+        if self.workers <= 0:
+            if self.timeout_seconds:
+                logger.warning(
+                    "Parser pool disabled: files over %.0fs fail, but their parsing threads keep running",
+                    self.timeout_seconds,
+                )
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        started = time.monotonic()
+        await asyncio.gather(*(
+            loop.run_in_executor(executor, _preload, self.preload_modules)
+            for _ in range(self.workers)
+        ))
+        logger.info("Parser pool: %d workers ready in %.1fs", self.workers, time.monotonic() - started)
+
+    def deadline(self) -> Optional[float]:
+        """time.monotonic() by which a file started now must be parsed (None = no limit)."""
+        return time.monotonic() + self.timeout_seconds if self.timeout_seconds else None
+
+    async def run(self, fn: Callable[[Any], T], data: Any, deadline: Optional[float] = None) -> T:
+        """
+        Run fn(data) in a worker and return its result.
+
+        Without a deadline the task gets the whole per-file timeout; tasks of
+        one file pass the same deadline() so together they cannot exceed it.
+        """
+        started = time.monotonic()
+        if self.workers <= 0:
+            limit = self._limit(deadline)
+            try:
+                result = await asyncio.wait_for(asyncio.to_thread(fn, data), limit)
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                raise ParseTimeoutError(f"File took longer than {self.timeout_seconds:.0f}s to parse.") from None
+        else:
+            result = await self._run_in_process(fn, data, deadline)
+        self._stats["parsed"] += 1
+        self._stats["parse_seconds"] += time.monotonic() - started
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "parse_seconds": round(self._stats["parse_seconds"], 3),
+            "workers": self.workers,
+        }
+
+    # ── Internals ────────────────────────────────────────────
+
+    async def _run_in_process(self, fn: Callable[[Any], T], data: Any, deadline: Optional[float]) -> T:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            if self._warming is not None and not self._warming.done():
+                # Don't let a rebuilt pool's startup count against this file's timeout
+                await asyncio.shield(self._warming)
+            limit = self._limit(deadline)
+            executor, generation = self._get_executor(), self._generation
+            future = loop.run_in_executor(executor, fn, data)
+            try:
+                return await asyncio.wait_for(future, limit)
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                logger.warning("Parsing exceeded %.0fs; killing its worker", self.timeout_seconds)
+                self._restart(generation)
+                raise ParseTimeoutError(
+                    f"File took longer than {self.timeout_seconds:.0f}s to parse."
+                ) from None
+            except BrokenProcessPool:
+                # Another file's timeout (or a crash) took the pool down under us
+                self._restart(generation)
+                if attempt:
+                    raise
+                self._stats["retries"] += 1
+        raise AssertionError("unreachable")
+
+    def _limit(self, deadline: Optional[float]) -> Optional[float]:
+        """Seconds this task may take (None = no limit); raises if the deadline has passed."""
+        if deadline is None:
+            return self.timeout_seconds or None
+        limit = deadline - time.monotonic()
+        if limit <= 0:
+            self._stats["timeouts"] += 1
+            raise ParseTimeoutError(f"File took longer than {self.timeout_seconds:.0f}s to parse.")
+        return limit
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                max_tasks_per_child=self.max_tasks_per_child or None,
+            )
+        return self._executor
+
+    def _restart(self, generation: int) -> None:
+        """Kill the pool's workers once per generation; the next call starts a new pool."""
+        if generation != self._generation or self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        self._generation += 1
+        self._stats["restarts"] += 1
+        # Running tasks cannot be cancelled, so the processes are killed outright
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Warm the replacement pool in the background
+        self._warming = asyncio.get_running_loop().create_task(self._warm_replacement())
+
+    async def _warm_replacement(self) -> None:
+        try:
+            await self.start()
+        except Exception as exc:
+            logger.warning("Parser pool warm-up failed: %s", exc)
+
+
+def _preload(modules: tuple[str, ...]) -> None:
+    for module in modules:
+        importlib.import_module(module)
+
+
+parser_pool = ParserPool(
+    workers=settings.parse_workers,
+    timeout_seconds=settings.parse_timeout_seconds,
+    max_tasks_per_child=settings.parse_max_tasks_per_child,
+    preload_modules=("app.services.file_parser",),
+)
@@ -0,0 +1,170 @@
+"""
+Client-side rate limiting for Groq.
+
+One LLMRateLimiter is shared by every LLM caller in the process. It keeps
+two token buckets, requests per minute and tokens per minute, and queues
+callers (FIFO) until both have room. Groq's x-ratelimit-* response headers
+resync the buckets with the server's view, and a 429 pauses the whole queue
+until retry-after has passed.
+"""
+
+import asyncio
+import logging
+import random
+import re
+import time
+from typing import Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse Groq reset/retry-after values ("7.66s", "2m59.56s", "1h2m", "120") to seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for retry number attempt (0-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class _Bucket:
+    """Continuous-refill token bucket."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def resize(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = min(self.level, self.capacity)
+
+
+class LLMRateLimiter:
+    """
+    Shared RPM/TPM scheduler.
+
+    Args:
+        requests_per_minute: Request budget (0 disables the request bucket)
+        tokens_per_minute: Token budget (0 disables the token bucket)
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self._requests = _Bucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = _Bucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self._waiting = 0
+        self._stats = {"acquired": 0, "delayed": 0, "rate_limited": 0, "wait_seconds": 0.0}
+
+    @property
+    def queue_depth(self) -> int:
+        """Callers currently waiting for capacity."""
+        return self._waiting
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait (FIFO) until a request of about `tokens` tokens may be sent."""
+        self._waiting += 1
+        started = time.monotonic()
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    wait = max(0.0, self._paused_until - now)
+                    for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                        if bucket is not None:
+                            bucket.refill(now)
+                            wait = max(wait, bucket.wait_time(amount))
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+
+                if self._requests is not None:
+                    self._requests.level -= 1
+                if self._tokens is not None:
+                    self._tokens.level -= min(tokens, self._tokens.capacity)
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - started
+        self._stats["acquired"] += 1
+        if waited > 0.01:
+            self._stats["delayed"] += 1
+            self._stats["wait_seconds"] += waited
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Refund (or charge) the difference between estimated and actual usage."""
+        if self._tokens is not None and actual_tokens is not None:
+            self._tokens.level = min(
+                self._tokens.capacity,
+                self._tokens.level + estimated_tokens - actual_tokens,
+            )
+
+    def observe_headers(self, headers: Mapping[str, str]) -> None:
+        """Resync with Groq's x-ratelimit-* headers (tokens are per minute, requests per day)."""
+        if self._tokens is not None:
+            limit = headers.get("x-ratelimit-limit-tokens")
+            if limit and limit.isdigit() and float(limit) != self._tokens.capacity:
+                logger.info("Adjusting LLM token budget to %s TPM from response headers", limit)
+                self._tokens.resize(float(limit))
+            remaining = headers.get("x-ratelimit-remaining-tokens")
+            if remaining and remaining.isdigit():
+                self._tokens.refill(time.monotonic())
+                self._tokens.level = min(self._tokens.level, float(remaining))
+
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        if remaining_requests == "0":
+            reset = parse_reset_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                self.pause(reset)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every queued caller for at least `seconds`."""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            logger.warning("LLM requests paused for %.1fs by rate limit", seconds)
+
+    def on_rate_limited(self, headers: Mapping[str, str]) -> Optional[float]:
+        """Record a 429; pause the queue and return the server's retry-after, if any."""
+        self._stats["rate_limited"] += 1
+        retry_after = parse_reset_duration(headers.get("retry-after")) or parse_reset_duration(
+            headers.get("x-ratelimit-reset-tokens")
+        )
+        if retry_after:
+            self.pause(retry_after)
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "wait_seconds": round(self._stats["wait_seconds"], 3),
+            "queue_depth": self._waiting,
+            "requests_available": round(self._requests.level, 2) if self._requests else None,
+            "tokens_available": round(self._tokens.level) if self._tokens else None,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3),
+        }
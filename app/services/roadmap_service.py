@@ -3,11 +3,17 @@ Roadmap generation service using Groq AI.
 Analyzes user data and creates personalized learning roadmap.
 """
 
+import asyncio
 import logging
 import json
-from app.schemas.roadmap_schema import RoadmapResponse
-from app.services.llm_service import call_llm
+import re
+from typing import AsyncIterator
+from pydantic import ValidationError
+from app.core.config import settings
+from app.schemas.roadmap_schema import ProjectImprovement, RoadmapPhase, RoadmapResponse
+from app.services.llm_service import call_llm, stream_llm
 from app.utils.helpers import extract_json_from_llm_response
+from app.utils.json_stream import IncrementalJSONScanner
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +89,106 @@ MERMAID SYNTAX RULES (CRITICAL):
 Now analyze the user data and create the roadmap:
 """
 
+# ─────────────────────────────────────────────────────────────
+# Fan-out prompts: one shared context prefix + one task per part
+# ─────────────────────────────────────────────────────────────
+
+_ROADMAP_PHASE_COUNT = 6
+
+# Junior → Mid-Level .NET target, in learning order: (theme, skill keywords
+# that show the user already has it). The monthly outline is derived from
+# the areas the profile is missing, so separately written phases agree.
+_TARGET_AREAS = [
+    ("C# and .NET fundamentals", ("c#", "csharp", ".net")),
+    ("ASP.NET Core Web API", ("asp.net", "web api")),
+    ("EF Core and SQL Server data access", ("entity framework", "ef core", "sql server", "linq")),
+    ("Clean Architecture, Dependency Injection, CQRS with MediatR", ("clean architecture", "cqrs", "mediatr", "dependency injection")),
+    ("Testing (xUnit, integration tests)", ("xunit", "nunit", "unit test", "testing")),
+    ("Validation and logging (FluentValidation, Serilog)", ("fluentvalidation", "serilog")),
+    ("Security (Identity, JWT)", ("identity", "jwt", "oauth")),
+    ("Performance and caching (Redis)", ("redis", "caching", "performance")),
+    ("Docker and containers", ("docker", "kubernetes")),
+    ("Azure deployment and CI/CD", ("azure", "ci/cd", "github actions", "devops")),
+]
+
+_ROADMAP_CONTEXT_TEMPLATE = """
+You are an expert career advisor and technical mentor specializing in .NET software development.
+
+USER PROFILE:
+{user_data}
+
+ROADMAP CONTEXT:
+Assess the user's current level from their skills, years of experience, education
+and existing projects/certifications (a rule of thumb puts them at: {level}).
+The user gets a 6-month roadmap (EXACTLY 6 phases, Month1 through Month6) for {level} → Mid-Level .NET Developer.
+Parts of the roadmap are written separately, so keep to this monthly outline, built
+from what the profile is missing (adapt the details to the user's current skills and experience):
+{outline}
+
+- Strengthen existing skills and add new skills within the .NET Ecosystem ONLY
+- NO Node.js, NestJS, or non-.NET technologies
+- Practical projects suitable for their level
+"""
+
+_IMPROVEMENTS_TASK_TEMPLATE = """
+You are an expert career advisor and technical mentor specializing in .NET software development.
+
+YOUR PART: project improvements and the roadmap diagram.
+Provide improvements based on the current CV Parser project structure, and a
+Mermaid diagram of this 6-month roadmap outline ({level} → Mid-Level .NET Developer):
+{outline}
+
+REQUIRED JSON SCHEMA (STRICT):
+{{
+  "project_improvements": [
+    {{
+      "area": "Architecture/Database/Security/Testing/etc",
+      "current_issue": "Detailed description of current problem in the CV Parser project",
+      "recommended_improvement": "Specific actionable improvement within .NET ecosystem"
+    }}
+  ],
+  "mermaid_code": "graph TD\\nStart[Current: {level_node}] --> Month1[Month 1: Topic]\\nMonth1 --> Month2[Month 2: Topic]\\n...\\nMonth6 --> End[Target: MidLevel]\\n\\nMonth1 -.-> P1[Project: Name]\\n..."
+}}
+
+IMPORTANT RULES:
+- Return ONLY valid JSON matching the exact schema above
+- NO markdown fences, NO extra text, NO explanations outside JSON
+- MUST include exactly 10 project_improvements (covering Architecture, Database, Security, Testing, Validation, Logging, Error Handling, API Design, Dependency Injection, Code Quality)
+- All project improvements must be based on the current Python CV Parser project and suggest .NET best practices
+- Mermaid node IDs: ONLY alphanumeric characters and underscores (Month1, P1, Start, End); NO spaces or hyphens
+"""
+
+_PHASES_TASK_TEMPLATE = """
+YOUR PART: Write ONLY phases Month{first} through Month{last} of the roadmap.
+
+REQUIRED JSON SCHEMA (STRICT):
+{{
+  "roadmap": [
+    {{
+      "phase": "Month{first}",
+      "focus": ["Main .NET skill 1", "Main .NET skill 2"],
+      "topics": ["Specific .NET topic A", "Specific .NET topic B", "..."],
+      "projects": ["Concrete .NET project idea with clear description"]
+    }}
+  ]
+}}
+
+IMPORTANT RULES:
+- Return ONLY valid JSON matching the exact schema above
+- NO markdown fences, NO extra text, NO explanations outside JSON
+- MUST include exactly {count} roadmap phases (Month{first} through Month{last}), following the monthly outline
+- Each phase should have 8-10 specific topics
+- Each phase should have 3-5 concrete project ideas
+- Focus on .NET ecosystem only: ASP.NET Core, EF Core, C#, Azure, Docker, xUnit, FluentValidation, MediatR, Serilog, etc.
+"""
+
+# Completion budgets for the fan-out calls
+_IMPROVEMENTS_MAX_TOKENS = 1500
+_TOKENS_PER_PHASE = 700
+
+_MERMAID_LABEL_UNSAFE_RE = re.compile(r'[\[\]{}()<>"|;#`]')
+_MERMAID_LABEL_MAX_CHARS = 40
+
 
 async def generate_roadmap(user_data: dict, user_id: str) -> RoadmapResponse:
     """
@@ -96,13 +202,10 @@ async def generate_roadmap(user_data: dict, user_id: str) -> RoadmapResponse:
         RoadmapResponse with complete learning roadmap and project improvements
     """
     
-    # Format user data for better readability
-    user_data_str = json.dumps(user_data, indent=2, ensure_ascii=False)
+    if settings.roadmap_fanout_enabled:
+        return await _generate_roadmap_fanout(user_data, user_id)
     
-    prompt = _ROADMAP_PROMPT_TEMPLATE.format(
-        user_data=user_data_str,
-        user_id=user_id
-    )
+    prompt = _build_roadmap_prompt(user_data, user_id)
     
     logger.info(f"Generating comprehensive roadmap for user: {user_id}")
     
@@ -126,13 +229,7 @@ async def generate_roadmap(user_data: dict, user_id: str) -> RoadmapResponse:
     
     # Validate mermaid code doesn't have invalid characters
     if "mermaid_code" in parsed:
-        mermaid = parsed["mermaid_code"]
-        # Check for common errors
-        if "Month-" in mermaid or "Month " in mermaid:
-            logger.warning("Fixing mermaid code with invalid node names")
-            mermaid = mermaid.replace("Month-", "Month")
-            mermaid = mermaid.replace("Month ", "Month")
-            parsed["mermaid_code"] = mermaid
+        parsed["mermaid_code"] = _fix_mermaid(parsed["mermaid_code"])
     
     # Validate with Pydantic
     try:
@@ -149,6 +246,254 @@ async def generate_roadmap(user_data: dict, user_id: str) -> RoadmapResponse:
     return roadmap
 
 
+async def _generate_roadmap_fanout(user_data: dict, user_id: str) -> RoadmapResponse:
+    """
+    Generate the roadmap as concurrent LLM calls (improvements and diagram,
+    and phases in groups of settings.roadmap_phases_per_call) and merge them.
+    The phase calls share a compact profile prefix; the improvements call
+    needs no profile. All of them follow one outline derived from the profile.
+    """
+    level = _assess_user_level(user_data.get("skills", []), user_data.get("experience", []))
+    outline = "\n".join(
+        f"- Month{n}: {theme}" for n, theme in enumerate(_derive_outline(user_data.get("skills", [])), 1)
+    )
+    context = _build_roadmap_context(user_data, level, outline)
+    group_size = max(1, settings.roadmap_phases_per_call)
+    groups = [
+        (first, min(first + group_size - 1, _ROADMAP_PHASE_COUNT))
+        for first in range(1, _ROADMAP_PHASE_COUNT + 1, group_size)
+    ]
+    
+    logger.info(f"Generating roadmap for user {user_id} as {len(groups) + 1} concurrent calls")
+    
+    improvements_prompt = _IMPROVEMENTS_TASK_TEMPLATE.format(
+        level=level, level_node=re.sub(r"\W", "", level), outline=outline
+    )
+    improvements, *phase_groups = await asyncio.gather(
+        _generate_part(improvements_prompt, _IMPROVEMENTS_MAX_TOKENS, "project_improvements"),
+        *(
+            _generate_part(
+                context + _PHASES_TASK_TEMPLATE.format(first=first, last=last, count=last - first + 1),
+                _TOKENS_PER_PHASE * (last - first + 1),
+                "roadmap",
+            )
+            for first, last in groups
+        ),
+    )
+    
+    return _merge_roadmap(user_id, improvements, [(group, part["roadmap"]) for group, part in zip(groups, phase_groups)])
+
+
+async def _generate_part(prompt: str, max_tokens: int, key: str) -> dict:
+    """Run one fan-out call and return its JSON (which must hold a list under key)."""
+    raw_response: str = await call_llm(prompt, max_tokens=max_tokens)
+    try:
+        parsed = extract_json_from_llm_response(raw_response)
+    except Exception as exc:
+        logger.error("Failed to parse LLM JSON response:\n%s", raw_response)
+        raise RuntimeError("LLM returned invalid JSON.") from exc
+    
+    if not isinstance(parsed.get(key), list):
+        raise ValueError(f"Roadmap part is missing the '{key}' list.")
+    return parsed
+
+
+def _merge_roadmap(
+    user_id: str,
+    improvements: dict,
+    phase_groups: list[tuple[tuple[int, int], list]],
+) -> RoadmapResponse:
+    """Validate the fan-out parts and assemble one RoadmapResponse."""
+    phases = []
+    for (first, last), group in phase_groups:
+        expected = last - first + 1
+        if len(group) != expected:
+            logger.warning(f"Expected {expected} phases for Month{first}-Month{last}, got {len(group)}")
+        # Keep the model's phase names; only unnamed phases get their slot's name
+        for number, phase in enumerate(group[:expected], first):
+            if isinstance(phase, dict) and not phase.get("phase"):
+                phase["phase"] = f"Month{number}"
+            phases.append(phase)
+    
+    mermaid = improvements.get("mermaid_code")
+    try:
+        roadmap = RoadmapResponse.model_validate({
+            "userId": user_id,
+            "roadmap_duration": f"{_ROADMAP_PHASE_COUNT} months",
+            "project_improvements": improvements["project_improvements"],
+            "roadmap": phases,
+            "mermaid_code": _fix_mermaid(mermaid) if isinstance(mermaid, str) else "",
+        })
+    except ValidationError as exc:
+        logger.error("Pydantic validation error: %s", exc)
+        raise ValueError(f"Roadmap data does not match schema: {exc}") from exc
+    
+    if not roadmap.mermaid_code.strip():
+        logger.warning("Roadmap diagram missing from the model's output, building it from the phases")
+        roadmap.mermaid_code = _build_mermaid(roadmap.roadmap)
+    
+    logger.info(f"Roadmap generated successfully for user {user_id}")
+    logger.info(f"Duration: {roadmap.roadmap_duration}, Phases: {len(roadmap.roadmap)}")
+    logger.info(f"Project improvements: {len(roadmap.project_improvements)}")
+    
+    return roadmap
+
+
+async def stream_roadmap(user_data: dict, user_id: str) -> AsyncIterator[dict]:
+    """
+    Generate a roadmap, yielding each part as soon as the LLM completes it.
+    
+    Events (dicts with "event" and "data"):
+        meta                 – {"userId", "roadmap_duration"}
+        project_improvement  – one ProjectImprovement
+        phase                – one RoadmapPhase
+        mermaid_code         – {"mermaid_code"}, always sent last
+        done                 – counts of what was streamed
+    """
+    prompt = _build_roadmap_prompt(user_data, user_id)
+    
+    logger.info(f"Streaming roadmap for user: {user_id}")
+    
+    scanner = IncrementalJSONScanner()
+    duration = "6 months"
+    mermaid = ""
+    improvements = 0
+    phases = 0
+    
+    async for chunk in stream_llm(prompt, max_tokens=4000):
+        for ev in scanner.feed(chunk):
+            if ev.kind == "member" and ev.key == "roadmap_duration" and isinstance(ev.value, str):
+                duration = ev.value
+                yield {"event": "meta", "data": {"userId": user_id, "roadmap_duration": duration}}
+            elif ev.kind == "member" and ev.key == "mermaid_code" and isinstance(ev.value, str):
+                mermaid = _fix_mermaid(ev.value)
+            elif ev.kind == "item" and ev.key == "project_improvements":
+                try:
+                    item = ProjectImprovement.model_validate(ev.value)
+                except ValidationError as exc:
+                    logger.warning("Skipping invalid project improvement: %s", exc)
+                    continue
+                improvements += 1
+                yield {"event": "project_improvement", "data": item.model_dump()}
+            elif ev.kind == "item" and ev.key == "roadmap":
+                try:
+                    phase = RoadmapPhase.model_validate(ev.value)
+                except ValidationError as exc:
+                    logger.warning("Skipping invalid roadmap phase: %s", exc)
+                    continue
+                phases += 1
+                yield {"event": "phase", "data": phase.model_dump()}
+    
+    if not scanner.done:
+        logger.warning("Roadmap stream ended before the JSON object was closed")
+        if not mermaid:
+            try:
+                tail = extract_json_from_llm_response(scanner.buffer)
+                mermaid = _fix_mermaid(tail.get("mermaid_code", ""))
+            except ValueError:
+                pass
+    
+    yield {"event": "mermaid_code", "data": {"mermaid_code": mermaid}}
+    yield {
+        "event": "done",
+        "data": {
+            "userId": user_id,
+            "roadmap_duration": duration,
+            "project_improvements": improvements,
+            "phases": phases,
+        },
+    }
+    
+    logger.info(f"Roadmap streamed for user {user_id}: {phases} phases, {improvements} improvements")
+
+
+def _build_roadmap_prompt(user_data: dict, user_id: str) -> str:
+    """Fill the roadmap prompt template with the user's profile."""
+    # Format user data for better readability
+    user_data_str = json.dumps(user_data, indent=2, ensure_ascii=False)
+    
+    return _ROADMAP_PROMPT_TEMPLATE.format(
+        user_data=user_data_str,
+        user_id=user_id
+    )
+
+
+def _build_roadmap_context(user_data: dict, level: str, outline: str) -> str:
+    """Shared prefix of the fan-out phase prompts (contact details and job descriptions left out)."""
+    profile = {
+        "summary": user_data.get("summary", ""),
+        "skills": user_data.get("skills", []),
+        "education": user_data.get("education", []),
+        "experience": [
+            {k: v for k, v in job.items() if k != "description"} if isinstance(job, dict) else job
+            for job in user_data.get("experience", [])
+        ],
+        "certifications": user_data.get("certifications", []),
+    }
+    return _ROADMAP_CONTEXT_TEMPLATE.format(
+        user_data=json.dumps(profile, indent=2, ensure_ascii=False),
+        level=level,
+        outline=outline,
+    )
+
+
+def _derive_outline(skills: list[str]) -> list[str]:
+    """
+    One theme per month: the target areas the user lacks, in learning order,
+    topped up with areas to deepen when fewer than six are missing.
+    """
+    lowered = [skill.lower() for skill in skills]
+    known = [any(k in skill for k in keywords for skill in lowered) for _, keywords in _TARGET_AREAS]
+    missing = [i for i, has in enumerate(known) if not has]
+    deepen = [i for i, has in enumerate(known) if has][:max(0, _ROADMAP_PHASE_COUNT - len(missing))]
+    themes = [
+        f"Deepen {_TARGET_AREAS[i][0]}" if known[i] else _TARGET_AREAS[i][0]
+        for i in sorted(missing + deepen)
+    ]
+    # Spread the themes over the months, in order
+    return [
+        "; ".join(themes[m * len(themes) // _ROADMAP_PHASE_COUNT:(m + 1) * len(themes) // _ROADMAP_PHASE_COUNT])
+        for m in range(_ROADMAP_PHASE_COUNT)
+    ]
+
+
+def _build_mermaid(phases: list[RoadmapPhase]) -> str:
+    """Mermaid flowchart of the phases (one node per phase name, one project each)."""
+    lines = ["graph TD"]
+    previous = "Start[Current: Junior]"
+    nodes = []
+    for number, phase in enumerate(phases, 1):
+        node = re.sub(r"\W", "", phase.phase) or f"Phase{number}"
+        nodes.append(node)
+        topic = _mermaid_label(phase.focus[0] if phase.focus else phase.phase)
+        lines.append(f"{previous} --> {node}[{_mermaid_label(phase.phase)}: {topic}]")
+        previous = node
+    lines.append(f"{previous} --> End[Target: MidLevel]")
+    lines.append("")
+    for number, (node, phase) in enumerate(zip(nodes, phases), 1):
+        if phase.projects:
+            lines.append(f"{node} -.-> P{number}[Project: {_mermaid_label(phase.projects[0])}]")
+    return "\n".join(lines)
+
+
+def _mermaid_label(text: str) -> str:
+    """Make text safe inside a Mermaid [label]."""
+    label = " ".join(_MERMAID_LABEL_UNSAFE_RE.sub(" ", text).split())
+    if len(label) > _MERMAID_LABEL_MAX_CHARS:
+        label = label[:_MERMAID_LABEL_MAX_CHARS].rsplit(" ", 1)[0] + "..."
+    return label
+
+
+def _fix_mermaid(mermaid: str) -> str:
+    """Remove spaces/hyphens the model tends to put in MonthN node names."""
+    # Check for common errors
+    if "Month-" in mermaid or "Month " in mermaid:
+        logger.warning("Fixing mermaid code with invalid node names")
+        mermaid = mermaid.replace("Month-", "Month")
+        mermaid = mermaid.replace("Month ", "Month")
+    return mermaid
+
+
 def _assess_user_level(skills: list[str], experience: list[dict]) -> str:
     """
     Quick assessment of user level based on skills and experience.
@@ -0,0 +1,201 @@
+"""
+Canonical skill dictionary shared by CV extraction and job matching.
+
+A skill is folded (Unicode/case folding, "#" → "sharp", "+" → "plus", a
+leading "." → "dot", punctuation and spaces dropped) and looked up in an
+alias table compiled once at import, so "C#", "csharp" and "C Sharp", or
+".NET Core" and "dotnet core", all resolve to the same entry.
+
+Every dictionary skill is interned to a small integer id; matching compares
+frozensets of ids. A skill not in the dictionary is identified by its folded
+form instead, so it still matches case/punctuation variants without growing
+the table, and keeps the spelling it was given.
+"""
+
+import json
+import logging
+import re
+import unicodedata
+from functools import lru_cache
+from typing import AbstractSet, Iterable, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Interned id of a dictionary skill, or the folded key of any other skill
+SkillId = Union[int, str]
+
+# ─────────────────────────────────────────────────────────────
+# Dictionary (canonical name → aliases; the name itself needn't be repeated)
+# ─────────────────────────────────────────────────────────────
+# Short aliases that are also other words or other skills' abbreviations
+# ("ts", "rest", "node", "ai", ...) and related-but-distinct tools or
+# practices ("ssms", "tfs", "web api", "ood") are left out: they would
+# merge skills a CV lists separately.
+_SKILL_ALIASES = {
+    # .NET ecosystem
+    "C#": ["c sharp", "csharp", "c-sharp"],
+    "F#": ["f sharp", "fsharp"],
+    "VB.NET": ["visual basic", "visual basic .net"],
+    ".NET": ["dotnet", "dot net", ".net framework", "dotnet framework", "microsoft .net"],
+    ".NET Core": ["dotnet core", "dot net core", ".net 5", ".net 6", ".net 7", ".net 8"],
+    "ASP.NET": ["asp dotnet", "asp .net", "asp net"],
+    "ASP.NET Core": ["asp dotnet core", "asp .net core", "asp net core", "aspnetcore"],
+    "ASP.NET MVC": ["asp .net mvc", "asp net mvc"],
+    "ASP.NET Web API": ["asp .net web api", "asp net web api"],
+    "Entity Framework": ["entity framework 6", "ef6"],
+    "Entity Framework Core": ["ef core", "efcore", "ef core 8"],
+    "LINQ": ["linq to sql", "linq to entities"],
+    "Blazor": ["blazor server", "blazor webassembly", "blazor wasm"],
+    "SignalR": ["asp.net signalr"],
+    "WPF": ["windows presentation foundation"],
+    "WinForms": ["windows forms", "win forms"],
+    "Xamarin": ["xamarin forms", "xamarin.forms"],
+    ".NET MAUI": ["maui", "dotnet maui"],
+    # Languages
+    "C++": ["cpp", "c plus plus"],
+    "JavaScript": ["js", "java script", "ecmascript", "es6"],
+    "TypeScript": ["type script"],
+    "Python": ["python3", "python 3"],
+    "Go": ["golang"],
+    "Objective-C": ["objective c", "objc"],
+    # Web
+    "HTML": ["html5", "html 5"],
+    "CSS": ["css3", "css 3"],
+    "Node.js": ["nodejs", "node js"],
+    "React": ["react.js", "reactjs", "react js"],
+    "React Native": ["react-native"],
+    "Angular": ["angular.js", "angularjs", "angular 2+"],
+    "Vue.js": ["vue", "vuejs", "vue js"],
+    "Next.js": ["nextjs"],
+    "Express.js": ["expressjs"],
+    "jQuery": ["jquery"],
+    "REST APIs": ["restful", "rest api", "restful api", "restful apis", "restful services"],
+    "GraphQL": ["graph ql"],
+    # Data
+    "SQL Server": ["mssql", "ms sql", "ms sql server", "microsoft sql server"],
+    "PostgreSQL": ["postgres", "postgre sql", "psql"],
+    "MySQL": ["my sql"],
+    "MongoDB": ["mongo db"],
+    "T-SQL": ["tsql", "transact sql", "transact-sql"],
+    "Redis": ["redis cache"],
+    # Cloud / DevOps
+    "Microsoft Azure": ["azure", "ms azure"],
+    "Amazon Web Services": ["aws", "amazon aws"],
+    "Google Cloud": ["gcp", "google cloud platform"],
+    "Docker": ["docker compose", "docker-compose"],
+    "Kubernetes": ["k8s"],
+    "CI/CD": ["ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Git": ["git scm"],
+    "GitHub": ["git hub"],
+    "Azure DevOps": ["azure devops services", "vsts"],
+    # Practices
+    "Object-Oriented Programming": ["oop", "object oriented programming"],
+    "SOLID Principles": ["solid principle"],
+    "Design Patterns": ["design pattern", "gof design patterns"],
+    "Microservices": ["microservice", "micro services", "microservices architecture"],
+    "Unit Testing": ["unit tests", "unit test"],
+    "xUnit": ["xunit.net"],
+    "Machine Learning": [],
+    "Artificial Intelligence": [],
+}
+
+_LEADING_DOT_RE = re.compile(r"(?<![^\W_])\.(?=[^\W\d_])")    # ".net" → "dotnet", not "asp.net"
+_SEPARATORS_RE = re.compile(r"[\W_]+")
+
+
+def fold_skill(skill: str) -> str:
+    """Lookup key: case/punctuation/spacing-insensitive ("" for blank input)."""
+    key = unicodedata.normalize("NFKC", skill).casefold()
+    key = _LEADING_DOT_RE.sub("dot", key.replace("#", "sharp").replace("+", "plus"))
+    return _SEPARATORS_RE.sub("", key)
+
+
+# ─────────────────────────────────────────────────────────────
+# Interned vocabulary (compiled once, read-only afterwards)
+# ─────────────────────────────────────────────────────────────
+_ids: dict[str, int] = {}       # folded key (canonical or alias) → id
+_names: list[str] = []          # id → canonical display name
+_keys: list[list[str]] = []     # id → its folded keys (for lookup_keys)
+
+
+def _intern(key: str, name: str) -> int:
+    skill = _ids.get(key)
+    if skill is None:
+        skill = _ids[key] = len(_names)
+        _names.append(name)
+        _keys.append([key])
+    return skill
+
+
+def _compile(aliases: dict[str, list[str]]) -> None:
+    for name, names in aliases.items():
+        skill = _intern(fold_skill(name), name)
+        for alias in names:
+            key = fold_skill(alias)
+            if key not in _ids:
+                _ids[key] = skill
+                _keys[skill].append(key)
+            elif _ids[key] != skill:
+                logger.warning("Skill alias %r already maps to %r, ignored for %r", alias, _names[_ids[key]], name)
+
+
+def _load_extra_aliases(path: str) -> dict[str, list[str]]:
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError) as exc:
+        logger.error("Could not load skill aliases from %s: %s", path, exc)
+        return {}
+
+
+_compile(_SKILL_ALIASES)
+_compile(_load_extra_aliases(settings.skill_aliases_path))
+
+
+@lru_cache(maxsize=65536)
+def skill_id(skill: str) -> Optional[SkillId]:
+    """Interned id of a dictionary skill, else its folded key; None for blank input."""
+    key = fold_skill(skill)
+    if not key:
+        return None
+    return _ids.get(key, key)
+
+
+_BLANK = frozenset([None])
+
+
+def lookup_keys(ids: AbstractSet[SkillId]) -> dict[str, SkillId]:
+    """Every folded key (canonical name and aliases) resolving to one of ids."""
+    return {key: i for i in ids for key in (_keys[i] if isinstance(i, int) else (i,))}
+
+
+def skill_ids(skills: Iterable[str]) -> frozenset[SkillId]:
+    ids = frozenset(map(skill_id, skills))
+    return ids - _BLANK if None in ids else ids
+
+
+def canonical_skills(skills: Iterable[str]) -> list[str]:
+    """
+    Canonical names for dictionary skills, the given spelling (whitespace
+    collapsed) for others; duplicates by skill id dropped, order kept.
+    """
+    seen: set[SkillId] = set()
+    names = []
+    for skill in skills:
+        i = skill_id(skill)
+        if i is not None and i not in seen:
+            seen.add(i)
+            names.append(_names[i] if isinstance(i, int) else " ".join(skill.split()))
+    return names
+
+
+def get_skill_dictionary_stats() -> dict:
+    return {
+        "canonical_skills": len(_names),
+        "lookup_keys": len(_ids),
+        "lookup_cache": skill_id.cache_info()._asdict(),
+    }
@@ -0,0 +1,101 @@
+"""
+Vectorised many-users × many-jobs skill matching.
+
+Skill ids are renumbered into dense matrix columns and the jobs become a
+sparse binary jobs × skills matrix. For a chunk of users, one sparse product gives every
+(user, job) matched-skill count; percentages and top-k selection are done
+with NumPy on the non-zero entries, so Python only touches the top results.
+"""
+
+from dataclasses import dataclass
+from typing import AbstractSet, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from app.services.skill_dictionary import SkillId
+
+
+@dataclass
+class MatrixMatch:
+    """One (user, job) pair in a user's top results."""
+    job_index: int
+    match_percentage: float
+
+
+class SkillMatrix:
+    """
+    Immutable matrix over a fixed list of jobs.
+
+    Args:
+        job_skills: Skill ids of each job
+        titles: Job titles; equal (percentage, title) keep the given job order
+    """
+
+    def __init__(self, job_skills: Sequence[AbstractSet[SkillId]], titles: Sequence[str]):
+        self.skill_ids: dict[SkillId, int] = {}    # skill id → column
+        indptr = [0]
+        indices: list[int] = []
+        for skills in job_skills:
+            for skill in skills:
+                indices.append(self.skill_ids.setdefault(skill, len(self.skill_ids)))
+            indptr.append(len(indices))
+
+        self.job_count = len(job_skills)
+        # skills × jobs, so a users × skills chunk multiplies straight into users × jobs
+        jobs = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(self.job_count, max(1, len(self.skill_ids))),
+        )
+        self._skills_by_job = jobs.T.tocsr()
+        self._job_sizes = np.diff(jobs.indptr).astype(np.float64)
+
+        # Higher rank = earlier title, so one descending key sorts by (-percentage, title)
+        order = np.argsort(np.array(titles, dtype=object), kind="stable")
+        self._title_rank = np.empty(self.job_count, dtype=np.int64)
+        self._title_rank[order] = np.arange(self.job_count - 1, -1, -1)
+
+    def top_matches(
+        self,
+        user_skills: Sequence[AbstractSet[SkillId]],
+        top_k: int,
+        chunk_size: int = 1024,
+    ) -> list[list[MatrixMatch]]:
+        """Best top_k jobs per user (jobs with no shared skill are left out)."""
+        results: list[list[MatrixMatch]] = []
+        for start in range(0, len(user_skills), chunk_size):
+            results.extend(self._top_chunk(user_skills[start:start + chunk_size], top_k))
+        return results
+
+    def _top_chunk(self, user_skills: Sequence[AbstractSet[SkillId]], top_k: int) -> list[list[MatrixMatch]]:
+        indptr = [0]
+        indices: list[int] = []
+        for skills in user_skills:
+            indices.extend(self.skill_ids[s] for s in skills if s in self.skill_ids)
+            indptr.append(len(indices))
+        users = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(user_skills), self._skills_by_job.shape[0]),
+        )
+        matched = (users @ self._skills_by_job).tocsr()    # users × jobs, matched-skill counts
+
+        percentages = np.round(matched.data / self._job_sizes[matched.indices] * 100, 1)
+        keys = np.rint(percentages * 10).astype(np.int64) * self.job_count + self._title_rank[matched.indices]
+
+        chunk: list[list[MatrixMatch]] = []
+        for row in range(matched.shape[0]):
+            lo, hi = matched.indptr[row], matched.indptr[row + 1]
+            if lo == hi:
+                chunk.append([])
+                continue
+            row_keys = keys[lo:hi]
+            if hi - lo > top_k:
+                best = np.argpartition(row_keys, -top_k)[-top_k:]
+            else:
+                best = np.arange(hi - lo)
+            best = best[np.argsort(-row_keys[best])]
+            chunk.append([
+                MatrixMatch(job_index=int(matched.indices[lo + i]), match_percentage=float(percentages[lo + i]))
+                for i in best
+            ])
+        return chunk
@@ -0,0 +1,75 @@
+"""
+Skill rarity (IDF) weights for weighted /match-jobs scoring.
+
+Document frequencies are kept per skill id over the catalog's jobs and the
+stored CV profiles, and updated as each job or profile is added or removed,
+so a weight is one lookup and one log, never a corpus scan:
+
+    idf(skill) = ln((documents + 1) / (df(skill) + 1)) + 1
+
+A skill every job asks for ("Git") weighs about 1; a rare one
+("Kubernetes") weighs more.
+
+Scoring reads a snapshot(), a read-only copy shared until the next change,
+so it needs no lock while the owner keeps updating the live counts.
+"""
+
+import math
+from collections import Counter
+from typing import AbstractSet, Optional
+
+from app.services.skill_dictionary import SkillId
+
+
+class SkillWeights:
+    """Smoothed IDF over a changing set of skill-id documents."""
+
+    def __init__(self):
+        self.documents = 0
+        self._df: Counter[SkillId] = Counter()
+        self._frozen = False
+        self._snapshot: Optional["SkillWeights"] = None
+
+    def _changing(self) -> None:
+        if self._frozen:
+            raise TypeError("SkillWeights snapshot is read-only")
+        self._snapshot = None
+
+    def add(self, skills: AbstractSet[SkillId]) -> None:
+        self._changing()
+        self.documents += 1
+        self._df.update(skills)
+
+    def remove(self, skills: AbstractSet[SkillId]) -> None:
+        self._changing()
+        self.documents -= 1
+        for skill in skills:
+            self._df[skill] -= 1
+            if self._df[skill] <= 0:
+                del self._df[skill]
+
+    def clear(self) -> None:
+        self._changing()
+        self.documents = 0
+        self._df.clear()
+
+    def snapshot(self) -> "SkillWeights":
+        """Read-only copy of the current weights (reused until the next change)."""
+        if self._frozen:
+            return self
+        if self._snapshot is None:
+            frozen = SkillWeights()
+            frozen.documents = self.documents
+            frozen._df = self._df.copy()
+            frozen._frozen = True
+            self._snapshot = frozen
+        return self._snapshot
+
+    def idf(self, skill: SkillId) -> float:
+        return math.log((self.documents + 1) / (self._df.get(skill, 0) + 1)) + 1
+
+    def total(self, skills: AbstractSet[SkillId]) -> float:
+        return sum(self.idf(skill) for skill in skills)
+
+    def stats(self) -> dict:
+        return {"documents": self.documents, "skills": len(self._df)}
@@ -0,0 +1,340 @@
+"""
+CV text compaction before it is sent to the LLM.
+
+extract_text separates PDF pages with PAGE_BREAK. compact_cv_text runs a
+deterministic pipeline over that output:
+
+1. character clean-up (ligatures, NBSP, zero-width chars, bullet glyphs)
+2. removal of headers/footers repeated across pages and page numbers
+3. de-hyphenation of words split across lines
+4. whitespace collapse and duplicate-line removal
+5. section-aware truncation to a token budget
+
+split_sections is also used to give each CV section its own budget share.
+"""
+
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PAGE_BREAK = "\f"
+
+# ─────────────────────────────────────────────────────────────
+# Patterns (compiled once)
+# ─────────────────────────────────────────────────────────────
+
+_CHAR_MAP = str.maketrans({
+    "\u00a0": " ",   # NBSP and narrow/thin spaces
+    "\u2009": " ",
+    "\u202f": " ",
+    "\u200b": None,  # zero-width space / joiners / BOM
+    "\u200c": None,
+    "\u200d": None,
+    "\ufeff": None,
+    "\ufb00": "ff",  # ligatures
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+})
+
+_BULLETS = "•●▪■□◦‣∙·►▶➢➤✓✔❖◆◇○-–—*"
+_LEADING_BULLET_RE = re.compile(rf"^\s*[{re.escape(_BULLETS)}]+\s*")
+_INLINE_BULLET_RE = re.compile(r"\s+[•●▪■◦‣∙·►▶➢➤❖◆]\s+")
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n[ \t]*([a-z])")
+_SPACES_RE = re.compile(r"[ \t\r\v]+")
+_PAGE_NUMBER_RE = re.compile(
+    r"^(?:page\s*)?[-–(\[]?\s*\d{1,3}\s*(?:(?:/|of)\s*\d{1,3})?\s*[-–)\]]?$",
+    re.IGNORECASE,
+)
+_DIGITS_RE = re.compile(r"\d+")
+
+# Lines this long or longer are removed when repeated anywhere in the text;
+# shorter ones ("Present", "Cairo, Egypt") only when directly repeated.
+_DEDUPE_MIN_CHARS = 30
+
+# How many lines at the top/bottom of a page can be header/footer.
+_EDGE_LINES = 3
+
+_SECTION_ALIASES = {
+    "summary": [
+        "summary", "professional summary", "profile", "professional profile",
+        "about", "about me", "objective", "career objective", "personal statement",
+    ],
+    "experience": [
+        "experience", "work experience", "professional experience", "employment",
+        "employment history", "work history", "career history", "internships",
+        "internship", "experience and internships",
+    ],
+    "education": [
+        "education", "academic background", "education and training",
+        "academic qualifications", "qualifications",
+    ],
+    "skills": [
+        "skills", "technical skills", "core skills", "key skills", "skill set",
+        "competencies", "core competencies", "technologies", "tech stack",
+        "tools and technologies", "soft skills",
+    ],
+    "certifications": [
+        "certifications", "certificates", "licenses and certifications",
+        "certifications and licenses", "courses and certifications",
+    ],
+    "languages": ["languages", "language skills"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "courses": ["courses", "training", "trainings", "relevant coursework", "coursework"],
+    "awards": ["awards", "honors", "honours", "achievements", "awards and honors"],
+    "publications": ["publications", "research", "papers", "conferences"],
+    "volunteering": ["volunteering", "volunteer experience", "activities", "extracurricular activities"],
+    "references": ["references", "referees"],
+    "interests": ["interests", "hobbies", "hobbies and interests"],
+}
+
+_HEADING_LOOKUP = {
+    alias: name for name, aliases in _SECTION_ALIASES.items() for alias in aliases
+}
+_HEADING_CLEAN_RE = re.compile(r"[^a-z ]+")
+
+# Sections removed first when the text is over budget.
+_DROPPABLE_SECTIONS = {"references", "interests"}
+
+
+# ─────────────────────────────────────────────────────────────
+# Results
+# ─────────────────────────────────────────────────────────────
+
+@dataclass
+class CVSection:
+    """A block of CV text under one heading ("header" = text before any heading)."""
+    name: str
+    heading: str
+    lines: list[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        body = "\n".join(self.lines)
+        return f"{self.heading}\n{body}" if self.heading else body
+
+
+@dataclass
+class CompactionResult:
+    """Compacted text plus token accounting."""
+    text: str
+    original_tokens: int
+    compacted_tokens: int
+    truncated: bool = False
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.saved_tokens / self.original_tokens if self.original_tokens else 0.0
+
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "original_tokens": 0, "compacted_tokens": 0, "truncated": 0}
+
+
+# ─────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────
+
+def estimate_tokens(text: str) -> int:
+    """Rough Llama-tokenizer estimate (~4 characters per token)."""
+    return math.ceil(len(text) / 4)
+
+
+def compact_cv_text(text: str, max_tokens: Optional[int] = None) -> CompactionResult:
+    """
+    Normalise extracted CV text and fit it into max_tokens.
+
+    Args:
+        text: Output of file_parser.extract_text (pages separated by PAGE_BREAK)
+        max_tokens: Token budget for the CV text; None or 0 disables truncation
+    """
+    original_tokens = estimate_tokens(text)
+
+    pages = [page.translate(_CHAR_MAP) for page in text.split(PAGE_BREAK)]
+    pages = _strip_page_furniture(pages)
+    joined = _HYPHEN_BREAK_RE.sub(r"\1\2", "\n".join(pages))
+    lines = _clean_lines(joined.split("\n"))
+
+    compacted = "\n".join(lines)
+    truncated = False
+    if max_tokens and estimate_tokens(compacted) > max_tokens:
+        compacted = _truncate_sections(split_sections(compacted), max_tokens)
+        truncated = True
+
+    result = CompactionResult(
+        text=compacted,
+        original_tokens=original_tokens,
+        compacted_tokens=estimate_tokens(compacted),
+        truncated=truncated,
+    )
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["original_tokens"] += result.original_tokens
+        _stats["compacted_tokens"] += result.compacted_tokens
+        _stats["truncated"] += int(truncated)
+    return result
+
+
+def split_sections(text: str) -> list[CVSection]:
+    """Split CV text on recognised section headings, in document order."""
+    sections = [CVSection(name="header", heading="")]
+    for line in text.split("\n"):
+        name = _heading_name(line)
+        if name:
+            sections.append(CVSection(name=name, heading=line.strip()))
+        else:
+            sections[-1].lines.append(line)
+    if not sections[0].lines:
+        sections.pop(0)
+    return sections
+
+
+def truncate_sections(text: str, max_tokens: int) -> str:
+    """Section-aware truncation of already compacted text (no-op when it fits)."""
+    if not max_tokens or estimate_tokens(text) <= max_tokens:
+        return text
+    return _truncate_sections(split_sections(text), max_tokens)
+
+
+def get_compaction_stats() -> dict:
+    """Cumulative token savings since startup."""
+    with _stats_lock:
+        saved = _stats["original_tokens"] - _stats["compacted_tokens"]
+        return {
+            **_stats,
+            "saved_tokens": saved,
+            "saved_ratio": round(saved / _stats["original_tokens"], 4) if _stats["original_tokens"] else 0.0,
+        }
+
+
+# ─────────────────────────────────────────────────────────────
+# Pipeline steps
+# ─────────────────────────────────────────────────────────────
+
+def _heading_name(line: str) -> Optional[str]:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40:
+        return None
+    key = _HEADING_CLEAN_RE.sub(" ", stripped.lower().replace("&", " and "))
+    return _HEADING_LOOKUP.get(" ".join(key.split()))
+
+
+def _edge_key(line: str) -> str:
+    return _DIGITS_RE.sub("#", " ".join(line.lower().split()))
+
+
+def _strip_page_furniture(pages: list[str]) -> list[str]:
+    """
+    Drop page numbers, and header/footer lines repeated on most pages from
+    every page but the first (the header often carries the name and contact).
+    """
+    page_lines = [[l for l in page.split("\n") if l.strip()] for page in pages]
+
+    repeated: set[str] = set()
+    if len(page_lines) >= 2:
+        counts: Counter[str] = Counter()
+        for lines in page_lines:
+            edges = lines[:_EDGE_LINES] + lines[-_EDGE_LINES:]
+            counts.update({_edge_key(l) for l in edges})
+        threshold = max(2, math.ceil(len(page_lines) / 2))
+        repeated = {key for key, n in counts.items() if n >= threshold}
+
+    cleaned = []
+    for page, lines in enumerate(page_lines):
+        last = len(lines) - 1
+        kept = []
+        for i, line in enumerate(lines):
+            at_edge = i < _EDGE_LINES or i > last - _EDGE_LINES
+            if at_edge and ((page and _edge_key(line) in repeated) or _PAGE_NUMBER_RE.match(line.strip())):
+                continue
+            kept.append(line)
+        cleaned.append("\n".join(kept))
+    return cleaned
+
+
+def _clean_lines(lines: list[str]) -> list[str]:
+    """Normalise bullets/whitespace, drop blank runs and duplicate lines."""
+    out: list[str] = []
+    seen: set[str] = set()
+    previous = ""
+    for raw in lines:
+        line = _LEADING_BULLET_RE.sub("- ", raw) if _LEADING_BULLET_RE.match(raw) else raw
+        line = _INLINE_BULLET_RE.sub(", ", line)
+        line = _SPACES_RE.sub(" ", line).strip()
+        if line in ("-", ""):
+            continue
+        key = line.lower()
+        if key == previous or (len(line) >= _DEDUPE_MIN_CHARS and key in seen):
+            continue
+        seen.add(key)
+        previous = key
+        out.append(line)
+    return out
+
+
+def _truncate_sections(sections: list[CVSection], max_tokens: int) -> str:
+    """
+    Fit sections into max_tokens.
+
+    Low-value sections are dropped first; the remaining budget is then shared
+    so that short sections (contact, skills, languages) stay whole and only
+    the longest ones are cut, at line boundaries.
+    """
+    sections = [s for s in sections if s.name not in _DROPPABLE_SECTIONS] or sections
+
+    sizes = [_section_cost(s) for s in sections]
+    allocation = _fair_share(sizes, max_tokens)
+
+    parts = []
+    for section, budget in zip(sections, allocation):
+        kept = [section.heading] if section.heading else []
+        used = _line_cost(section.heading) if section.heading else 0
+        for line in section.lines:
+            cost = _line_cost(line)
+            if used + cost > budget:
+                break
+            kept.append(line)
+            used += cost
+        if kept and (not section.heading or len(kept) > 1):
+            parts.append("\n".join(kept))
+    return "\n".join(parts)
+
+
+def _line_cost(line: str) -> int:
+    # +1 for the newline joining it to the next line
+    return estimate_tokens(line) + 1
+
+
+def _section_cost(section: CVSection) -> int:
+    cost = sum(_line_cost(line) for line in section.lines)
+    return cost + (_line_cost(section.heading) if section.heading else 0)
+
+
+def _fair_share(sizes: list[int], budget: int) -> list[int]:
+    """Water-filling: every section gets min(size, level) with sum ≤ budget."""
+    allocation = [0] * len(sizes)
+    remaining = budget
+    pending = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    while pending:
+        level = remaining // len(pending)
+        i = pending[0]
+        if sizes[i] <= level:
+            allocation[i] = sizes[i]
+            remaining -= sizes[i]
+            pending.pop(0)
+        else:
+            for j in pending:
+                allocation[j] = level
+            break
+    return allocation
@@ -0,0 +1,194 @@
+"""
+Two-tier key/value cache: in-memory LRU with TTL, plus an optional SQLite
+file shared by every uvicorn worker on the host.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Prune expired disk rows once every N writes.
+_DISK_PRUNE_INTERVAL = 256
+
+
+class TieredCache:
+    """
+    LRU + TTL memory tier in front of an optional on-disk tier.
+
+    Args:
+        name: Label used in logs and stats
+        max_entries: Memory-tier capacity (least recently used is evicted)
+        ttl_seconds: Entry lifetime in both tiers (0 = never expires)
+        disk_path: SQLite file for the shared tier; empty disables it
+        max_bytes: Memory-tier size limit in UTF-8 bytes of values (0 = entry count only)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl_seconds: float,
+        disk_path: str = "",
+        max_bytes: int = 0,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[str, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+        self._stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        if disk_path:
+            self._disk = self._open_disk(disk_path)
+
+    # ── Public API ───────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached value or None."""
+        now = time.time()
+        with self._lock:
+            expired = False
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, size = entry
+                if expires_at and expires_at <= now:
+                    del self._entries[key]
+                    self._bytes -= size
+                    expired = True
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return value
+
+            disk_entry = self._disk_get(key)
+            if disk_entry is not None:
+                value, expires_at = disk_entry
+                if expires_at and expires_at <= now:
+                    expired = True
+                else:
+                    self._memory_set(key, value, expires_at)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return value
+
+            if expired:
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store value in both tiers."""
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else 0.0
+        with self._lock:
+            self._memory_set(key, value, expires_at)
+            self._disk_set(key, value, expires_at)
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM cache_entries")
+                self._disk.commit()
+
+    def stats(self) -> dict:
+        """Counters plus current size and hit rate."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "name": self.name,
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": self._disk is not None,
+            }
+
+    # ── Memory tier ──────────────────────────────────────────
+
+    def _memory_set(self, key: str, value: str, expires_at: float) -> None:
+        size = len(value.encode("utf-8"))
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[2]
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._stats["evictions"] += 1
+
+    # ── Disk tier ────────────────────────────────────────────
+
+    def _open_disk(self, path: str) -> Optional[sqlite3.Connection]:
+        try:
+            conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            logger.info("%s cache: disk tier at %s", self.name, path)
+            return conn
+        except sqlite3.Error as exc:
+            logger.warning("%s cache: disk tier disabled (%s)", self.name, exc)
+            return None
+
+    def _disk_get(self, key: str) -> Optional[tuple[str, float]]:
+        if self._disk is None:
+            return None
+        try:
+            row = self._disk.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("%s cache: disk read failed (%s)", self.name, exc)
+            return None
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        if self._disk is None:
+            return
+        try:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._disk_writes += 1
+            if self._disk_writes % _DISK_PRUNE_INTERVAL == 0:
+                self._disk.execute(
+                    "DELETE FROM cache_entries WHERE expires_at > 0 AND expires_at <= ?",
+                    (time.time(),),
+                )
+            self._disk.commit()
+        except sqlite3.Error as exc:
+            logger.warning("%s cache: disk write failed (%s)", self.name, exc)
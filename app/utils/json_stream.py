@@ -0,0 +1,300 @@
+"""
+Incremental scanning and tolerant parsing of JSON produced by an LLM.
+
+IncrementalJSONScanner is fed text in arbitrary chunks. It tracks
+string/escape state and bracket depth in a single pass and reports, as soon
+as they are complete:
+
+- each element of an array that is a member of the top-level object
+  (kind "item"), and
+- each member of the top-level object (kind "member").
+
+Anything before the first "{" (e.g. a ```json fence) is ignored.
+
+repair_json makes one pass over a complete or truncated response and
+returns strict JSON for the first top-level object, applying a bounded set
+of repairs instead of failing (see its docstring).
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional, TypeVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+
+
+@dataclass
+class JSONStreamEvent:
+    """A completed piece of the top-level object."""
+    kind: str          # "item" or "member"
+    key: str           # top-level member name
+    value: Any
+
+
+class IncrementalJSONScanner:
+    """Single-pass scanner over a growing JSON text."""
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        # One entry per open container: "{" or "["
+        self._stack: list[str] = []
+        self._started = False
+        self._done = False
+        # Top-level member bookkeeping
+        self._expect_key = False
+        self._key_start: Optional[int] = None
+        self._current_key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        # Array-element bookkeeping (depth 2 inside a top-level array)
+        self._item_start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level object has been closed."""
+        return self._done
+
+    def feed(self, chunk: str) -> list[JSONStreamEvent]:
+        """Append chunk and return events completed by it."""
+        self.buffer += chunk
+        events: list[JSONStreamEvent] = []
+        buf = self.buffer
+
+        while self._pos < len(buf) and not self._done:
+            i = self._pos
+            ch = buf[i]
+            self._pos += 1
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._stack.append("{")
+                    self._expect_key = True
+                continue
+
+            depth = len(self._stack)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if depth == 1 and self._key_start is not None:
+                        self._current_key = json.loads(buf[self._key_start:i + 1])
+                        self._key_start = None
+                    elif depth == 1 and self._value_start is not None:
+                        self._emit_member(events, i + 1)
+                    elif depth == 2 and self._stack[-1] == "[" and self._item_start is not None:
+                        self._emit_item(events, i + 1)
+                continue
+
+            if ch.isspace():
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if depth == 1:
+                    if self._expect_key:
+                        self._key_start = i
+                        self._expect_key = False
+                    elif self._value_start is None:
+                        self._value_start = i
+                elif depth == 2 and self._stack[-1] == "[" and self._item_start is None:
+                    self._item_start = i
+                continue
+
+            if ch == ":" and depth == 1:
+                continue
+
+            if ch in "{[":
+                if depth == 1 and self._value_start is None:
+                    self._value_start = i
+                elif depth == 2 and self._stack[-1] == "[" and self._item_start is None:
+                    self._item_start = i
+                self._stack.append(ch)
+                continue
+
+            if ch in "}]":
+                if depth == 2 and self._stack[-1] == "[" and self._item_start is not None:
+                    # Scalar item terminated by the closing bracket
+                    self._emit_item(events, i)
+                self._stack.pop()
+                depth -= 1
+                if depth == 2 and self._stack[-1] == "[" and self._item_start is not None:
+                    self._emit_item(events, i + 1)
+                elif depth == 1 and self._value_start is not None and ch == "]" and buf[self._value_start] == "[":
+                    self._emit_member(events, i + 1)
+                elif depth == 1 and self._value_start is not None and ch == "}" and buf[self._value_start] == "{":
+                    self._emit_member(events, i + 1)
+                elif depth == 0:
+                    if self._value_start is not None:
+                        self._emit_member(events, i)
+                    self._done = True
+                continue
+
+            if ch == ",":
+                if depth == 1:
+                    if self._value_start is not None:
+                        self._emit_member(events, i)
+                    self._expect_key = True
+                elif depth == 2 and self._stack[-1] == "[" and self._item_start is not None:
+                    self._emit_item(events, i)
+                continue
+
+            # Start of a bare literal (number, true, false, null)
+            if depth == 1 and self._value_start is None and not self._expect_key:
+                self._value_start = i
+            elif depth == 2 and self._stack[-1] == "[" and self._item_start is None:
+                self._item_start = i
+
+        return events
+
+    # ── Helpers ──────────────────────────────────────────────
+
+    def _emit_item(self, events: list[JSONStreamEvent], end: int) -> None:
+        raw = self.buffer[self._item_start:end]
+        self._item_start = None
+        try:
+            value = json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            return
+        events.append(JSONStreamEvent("item", self._current_key or "", value))
+
+    def _emit_member(self, events: list[JSONStreamEvent], end: int) -> None:
+        raw = self.buffer[self._value_start:end]
+        self._value_start = None
+        try:
+            value = json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            return
+        events.append(JSONStreamEvent("member", self._current_key or "", value))
+
+
+def repair_json(text: str) -> str:
+    """
+    Return the first top-level JSON object in text as strict JSON.
+
+    Repairs applied in the same pass:
+    - text before the first "{" and after the object is dropped
+    - raw control characters inside strings are escaped
+    - trailing and doubled commas are removed
+    - a mismatched closing bracket is replaced by the expected one
+    - if the text ends early (e.g. max_tokens), the dangling key/element
+      is dropped and every open bracket is closed
+
+    Raises:
+        ValueError: text contains no "{"
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON found")
+
+    out: list[str] = []
+    # One entry per open container:
+    # [closing bracket, expecting a key, position in out, is an array element]
+    stack: list[list] = []
+    fixes: set[str] = set()
+    in_string = False
+    escape = False
+    string_is_key = False
+    in_literal = False
+    safe = 0  # len(out) at the last point where the text can be cut and closed
+
+    for ch in text[start:]:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                out.append(ch)
+                if not string_is_key:
+                    safe = len(out)
+                continue
+            elif ch < " ":
+                out.append(_CONTROL_ESCAPES.get(ch, f"\\u{ord(ch):04x}"))
+                fixes.add("control characters")
+                continue
+            out.append(ch)
+            continue
+
+        if in_literal and (ch in ",}]:" or ch.isspace()):
+            in_literal = False
+            safe = len(out)
+
+        if ch.isspace():
+            continue
+
+        if ch == '"':
+            in_string = True
+            string_is_key = bool(stack) and stack[-1][1]
+            out.append(ch)
+        elif ch in "{[":
+            in_array = bool(stack) and stack[-1][0] == "]"
+            stack.append(["}" if ch == "{" else "]", ch == "{", len(out), in_array])
+            out.append(ch)
+            safe = len(out)
+        elif ch in "}]":
+            if out[-1] == ",":
+                out.pop()
+                fixes.add("trailing comma")
+            closer = stack.pop()[0]
+            if closer != ch:
+                fixes.add("mismatched bracket")
+            out.append(closer)
+            safe = len(out)
+            if not stack:
+                break
+        elif ch == ",":
+            if out[-1] in ",[{":
+                fixes.add("extra comma")
+                continue
+            if stack[-1][0] == "}":
+                stack[-1][1] = True
+            out.append(ch)
+        elif ch == ":":
+            stack[-1][1] = False
+            out.append(ch)
+        else:
+            in_literal = True
+            out.append(ch)
+
+    if stack:
+        fixes.add("truncated output")
+        cut = safe
+        # A half-written object inside an array is dropped whole
+        for depth, (closer, _, pos, in_array) in enumerate(stack):
+            if closer == "}" and in_array:
+                cut = pos
+                del stack[depth:]
+                break
+        del out[cut:]
+        while out and out[-1] == ",":
+            out.pop()
+        out.extend(entry[0] for entry in reversed(stack))
+
+    if fixes:
+        logger.warning("Repaired LLM JSON: %s", ", ".join(sorted(fixes)))
+    return "".join(out)
+
+
+def parse_llm_json(text: str) -> dict:
+    """Parse the first JSON object in an LLM response, repairing it if needed."""
+    return json.loads(repair_json(text))
+
+
+def validate_llm_json(text: str, model: type[M]) -> M:
+    """Repair an LLM response and validate it directly into model."""
+    return model.model_validate_json(repair_json(text))
@@ -0,0 +1,266 @@
+"""
+Bounded, streaming upload reader.
+
+The request body of an upload route is capped while it arrives, before
+Starlette spools the multipart form (UploadSizeLimitMiddleware; a client's
+content-length cannot be trusted). Each file is then read once, hashed and
+checked against settings.max_file_size_bytes. Small files stay in memory.
+A file Starlette has already rolled over to disk is not copied: the upload
+keeps a descriptor of that temp file open, and the parsers (and the parser
+worker processes) open it through /proc by path, so a request never holds
+more than settings.upload_spool_threshold_bytes of file data in memory and
+every file is written to disk at most once. Where /proc is not available,
+large files are copied to a named temp file instead.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from typing import BinaryIO, Mapping, Optional, Union
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Other processes of this user can open our descriptors as /proc/<pid>/fd/<n>
+_PROC_FDS = os.path.isdir("/proc/self/fd")
+
+
+class SpooledUpload:
+    """
+    A size-checked upload held in memory or in a temp file.
+
+    Attributes:
+        filename: Client file name
+        size: Bytes received
+        sha256: Hex digest of the content
+        source: The bytes, or the temp file path (what extract_text accepts)
+
+    With fd, the upload owns that open descriptor of an anonymous temp file
+    and path is its /proc entry; close() closes it instead of unlinking.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        size: int,
+        sha256: str,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+        fd: Optional[int] = None,
+    ):
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+        self._data = data
+        self._path = path
+        self._fd = fd
+
+    @classmethod
+    def from_bytes(cls, filename: str, data: bytes) -> "SpooledUpload":
+        return cls(filename, len(data), hashlib.sha256(data).hexdigest(), data=data)
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self._path if self._path is not None else self._data
+
+    @property
+    def spooled(self) -> bool:
+        return self._path is not None
+
+    def read_bytes(self) -> bytes:
+        if self._path is None:
+            return self._data
+        with open(self._path, "rb") as f:
+            return f.read()
+
+    def close(self) -> None:
+        """Delete the temp file, if any. Safe to call more than once."""
+        self._data = b""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._path = None
+        if self._path is not None:
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+            self._path = None
+
+
+class _Spooler:
+    """Accumulates chunks in memory, moving to a temp file past the threshold."""
+
+    def __init__(self, filename: str, max_bytes: int):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._buffer = bytearray()
+        self._spool = None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise ValueError("File too large")
+        self._digest.update(chunk)
+        if self._spool is not None:
+            self._spool.write(chunk)
+            return
+        self._buffer += chunk
+        if len(self._buffer) > settings.upload_spool_threshold_bytes:
+            self._spool = tempfile.NamedTemporaryFile(prefix="cv-upload-", delete=False)
+            self._spool.write(self._buffer)
+            self._buffer = bytearray()
+
+    def finish(self) -> SpooledUpload:
+        if self.size == 0:
+            self.discard()
+            raise ValueError("Uploaded file is empty.")
+        if self._spool is None:
+            return SpooledUpload(self.filename, self.size, self._digest.hexdigest(), data=bytes(self._buffer))
+        self._spool.close()
+        logger.info("Spooled %s (%d bytes) to %s", self.filename, self.size, self._spool.name)
+        return SpooledUpload(self.filename, self.size, self._digest.hexdigest(), path=self._spool.name)
+
+    def discard(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+            os.unlink(self._spool.name)
+            self._spool = None
+
+
+async def read_upload(file: UploadFile, max_bytes: Optional[int] = None) -> SpooledUpload:
+    """
+    Hash an upload and check its size, reading it once.
+
+    Starlette has already received the form by the time a route runs, so
+    this cap is per file; the request as a whole is bounded earlier by
+    UploadSizeLimitMiddleware. A file Starlette spooled to disk is adopted
+    as it is rather than copied.
+
+    Raises:
+        ValueError: File is empty or larger than max_bytes
+                    (defaults to settings.max_file_size_bytes)
+    """
+    max_bytes = max_bytes if max_bytes is not None else settings.max_file_size_bytes
+    if file.size is not None and file.size > max_bytes:
+        raise ValueError("File too large")
+    if _PROC_FDS and getattr(file.file, "_rolled", False):
+        return await asyncio.to_thread(_adopt_spool_file, file.filename or "", file.file.fileno(), max_bytes)
+
+    spooler = _Spooler(file.filename or "", max_bytes)
+    try:
+        while chunk := await file.read(settings.upload_chunk_bytes):
+            spooler.write(chunk)
+    except BaseException:
+        spooler.discard()
+        raise
+    return spooler.finish()
+
+
+def _adopt_spool_file(filename: str, fileno: int, max_bytes: int) -> SpooledUpload:
+    """Hash Starlette's on-disk spool file and keep our own descriptor of it."""
+    # A duplicate outlives Starlette closing the form; pread leaves its file position alone
+    fd = os.dup(fileno)
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        while chunk := os.pread(fd, settings.upload_chunk_bytes, size):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError("File too large")
+            digest.update(chunk)
+        if size == 0:
+            raise ValueError("Uploaded file is empty.")
+    except BaseException:
+        os.close(fd)
+        raise
+    return SpooledUpload(filename, size, digest.hexdigest(), path=f"/proc/{os.getpid()}/fd/{fd}", fd=fd)
+
+
+def spool_stream(filename: str, stream: BinaryIO, max_bytes: Optional[int] = None) -> SpooledUpload:
+    """Blocking counterpart of read_upload for file objects (e.g. zip entries)."""
+    spooler = _Spooler(filename, max_bytes if max_bytes is not None else settings.max_file_size_bytes)
+    try:
+        while chunk := stream.read(settings.upload_chunk_bytes):
+            spooler.write(chunk)
+    except BaseException:
+        spooler.discard()
+        raise
+    return spooler.finish()
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject request bodies over a per-path limit with 413.
+
+    The declared content-length is checked up front and the bytes actually
+    received are counted, so an oversized upload is cut off as soon as it
+    passes the limit instead of being spooled in full first.
+
+    Args:
+        app: The wrapped ASGI app
+        limits: Request path → maximum body size in bytes
+    """
+
+    def __init__(self, app: ASGIApp, limits: Mapping[str, int]):
+        self.app = app
+        self.limits = dict(limits)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        declared = Headers(scope=scope).get("content-length", "")
+        if declared.isdigit() and int(declared) > limit:
+            await _too_large(limit)(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            # FastAPI turns a failed form read into its own 400; send the 413 instead
+            if exceeded and not started:
+                return
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            pass
+        if exceeded and not started:
+            logger.warning("Rejected %s: request body over %d bytes", scope["path"], limit)
+            await _too_large(limit)(scope, receive, send)
+
+
+def _too_large(limit: int) -> JSONResponse:
+    return JSONResponse({"detail": f"Request body too large (limit {limit} bytes)"}, status_code=413)
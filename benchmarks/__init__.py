@@ -0,0 +1 @@
+"""Performance benchmarks for the CV pipeline (see run_benchmarks.py)."""
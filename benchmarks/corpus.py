@@ -0,0 +1,249 @@
+"""
+Synthetic CV corpus for the benchmarks.
+
+Builds PDF and DOCX files directly (no reportlab / python-docx needed) from
+seeded random CV content, so every run and every machine parses exactly the
+same bytes. Layouts cover what the parsers treat differently: single-column
+text, two-column PDFs, DOCX tables / headers / text boxes, and long CVs.
+"""
+
+import io
+import random
+import zipfile
+from dataclasses import dataclass
+from xml.sax.saxutils import escape
+
+_FIRST_NAMES = ["Ahmed", "Sara", "Omar", "Mona", "Youssef", "Nour", "Karim", "Laila", "Hassan", "Dina"]
+_LAST_NAMES = ["Elsayed", "Hassan", "Mahmoud", "Ali", "Farouk", "Nabil", "Saleh", "Kamel"]
+_CITIES = ["Cairo, Egypt", "Tanta, Egypt", "Alexandria, Egypt", "Giza, Egypt", "Mansoura, Egypt"]
+_SKILLS = [
+    "C#", "ASP.NET Core", "Entity Framework", "SQL Server", "LINQ", "Python", "FastAPI",
+    "Docker", "Kubernetes", "Azure", "AWS", "React", "TypeScript", "Git", "Redis",
+    "RabbitMQ", "Microservices", "Unit Testing", "CI/CD", "Design Patterns",
+]
+_TITLES = ["Backend Developer", "Software Engineer", ".NET Developer", "Full Stack Developer", "Team Lead"]
+_COMPANIES = ["Tech Corp", "Valeo", "Vodafone", "Fawry", "Instabug", "Swvl", "ITWorx", "Orange Labs"]
+_DUTIES = [
+    "Designed and built REST APIs consumed by web and mobile clients",
+    "Reduced report generation time by moving heavy queries to background jobs",
+    "Maintained the CI/CD pipeline and containerised legacy services",
+    "Mentored junior developers and ran weekly code reviews",
+    "Migrated a monolith to services communicating over a message queue",
+    "Wrote integration tests that cut production incidents noticeably",
+]
+
+PAGE_LINES = 46
+
+
+@dataclass
+class CVDocument:
+    """One generated CV: its name, file bytes and the text that went into it."""
+    name: str
+    filename: str
+    data: bytes
+    pages: int
+
+
+def cv_lines(seed: int, jobs: int) -> dict:
+    """Random but reproducible CV content, grouped by section."""
+    rng = random.Random(seed)
+    name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+    experience = []
+    for i in range(jobs):
+        start = 2024 - 2 * (i + 1)
+        experience.append(f"{rng.choice(_TITLES)} at {rng.choice(_COMPANIES)} (Jan {start} - Dec {start + 1})")
+        experience.extend(f"- {duty}" for duty in rng.sample(_DUTIES, 4))
+    return {
+        "header": [name, f"{name.split()[0].lower()}@example.com", f"+20 10{rng.randint(10000000, 99999999)}", rng.choice(_CITIES)],
+        "Summary": [f"{rng.choice(_TITLES)} with {jobs * 2} years of experience building web applications."],
+        "Experience": experience,
+        "Education": [f"Bachelor of Computer Science, Tanta University, {2024 - 2 * jobs - 1}"],
+        "Skills": [", ".join(rng.sample(_SKILLS, 10))],
+        "Certifications": ["Microsoft Certified: Azure Developer Associate"],
+        "Languages": ["Arabic - Native", "English - Fluent"],
+    }
+
+
+def flat_lines(sections: dict) -> list[str]:
+    lines = list(sections["header"])
+    for heading, body in sections.items():
+        if heading != "header":
+            lines.append(heading)
+            lines.extend(body)
+    return lines
+
+
+# ─────────────────────────────────────────────────────────────
+# PDF
+# ─────────────────────────────────────────────────────────────
+
+def build_pdf(sections: dict, two_column: bool = False, image_only: bool = False) -> tuple[bytes, int]:
+    """Minimal PDF with Helvetica text; returns (bytes, page count)."""
+    lines = flat_lines(sections)
+    if two_column:
+        # Sidebar with contact/skills on the left of page one, body on the right
+        side = sections["header"] + ["Skills"] + sections["Skills"] + ["Languages"] + sections["Languages"]
+        body = [line for line in lines if line not in side]
+        pages = [[(50, side[:PAGE_LINES]), (230, body[:PAGE_LINES])]]
+        rest = body[PAGE_LINES:]
+    else:
+        pages = [[(50, lines[:PAGE_LINES])]]
+        rest = lines[PAGE_LINES:]
+    while rest:
+        pages.append([(50, rest[:PAGE_LINES])])
+        rest = rest[PAGE_LINES:]
+
+    objects: list[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    image = add(
+        b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8 /Length 1 >>\nstream\n\x80\nendstream"
+    )
+    pages_id = len(objects) + 2 * len(pages) + 1
+    page_ids = []
+    for columns in pages:
+        ops = ["q 500 0 0 700 50 50 cm /Im1 Do Q"] if image_only else []
+        for x, column in ([] if image_only else columns):
+            ops.append(f"BT /F1 10 Tf 14 TL {x} 780 Td")
+            ops.extend(f"({_pdf_escape(line)}) Tj T*" for line in column)
+            ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> /XObject << /Im1 %d 0 R >> >> >>"
+            % (pages_id, content, font, image)
+        ))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    assert add(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))) == pages_id
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out), len(pages)
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+# ─────────────────────────────────────────────────────────────
+# DOCX
+# ─────────────────────────────────────────────────────────────
+
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_MC_NS = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/header1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+_DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/header" Target="header1.xml"/>
+</Relationships>"""
+
+
+def build_docx(sections: dict, rich: bool = False) -> bytes:
+    """
+    Minimal DOCX. With rich=True the contact block goes in the page header,
+    skills/languages in a table and the summary in a text box.
+    """
+    body: list[str] = []
+    header = ""
+    for heading, lines in sections.items():
+        if heading == "header":
+            if rich:
+                header = "".join(_docx_paragraph(line) for line in lines)
+            else:
+                body.extend(_docx_paragraph(line) for line in lines)
+            continue
+        body.append(_docx_paragraph(heading))
+        if rich and heading == "Summary":
+            body.append(_docx_text_box(lines))
+        elif rich and heading in ("Skills", "Languages"):
+            body.append(_docx_table([[heading, line] for line in lines]))
+        else:
+            body.extend(_docx_paragraph(line) for line in lines)
+
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f"<w:document {_W_NS} {_MC_NS}><w:body>{''.join(body)}<w:sectPr/></w:body></w:document>"
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("word/_rels/document.xml.rels", _DOCUMENT_RELS)
+        archive.writestr("word/document.xml", document)
+        archive.writestr(
+            "word/header1.xml",
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:hdr {_W_NS}>{header or _docx_paragraph("")}</w:hdr>',
+        )
+    return out.getvalue()
+
+
+def _docx_paragraph(text: str) -> str:
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def _docx_table(rows: list[list[str]]) -> str:
+    cells = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{_docx_paragraph(cell)}</w:tc>" for cell in row) + "</w:tr>"
+        for row in rows
+    )
+    return f"<w:tbl>{cells}</w:tbl>"
+
+
+def _docx_text_box(lines: list[str]) -> str:
+    content = "".join(_docx_paragraph(line) for line in lines)
+    return (
+        "<w:p><w:r><mc:AlternateContent>"
+        f"<mc:Choice Requires=\"wps\"><w:drawing><w:txbxContent>{content}</w:txbxContent></w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict><w:txbxContent>{content}</w:txbxContent></w:pict></mc:Fallback>"
+        "</mc:AlternateContent></w:r></w:p>"
+    )
+
+
+# ─────────────────────────────────────────────────────────────
+# Corpus
+# ─────────────────────────────────────────────────────────────
+
+# (name, jobs): 2 jobs ≈ 1 page, 10 ≈ 2 pages, 60 ≈ 6 pages
+CV_SIZES = [("short", 2), ("medium", 10), ("long", 60)]
+
+
+def build_corpus(seed: int = 42) -> list[CVDocument]:
+    """Every size × layout combination, deterministic for a given seed."""
+    documents = []
+    for offset, (size, jobs) in enumerate(CV_SIZES):
+        sections = cv_lines(seed + offset, jobs)
+        for layout, two_column in (("single", False), ("two-column", True)):
+            data, pages = build_pdf(sections, two_column=two_column)
+            documents.append(CVDocument(f"pdf/{layout}/{size}", f"{size}.pdf", data, pages))
+        for layout, rich in (("plain", False), ("rich", True)):
+            documents.append(CVDocument(f"docx/{layout}/{size}", f"{size}.docx", build_docx(sections, rich=rich), 0))
+    data, pages = build_pdf(cv_lines(seed, 20), image_only=True)
+    documents.append(CVDocument("pdf/image-only", "scan.pdf", data, pages))
+    return documents
@@ -0,0 +1,253 @@
+"""
+Benchmarks for the CV parsing pipeline.
+
+Measures text extraction, normalisation, JSON extraction from LLM output,
+pydantic validation and the whole analysis step on a synthetic corpus
+(benchmarks/corpus.py) with the fake LLM backend, so no network, database
+or API key is involved.
+
+Usage:
+    python benchmarks/run_benchmarks.py                  # run, save results
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/<old>.json
+    python benchmarks/run_benchmarks.py --quick --filter extract
+
+Each run is written to benchmarks/results/<commit>.json. With --baseline,
+benchmarks whose fastest run got slower than the allowed regression are listed
+and the script exits with status 1. Baseline timings are first scaled by a
+fixed calibration workload measured in both runs, so a busier or slower
+machine doesn't read as a regression.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Union
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Deterministic, offline configuration (must be set before app modules are imported)
+for _name, _value in {
+    "LLM_BACKEND": "fake",
+    "FAKE_LLM_LATENCY_MS": "0",
+    "FAKE_LLM_TOKENS_PER_SECOND": "0",
+    "FAKE_LLM_RATE_LIMIT_PROBABILITY": "0",
+    "FAKE_LLM_SEED": "1",
+    "LLM_REQUESTS_PER_MINUTE": "0",
+    "LLM_TOKENS_PER_MINUTE": "0",
+    "LLM_CACHE_ENABLED": "false",
+    "TEXT_CACHE_ENABLED": "false",
+    "PARSE_WORKERS": "0",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from app.schemas.cv_schema import ModelExtrationResponse  # noqa: E402
+from app.services.cv_analyzer import _EXTRACTION_PROMPT_TEMPLATE, _FIELD_SCHEMAS, analyse_cv  # noqa: E402
+from app.services.file_parser import extract_text  # noqa: E402
+from app.services.llm_service import call_llm  # noqa: E402
+from app.services.text_normalizer import compact_cv_text  # noqa: E402
+from app.utils.json_stream import repair_json  # noqa: E402
+from benchmarks.corpus import build_corpus  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+# Allowed slowdown vs the baseline, by benchmark name prefix.
+# End-to-end numbers go through asyncio scheduling and are noisier.
+DEFAULT_MAX_REGRESSION = 0.25
+MAX_REGRESSION = {
+    "analyse_cv/": 0.40,
+}
+
+# Regressions are judged on the fastest run: on a shared machine the median
+# moves with background load, the minimum much less.
+COMPARE_ON = "min_ms"
+
+# Differences below this are timer noise, whatever the ratio.
+NOISE_FLOOR_MS = 0.05
+
+
+def _calibration_workload() -> None:
+    """Fixed pure-Python work; its timing tells how fast this machine is right now."""
+    data = [{"skill": f"skill-{i}", "years": i % 7} for i in range(2000)]
+    for _ in range(5):
+        json.loads(json.dumps(data))
+        sorted(data, key=lambda item: (item["years"], item["skill"]))
+
+
+# ─────────────────────────────────────────────────────────────
+# Measurement
+# ─────────────────────────────────────────────────────────────
+
+async def _call(fn: Callable[[], Union[Awaitable, object]]) -> float:
+    """Run fn() (sync or async) once; return its duration in milliseconds."""
+    started = time.perf_counter()
+    result = fn()
+    if asyncio.iscoroutine(result):
+        await result
+    return (time.perf_counter() - started) * 1000
+
+
+def summarise(samples: list[float], size_bytes: int = 0) -> dict:
+    samples = sorted(samples)
+    median = statistics.median(samples)
+    result = {
+        "iterations": len(samples),
+        "min_ms": round(samples[0], 4),
+        "p50_ms": round(median, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "ops_per_sec": round(1000 / median, 2) if median else 0.0,
+    }
+    if size_bytes:
+        result["mb_per_sec"] = round(size_bytes / 1e6 / (median / 1000), 2) if median else 0.0
+    return result
+
+
+async def run_benchmarks(iterations: int, name_filter: str = "", warmup: int = 2) -> dict[str, dict]:
+    """
+    Run every benchmark once per round, for warmup + iterations rounds.
+
+    Interleaving (instead of timing one benchmark's runs back to back)
+    spreads background load evenly over all benchmarks and the calibration.
+    """
+    benches: dict[str, tuple[Callable, int]] = {"calibration": (_calibration_workload, 0)}
+
+    def bench(name: str, fn, size_bytes: int = 0) -> None:
+        if not name_filter or name_filter in name:
+            benches[name] = (fn, size_bytes)
+
+    texts = {}
+    for doc in build_corpus():
+        texts[doc.name] = await extract_text(doc.data, doc.filename)
+        bench(f"extract_text/{doc.name}", lambda doc=doc: extract_text(doc.data, doc.filename), len(doc.data))
+
+    for name, text in texts.items():
+        if name.startswith("pdf/single/"):
+            size = name.rsplit("/", 1)[1]
+            bench(f"normalise/{size}", lambda text=text: compact_cv_text(text, max_tokens=6000), len(text))
+
+            # Representative model output for this CV, plus the messy variants repair_json handles
+            raw = await call_llm(_EXTRACTION_PROMPT_TEMPLATE.format(
+                cv_text=text, schema=",\n".join(_FIELD_SCHEMAS.values())
+            ))
+            messy = f"Here is the JSON:\n```json\n{raw.rstrip().rstrip('}')},\n}}\n```"
+            json_text = repair_json(raw)
+            bench(f"json_extract/{size}", lambda raw=raw: repair_json(raw), len(raw))
+            bench(f"json_extract_messy/{size}", lambda messy=messy: repair_json(messy), len(messy))
+            bench(
+                f"validate/{size}",
+                lambda json_text=json_text: ModelExtrationResponse.model_validate_json(json_text),
+                len(json_text),
+            )
+            bench(f"analyse_cv/{size}", lambda text=text: analyse_cv(text), len(text))
+
+    samples: dict[str, list[float]] = {name: [] for name in benches}
+    for round_number in range(warmup + iterations):
+        for name, (fn, _) in benches.items():
+            duration = await _call(fn)
+            if round_number >= warmup:
+                samples[name].append(duration)
+
+    results = {name: summarise(samples[name], size_bytes) for name, (_, size_bytes) in benches.items()}
+    for name, result in results.items():
+        print(f"  {name:<40} min {result['min_ms']:>9.3f} ms   p50 {result['p50_ms']:>9.3f} ms   p95 {result['p95_ms']:>9.3f} ms")
+    return results
+
+
+# ─────────────────────────────────────────────────────────────
+# Results
+# ─────────────────────────────────────────────────────────────
+
+def git_revision() -> tuple[str, bool]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def compare(current: dict, baseline: dict, max_regression: Optional[float], no_calibration: bool = False) -> list[str]:
+    """Return a line per benchmark that regressed past its threshold."""
+    regressions = []
+    # Scale the baseline by how much faster/slower the machine is than when it was recorded
+    scale = 1.0
+    if "calibration" in baseline.get("results", {}) and not no_calibration:
+        scale = current["results"]["calibration"][COMPARE_ON] / baseline["results"]["calibration"][COMPARE_ON]
+    print(f"\nvs baseline {baseline.get('commit', '?')} (machine speed factor {scale:.2f}):")
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None or name == "calibration":
+            continue
+        old, new = before[COMPARE_ON] * scale, result[COMPARE_ON]
+        change = (new - old) / old if old else 0.0
+        allowed = max_regression if max_regression is not None else next(
+            (limit for prefix, limit in MAX_REGRESSION.items() if name.startswith(prefix)),
+            DEFAULT_MAX_REGRESSION,
+        )
+        regressed = change > allowed and new - old > NOISE_FLOOR_MS
+        marker = "REGRESSION" if regressed else ""
+        print(f"  {name:<40} {old:>9.3f} → {new:>9.3f} ms  {change:+7.1%}  {marker}")
+        if regressed:
+            regressions.append(f"{name}: {old:.3f} → {new:.3f} ms ({change:+.1%}, allowed +{allowed:.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20, help="timed runs per benchmark")
+    parser.add_argument("--quick", action="store_true", help="5 iterations (smoke run)")
+    parser.add_argument("--filter", default="", help="only benchmarks whose name contains this")
+    parser.add_argument("--baseline", type=Path, help="results file to compare against")
+    parser.add_argument("--max-regression", type=float, help="override every threshold (0.25 = 25%% slower)")
+    parser.add_argument("--no-calibration", action="store_true", help="compare raw timings, not scaled by machine speed")
+    parser.add_argument("--output", type=Path, help="where to write results (default benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    # The corpus deliberately triggers warnings (image-only PDF, JSON repairs)
+    logging.basicConfig(level=logging.ERROR)
+    iterations = 5 if args.quick else args.iterations
+    commit, dirty = git_revision()
+
+    print(f"Running benchmarks ({iterations} iterations) at {commit}{' (dirty)' if dirty else ''}")
+    results = asyncio.run(run_benchmarks(iterations, args.filter))
+
+    current = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": iterations,
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{commit}{'-dirty' if dirty else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        regressions = compare(
+            current, json.loads(args.baseline.read_text()), args.max_regression, args.no_calibration
+        )
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""
+Shared pytest setup: the app package on sys.path and settings that keep the
+services local (no Groq, no shared SQLite files).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("JOB_CATALOG_PATH", "")
+os.environ.setdefault("TEXT_CACHE_PATH", "")
+os.environ.setdefault("SKILL_ALIASES_PATH", "")
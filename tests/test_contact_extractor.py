@@ -0,0 +1,32 @@
+"""Tests for rule-based contact extraction (app/services/contact_extractor.py)."""
+
+from app.core.config import settings
+from app.services.contact_extractor import extract_contact_fields
+
+
+def _resolved(text: str) -> dict[str, str]:
+    return extract_contact_fields(text).resolved(settings.contact_confidence_threshold)
+
+
+def test_city_country_header_resolved():
+    contact = extract_contact_fields("Mona Ali\nCairo, Egypt | mona@example.com\n\nSummary\nData engineer.")
+
+    assert contact.location == "Cairo, Egypt"
+    assert _resolved("Mona Ali\nCairo, Egypt\n")["location"] == "Cairo, Egypt"
+
+
+def test_job_title_line_is_not_a_location():
+    contact = extract_contact_fields("Mona Ali\nBackend Developer, Microsoft\n\nSummary\nAPIs.")
+
+    assert contact.location == ""
+
+
+def test_company_line_is_left_to_the_llm():
+    text = "Mona Ali\nAcme Labs, Globex\n\nSummary\nAPIs."
+
+    assert extract_contact_fields(text).location == "Acme Labs, Globex"
+    assert "location" not in _resolved(text)
+
+
+def test_labelled_location_resolved():
+    assert _resolved("Mona Ali\nLocation: Tanta\n")["location"] == "Tanta"
@@ -0,0 +1,46 @@
+"""Tests for trigram fuzzy skill resolution (app/services/fuzzy_skills.py)."""
+
+from app.services.fuzzy_skills import TrigramIndex, resolve_fuzzy
+from app.services.skill_dictionary import skill_id, skill_ids
+
+VOCABULARY = ["PostgreSQL", "ASP.NET Core", "Docker", "Go"]
+
+
+def _index() -> TrigramIndex:
+    return TrigramIndex(skill_ids(VOCABULARY))
+
+
+def test_near_miss_resolved_at_or_above_threshold():
+    hit = _index().best("postgressql", 0.6)
+
+    assert hit is not None
+    assert hit[0] == skill_id("PostgreSQL")
+    assert 0.6 <= hit[1] < 0.8
+
+
+def test_threshold_is_a_lower_bound():
+    index = _index()
+    _, score = index.best("postgressql", 0.5)
+
+    assert index.best("postgressql", score) is not None
+    assert index.best("postgressql", score + 0.01) is None
+
+
+def test_unrelated_skill_not_resolved():
+    assert _index().best("python", 0.3) is None
+
+
+def test_resolve_fuzzy_reports_the_user_spelling():
+    user_skills = ["PostgresSQL", "ASP.Net core 8", "Docker"]
+    user_set = skill_ids(user_skills)
+
+    hits = resolve_fuzzy(user_skills, user_set, _index(), 0.6)
+
+    assert set(hits) == {skill_id("PostgreSQL"), skill_id("ASP.NET Core")}
+    assert hits[skill_id("PostgreSQL")].user_skill == "PostgresSQL"
+
+
+def test_short_and_exact_skills_left_alone():
+    user_skills = ["Goo", "Docker"]
+
+    assert resolve_fuzzy(user_skills, skill_ids(user_skills), _index(), 0.1) == {}
@@ -0,0 +1,77 @@
+"""Tests for /match-jobs ranking and paging (app/services/job_matcher.py)."""
+
+import pytest
+
+from app.schemas.matching_schema import JobInput
+from app.services.job_matcher import compute_matches, decode_cursor, encode_cursor
+
+USER_SKILLS = ["Python", "SQL", "Docker", "PostgresSQL"]
+
+JOBS = [
+    JobInput(job_id=f"j{i}", title=title, company="Acme", skills=skills)
+    for i, (title, skills) in enumerate([
+        ("Data Engineer", ["Python", "SQL", "Spark"]),
+        ("Backend Developer", ["Python", "Docker"]),
+        ("Analyst", ["SQL", "Excel"]),
+        ("Analyst", ["SQL", "Tableau"]),
+        ("DBA", ["PostgreSQL", "SQL"]),
+        ("DevOps Engineer", ["Docker", "Kubernetes", "Terraform", "AWS"]),
+        ("Designer", ["Figma"]),
+    ])
+]
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(66.7, "Data Engineer – Cairo", 3)
+
+    assert decode_cursor(cursor, int) == (-66.7, "Data Engineer – Cairo", 3)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "", encode_cursor(50.0, "Analyst", "j1")])
+def test_bad_cursor_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, int)
+
+
+def test_results_sorted_by_percentage_then_title():
+    results = compute_matches(USER_SKILLS, JOBS).results
+
+    keys = [(-r.match_percentage, r.title) for r in results]
+    assert keys == sorted(keys)
+    assert results[0].job_id == "j1"
+    # Equal (percentage, title) keep the input order
+    assert [r.job_id for r in results if r.title == "Analyst"] == ["j2", "j3"]
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 6])
+def test_pages_concatenate_to_the_full_ranking(page_size):
+    full = [r.job_id for r in compute_matches(USER_SKILLS, JOBS).results]
+
+    paged, cursor = [], None
+    while True:
+        page = compute_matches(USER_SKILLS, JOBS, top_k=page_size, cursor=cursor)
+        paged.extend(r.job_id for r in page.results)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert paged == full
+
+
+def test_min_percentage_filters():
+    results = compute_matches(USER_SKILLS, JOBS, min_percentage=50).results
+
+    assert all(r.match_percentage >= 50 for r in results)
+    assert "j6" not in {r.job_id for r in results}
+
+
+def test_fuzzy_threshold_controls_near_misses():
+    exact = {r.job_id: r for r in compute_matches(USER_SKILLS, JOBS).results}
+    loose = {r.job_id: r for r in compute_matches(USER_SKILLS, JOBS, fuzzy_threshold=0.6).results}
+    strict = {r.job_id: r for r in compute_matches(USER_SKILLS, JOBS, fuzzy_threshold=0.9).results}
+
+    assert exact["j4"].match_percentage == 50.0
+    assert loose["j4"].match_percentage == 100.0
+    assert [(m.skill, m.user_skill) for m in loose["j4"].fuzzy_matches] == [("PostgreSQL", "PostgresSQL")]
+    assert strict["j4"].match_percentage == 50.0
+    assert strict["j4"].fuzzy_matches == []
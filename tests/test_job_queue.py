@@ -0,0 +1,85 @@
+"""Tests for the persistent CV job queue (app/services/job_queue.py)."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.job_queue import JobQueue, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def test_claim_takes_the_oldest_job_once(store):
+    first = store.submit("a.pdf", b"a", None, "full")
+    store.submit("b.pdf", b"b", None, "full")
+
+    claimed = store.claim(lease_seconds=60)
+
+    assert claimed["job_id"] == first["job_id"]
+    assert claimed["status"] == "running"
+    assert claimed["attempts"] == 1
+    assert claimed["payload"] == b"a"
+    assert store.claim(lease_seconds=60)["filename"] == "b.pdf"
+    assert store.claim(lease_seconds=60) is None
+
+
+def test_expired_lease_is_claimed_again(store):
+    job = store.submit("a.pdf", b"a", None, "full")
+    store.claim(lease_seconds=0.05)
+
+    assert store.claim(lease_seconds=60) is None
+    time.sleep(0.1)
+    retried = store.claim(lease_seconds=60)
+
+    assert retried["job_id"] == job["job_id"]
+    assert retried["attempts"] == 2
+
+
+def test_release_does_not_count_the_attempt(store):
+    job = store.submit("a.pdf", b"a", None, "full")
+    store.claim(lease_seconds=60)
+
+    store.release(job["job_id"])
+
+    assert store.get(job["job_id"])["status"] == "queued"
+    assert store.claim(lease_seconds=60)["attempts"] == 1
+
+
+def test_finish_drops_the_payload(store):
+    job = store.submit("a.pdf", b"a", None, "full")
+    store.claim(lease_seconds=60)
+
+    store.finish(job["job_id"], error="bad file", error_status=400)
+
+    finished = store.get(job["job_id"])
+    assert finished["status"] == "failed"
+    assert finished["error_status"] == 400
+    assert store.counts() == {"failed": 1}
+
+
+def test_job_abandoned_after_max_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "job_max_attempts", 2)
+    queue = JobQueue(str(tmp_path / "jobs.db"), workers=0)
+
+    async def scenario():
+        job = await queue.submit("a.pdf", b"a", None, "full")
+        # Two workers died mid-job: their leases ran out
+        for _ in range(2):
+            queue.store.claim(lease_seconds=-1)
+        await queue._run(queue.store.claim(lease_seconds=60))
+        result = await queue.get(job["job_id"])
+        await queue.stop()
+        return result
+
+    job = asyncio.run(scenario())
+
+    assert job["status"] == "failed"
+    assert job["attempts"] == 3
+    assert job["error"] == "Job was interrupted too many times."
@@ -0,0 +1,41 @@
+"""Tests for LLM JSON repair (app/utils/json_stream.py)."""
+
+import json
+
+import pytest
+
+from app.utils.json_stream import parse_llm_json, repair_json
+
+FULL = '{"fullName": "Mona Ali", "skills": ["Python", "SQL"], "experience": [{"title": "Engineer", "company": "Acme"}]}'
+
+
+@pytest.mark.parametrize("length", range(1, len(FULL) + 1))
+def test_every_truncated_prefix_is_valid_json(length):
+    data = json.loads(repair_json(FULL[:length]))
+
+    assert isinstance(data, dict)
+
+
+def test_truncated_string_value_is_dropped():
+    assert parse_llm_json('{"fullName": "Mona Ali", "summary": "Data eng') == {"fullName": "Mona Ali"}
+
+
+def test_half_written_array_object_is_dropped():
+    text = '{"skills": ["Python"], "experience": [{"title": "Engineer"}, {"title": "Lea'
+
+    assert parse_llm_json(text) == {"skills": ["Python"], "experience": [{"title": "Engineer"}]}
+
+
+def test_wrapping_text_and_trailing_commas_removed():
+    text = 'Here is the JSON:\n```json\n{"skills": ["Python", "SQL",], "email": "a@b.co",}\n```'
+
+    assert parse_llm_json(text) == {"skills": ["Python", "SQL"], "email": "a@b.co"}
+
+
+def test_raw_newline_in_string_escaped():
+    assert parse_llm_json('{"summary": "line one\nline two"}') == {"summary": "line one\nline two"}
+
+
+def test_no_object_raises():
+    with pytest.raises(ValueError):
+        repair_json("The model refused.")
@@ -0,0 +1,75 @@
+"""Tests for the shared LLM rate limiter (app/services/rate_limiter.py)."""
+
+import asyncio
+
+import pytest
+
+from app.services.rate_limiter import LLMRateLimiter, _Bucket, parse_reset_duration
+
+
+def test_bucket_refills_at_the_per_minute_rate():
+    bucket = _Bucket(600)
+    bucket.level = 0.0
+    start = bucket._updated
+
+    bucket.refill(start + 3)
+
+    assert bucket.level == pytest.approx(30)
+    assert bucket.wait_time(40) == pytest.approx(1.0)
+
+
+def test_bucket_refill_is_capped_at_capacity():
+    bucket = _Bucket(60)
+    bucket.level = 10.0
+
+    bucket.refill(bucket._updated + 3600)
+
+    assert bucket.level == 60
+    assert bucket.wait_time(1000) == 0.0
+
+
+def test_acquire_waits_when_the_token_budget_is_spent():
+    async def scenario():
+        limiter = LLMRateLimiter(requests_per_minute=0, tokens_per_minute=60)
+        await limiter.acquire(60)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(30), 0.2)
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["acquired"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_settle_refunds_unused_tokens():
+    async def scenario():
+        limiter = LLMRateLimiter(requests_per_minute=0, tokens_per_minute=1000)
+        await limiter.acquire(800)
+        limiter.settle(800, 300)
+        return limiter.stats()["tokens_available"]
+
+    assert asyncio.run(scenario()) == pytest.approx(700, abs=1)
+
+
+def test_rate_limited_response_pauses_the_queue():
+    limiter = LLMRateLimiter(requests_per_minute=30, tokens_per_minute=6000)
+
+    retry_after = limiter.on_rate_limited({"retry-after": "2"})
+
+    assert retry_after == 2.0
+    assert 1.5 < limiter.stats()["paused_for"] <= 2.0
+    assert limiter.stats()["rate_limited"] == 1
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [("7.66s", 7.66), ("2m59.56s", 179.56), ("1h2m", 3720.0), ("120", 120.0), ("250ms", 0.25)],
+)
+def test_parse_reset_duration(value, seconds):
+    assert parse_reset_duration(value) == pytest.approx(seconds)
+
+
+def test_parse_reset_duration_rejects_garbage():
+    assert parse_reset_duration("") is None
+    assert parse_reset_duration("soon") is None
@@ -0,0 +1,51 @@
+"""Tests for skill folding and aliases (app/services/skill_dictionary.py)."""
+
+import pytest
+
+from app.services.skill_dictionary import canonical_skills, fold_skill, skill_id, skill_ids
+
+
+@pytest.mark.parametrize(
+    ("skill", "key"),
+    [
+        ("C#", "csharp"),
+        ("C++", "cplusplus"),
+        (".NET Core", "dotnetcore"),
+        ("ASP.NET", "aspnet"),
+        ("Node.js", "nodejs"),
+        ("  Machine-Learning ", "machinelearning"),
+        ("ＰＹＴＨＯＮ", "python"),
+        ("", ""),
+    ],
+)
+def test_fold_skill(skill, key):
+    assert fold_skill(skill) == key
+
+
+@pytest.mark.parametrize(
+    "variants",
+    [
+        ["C#", "csharp", "C Sharp"],
+        [".NET Core", "dotnet core"],
+        ["PostgreSQL", "postgres"],
+        ["JavaScript", "JS"],
+        ["Kubernetes", "k8s"],
+    ],
+)
+def test_aliases_share_one_id(variants):
+    assert len(skill_ids(variants)) == 1
+    assert isinstance(skill_id(variants[0]), int)
+
+
+def test_related_tools_are_not_merged():
+    assert skill_id("SSMS") != skill_id("SQL Server")
+    assert skill_id("ASP.NET") != skill_id("ASP.NET Core")
+
+
+def test_unknown_skill_matches_its_spelling_variants():
+    assert skill_id("Foo Bar") == skill_id("foo-bar") == "foobar"
+    assert skill_id("   ") is None
+
+
+def test_canonical_skills_dedupes_and_keeps_unknown_spelling():
+    assert canonical_skills(["csharp", "C#", "postgres", "Foo-Bar", "foo bar"]) == ["C#", "PostgreSQL", "Foo-Bar"]
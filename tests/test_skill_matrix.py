@@ -0,0 +1,61 @@
+"""Tests for batch matching (app/services/skill_matrix.py, JobCatalog.match_many)."""
+
+import random
+
+import pytest
+
+from app.schemas.matching_schema import JobInput
+from app.services.job_catalog import JobCatalog
+from app.services.job_matcher import compute_matches
+from app.services.skill_dictionary import skill_ids
+from app.services.skill_matrix import SkillMatrix
+
+SKILLS = ["Python", "SQL", "Docker", "Kubernetes", "C#", "ASP.NET Core", "React", "AWS", "Spark", "Excel", "Go", "Rust"]
+TITLES = ["Backend Developer", "Data Engineer", "DevOps Engineer", "Analyst"]
+
+
+def _jobs(count: int, rng: random.Random) -> list[JobInput]:
+    return [
+        JobInput(
+            job_id=f"job-{i:03d}",
+            title=rng.choice(TITLES),
+            company="Acme",
+            skills=rng.sample(SKILLS, rng.randint(1, 5)),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = JobCatalog(str(tmp_path / "catalog.db"))
+    catalog.start({})
+    yield catalog
+    catalog.close()
+
+
+def test_top_matches_leaves_out_jobs_with_no_shared_skill():
+    matrix = SkillMatrix([skill_ids(["Python", "SQL"]), skill_ids(["Go"]), skill_ids(["SQL"])], ["B", "A", "C"])
+
+    [matches] = matrix.top_matches([skill_ids(["SQL"])], top_k=5)
+
+    assert [(m.job_index, m.match_percentage) for m in matches] == [(2, 100.0), (0, 50.0)]
+
+
+@pytest.mark.parametrize("fuzzy_threshold", [None, 0.6])
+def test_match_many_agrees_with_compute_matches(catalog, fuzzy_threshold):
+    rng = random.Random(7)
+    jobs = _jobs(60, rng)
+    catalog.upsert(jobs)
+    users = [(f"user-{i}", rng.sample(SKILLS, rng.randint(1, 6)) + ["Kubernets"]) for i in range(25)]
+
+    batch = catalog.match_many(users, top_k=8, fuzzy_threshold=fuzzy_threshold)
+
+    # match_many breaks title ties by job_id; compute_matches by input order
+    ordered = sorted(jobs, key=lambda job: job.job_id)
+    for (user_id, skills), result in zip(users, batch):
+        expected = compute_matches(skills, ordered, top_k=8, min_percentage=0.1, fuzzy_threshold=fuzzy_threshold)
+        assert result.user_id == user_id
+        assert [r.model_dump() for r in result.results] == [r.model_dump() for r in expected.results]
+    if fuzzy_threshold is not None:
+        assert any(r.fuzzy_matches for user in batch for r in user.results)
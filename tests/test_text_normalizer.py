@@ -0,0 +1,28 @@
+"""Tests for CV text compaction (app/services/text_normalizer.py)."""
+
+from app.services.text_normalizer import PAGE_BREAK, compact_cv_text
+
+HEADER = ["Mona Ali - Data Engineer", "mona.ali@example.com"]
+
+
+def _pages(*bodies: list[str]) -> str:
+    return PAGE_BREAK.join("\n".join(HEADER + body + ["Page 1"]) for body in bodies)
+
+
+def test_repeated_header_kept_on_first_page():
+    text = _pages(["Summary", "Builds data pipelines."], ["Experience", "Acme Corp 2020-2024"])
+
+    lines = compact_cv_text(text).text.split("\n")
+
+    assert lines[:2] == HEADER
+    assert lines.count(HEADER[0]) == 1
+    assert lines.count(HEADER[1]) == 1
+    assert "Acme Corp 2020-2024" in lines
+
+
+def test_page_numbers_dropped():
+    text = _pages(["Summary", "Builds data pipelines."], ["Skills", "Python, SQL"])
+
+    compacted = compact_cv_text(text).text
+
+    assert "Page" not in compacted
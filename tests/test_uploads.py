@@ -0,0 +1,89 @@
+"""Tests for bounded uploads (app/utils/uploads.py)."""
+
+import hashlib
+
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from app.utils.uploads import UploadSizeLimitMiddleware, read_upload
+
+LIMIT = 64 * 1024
+
+app = FastAPI()
+app.add_middleware(UploadSizeLimitMiddleware, limits={"/upload": LIMIT, "/spool": 4 * 1024 * 1024})
+
+
+@app.post("/upload")
+@app.post("/spool")
+async def upload(file: UploadFile = File(...)):
+    try:
+        spooled = await read_upload(file, max_bytes=3 * 1024 * 1024)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        return {
+            "size": spooled.size,
+            "sha256": spooled.sha256,
+            "spooled": spooled.spooled,
+            "content_sha256": hashlib.sha256(spooled.read_bytes()).hexdigest(),
+        }
+    finally:
+        spooled.close()
+
+
+client = TestClient(app)
+
+
+def test_small_upload_passes():
+    data = b"%PDF-1.4 small"
+
+    response = client.post("/upload", files={"file": ("cv.pdf", data, "application/pdf")})
+
+    assert response.status_code == 200
+    assert response.json()["sha256"] == hashlib.sha256(data).hexdigest()
+    assert response.json()["spooled"] is False
+
+
+def test_declared_oversized_body_gets_413():
+    response = client.post("/upload", files={"file": ("cv.pdf", b"x" * (LIMIT + 1), "application/pdf")})
+
+    assert response.status_code == 413
+    assert str(LIMIT) in response.json()["detail"]
+
+
+def test_streamed_oversized_body_gets_413():
+    def body():
+        for _ in range(20):
+            yield b"x" * 8192
+
+    response = client.post(
+        "/upload", content=body(), headers={"content-type": "multipart/form-data; boundary=abc"}
+    )
+
+    assert response.status_code == 413
+
+
+def test_file_on_disk_is_hashed_in_place():
+    # Past Starlette's 1 MB in-memory limit, so the form already spooled it to disk
+    data = bytes(range(256)) * 8192
+
+    response = client.post("/spool", files={"file": ("cv.pdf", data, "application/pdf")})
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["size"] == len(data)
+    assert body["spooled"] is True
+    assert body["sha256"] == body["content_sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_file_over_the_per_file_cap_rejected():
+    response = client.post("/spool", files={"file": ("cv.pdf", b"x" * (3 * 1024 * 1024 + 1), "application/pdf")})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File too large"
+
+
+def test_empty_file_rejected():
+    response = client.post("/upload", files={"file": ("cv.pdf", b"", "application/pdf")})
+
+    assert response.status_code == 400